@@ -4,9 +4,13 @@ from google.adk.agents import LlmAgent
 from google.adk.planners import BuiltInPlanner
 from google.genai.types import ThinkingConfig
 
+import data_analytics_agent.rest_api_helper as rest_api_helper
+
 import data_analytics_agent.bigquery.run_bigquery_sql as run_bigquery_sql 
+import data_analytics_agent.bigquery.run_bigquery_sql_batch as run_bigquery_sql_batch
 import data_analytics_agent.bigquery.get_bigquery_table_schema as get_bigquery_table_schema
 import data_analytics_agent.bigquery.get_bigquery_table_list as get_bigquery_table_list
+import data_analytics_agent.bigquery.estimate_bigquery_sql_cost as estimate_bigquery_sql_cost
 
 import data_analytics_agent.google_search.google_search as google_search
 
@@ -36,98 +40,103 @@ bigquery_agent = LlmAgent(name="BigQuery",
                           description="Runs BigQuery queries.",
                           tools=[ get_bigquery_table_list.get_bigquery_table_list,
                                   get_bigquery_table_schema.get_bigquery_table_schema, 
-                                  run_bigquery_sql.run_bigquery_sql,                                   
+                                  get_bigquery_table_schema.get_bigquery_table_schemas,
+                                  estimate_bigquery_sql_cost.estimate_bigquery_sql_cost,
+                                  run_bigquery_sql.run_bigquery_sql,
+                                  run_bigquery_sql_batch.run_bigquery_sql_batch,                                   
                                 ],
                           model="gemini-2.5-flash")
 
 datacatalog_agent = LlmAgent(name="DataCatalog", 
                              description="Searches the data catalog.",
                              tools=[ get_bigquery_table_list.get_bigquery_table_list,
-                                     data_catalog_search.search_data_catalog,                                     
-                                     data_governance.get_data_governance_for_table
+                                     rest_api_helper.agent_tool(data_catalog_search.search_data_catalog_async),
+                                     rest_api_helper.agent_tool(data_governance.get_data_governance_for_table_async),
+                                     rest_api_helper.agent_tool(data_governance.get_data_governance_for_tables_async)
                                    ],
                              model="gemini-2.5-flash")
 
 datascan_agent = LlmAgent(name="DataScan", 
                              description="Provides the ability to manage data scans.",
-                             tools=[ data_profile.create_data_profile_scan,
-                                     data_profile.start_data_profile_scan,
-                                     data_profile.exists_data_profile_scan,
-                                     data_profile.get_data_profile_scan_state,
-                                     data_profile.get_data_profile_scans,
-                                     data_profile.update_bigquery_table_dataplex_labels
+                             tools=[ rest_api_helper.agent_tool(data_profile.create_data_profile_scan_async),
+                                     rest_api_helper.agent_tool(data_profile.start_data_profile_scan_async),
+                                     rest_api_helper.agent_tool(data_profile.exists_data_profile_scan_async),
+                                     rest_api_helper.agent_tool(data_profile.get_data_profile_scan_state_async),
+                                     rest_api_helper.agent_tool(data_profile.get_data_profile_scans_async),
+                                     rest_api_helper.agent_tool(data_profile.update_bigquery_table_dataplex_labels_async)
                                    ],
                              model="gemini-2.5-flash")
 
 datainsight_agent = LlmAgent(name="DataInsight", 
                              description="Provides the ability to manage data insights.",
-                             tools=[ data_insights.create_data_insight_scan,
-                                     data_insights.start_data_insight_scan,
-                                     data_insights.exists_data_insight_scan,
-                                     data_insights.get_data_insight_scan_state,
-                                     data_insights.get_data_insight_scans,
-                                     data_insights.update_bigquery_table_dataplex_labels_for_insights
+                             tools=[ rest_api_helper.agent_tool(data_insights.create_data_insight_scan_async),
+                                     rest_api_helper.agent_tool(data_insights.start_data_insight_scan_async),
+                                     rest_api_helper.agent_tool(data_insights.exists_data_insight_scan_async),
+                                     rest_api_helper.agent_tool(data_insights.get_data_insight_scan_state_async),
+                                     rest_api_helper.agent_tool(data_insights.get_data_insight_scans_async),
+                                     rest_api_helper.agent_tool(data_insights.update_bigquery_table_dataplex_labels_for_insights_async)
                                    ],
                              model="gemini-2.5-flash")
 
 dataquality_agent = LlmAgent(name="DataQuality", 
                              description="Provides the ability to manage data quality scans.",
-                             tools=[ data_quality.create_data_quality_scan,
-                                     data_quality.start_data_quality_scan,
-                                     data_quality.exists_data_quality_scan,
-                                     data_quality.get_data_quality_scans,
-                                     data_quality.get_data_quality_scan_state,
-                                     data_quality.update_bigquery_table_dataplex_labels_for_quality
+                             tools=[ rest_api_helper.agent_tool(data_quality.create_data_quality_scan_async),
+                                     rest_api_helper.agent_tool(data_quality.start_data_quality_scan_async),
+                                     rest_api_helper.agent_tool(data_quality.exists_data_quality_scan_async),
+                                     rest_api_helper.agent_tool(data_quality.get_data_quality_scans_async),
+                                     rest_api_helper.agent_tool(data_quality.get_data_quality_scan_state_async),
+                                     rest_api_helper.agent_tool(data_quality.update_bigquery_table_dataplex_labels_for_quality_async)
                                    ],
                              model="gemini-2.5-flash")
 
 dataquality_agent = LlmAgent(name="DataQuality", 
                              description="Provides the ability to manage data quality scans.",
-                             tools=[ data_quality.create_data_quality_scan,
-                                     data_quality.start_data_quality_scan,
-                                     data_quality.exists_data_quality_scan,
-                                     data_quality.get_data_quality_scans,
-                                     data_quality.get_data_quality_scan_state,
-                                     data_quality.update_bigquery_table_dataplex_labels_for_quality
+                             tools=[ rest_api_helper.agent_tool(data_quality.create_data_quality_scan_async),
+                                     rest_api_helper.agent_tool(data_quality.start_data_quality_scan_async),
+                                     rest_api_helper.agent_tool(data_quality.exists_data_quality_scan_async),
+                                     rest_api_helper.agent_tool(data_quality.get_data_quality_scans_async),
+                                     rest_api_helper.agent_tool(data_quality.get_data_quality_scan_state_async),
+                                     rest_api_helper.agent_tool(data_quality.update_bigquery_table_dataplex_labels_for_quality_async)
                                    ],
                              model="gemini-2.5-flash")
 
 datadiscovery_agent = LlmAgent(name="DataDiscovery", 
                              description="Provides the ability to manage data discovery of files on Google Cloud Storage scans.",
-                             tools=[ data_discovery.create_data_discovery_scan,
-                                     data_discovery.start_data_discovery_scan,
-                                     data_discovery.exists_data_discovery_scan,
-                                     data_discovery.get_data_discovery_scans,
-                                     data_discovery.get_data_discovery_scan_state
+                             tools=[ rest_api_helper.agent_tool(data_discovery.create_data_discovery_scan_async),
+                                     rest_api_helper.agent_tool(data_discovery.start_data_discovery_scan_async),
+                                     rest_api_helper.agent_tool(data_discovery.exists_data_discovery_scan_async),
+                                     rest_api_helper.agent_tool(data_discovery.get_data_discovery_scans_async),
+                                     rest_api_helper.agent_tool(data_discovery.get_data_discovery_scan_state_async)
                                    ],
                              model="gemini-2.5-flash")
 
 conversational_analytics_agent = LlmAgent(name="ConversationalAnalyticsAPI", 
                              description="This agent is used manage and create Google Conversational Analytics API resources.",
                              tools=[ get_bigquery_table_list.get_bigquery_table_list,
-                                     conversational_analytics_auto_create_agent.create_conversational_analytics_data_agent,
+                                     rest_api_helper.agent_tool(conversational_analytics_auto_create_agent.create_conversational_analytics_data_agent_async),
                                     
-                                     #conversational_analytics_chat.conversational_analytics_data_agent_chat_stateful,
-                                     #conversational_analytics_chat.conversational_analytics_data_agent_chat_stateless,
-
-                                     conversational_analytics_conversation.conversational_analytics_data_agent_conversations_list,
-                                     conversational_analytics_conversation.conversational_analytics_data_agent_conversations_get,
-                                     conversational_analytics_conversation.conversational_analytics_data_agent_conversations_exists,
-                                     conversational_analytics_conversation.conversational_analytics_data_agent_conversations_create,
-
-                                     conversational_analytics_data_agent.conversational_analytics_data_agent_list,
-                                     conversational_analytics_data_agent.conversational_analytics_data_agent_exists,
-                                     conversational_analytics_data_agent.conversational_analytics_data_agent_get,
-                                     conversational_analytics_data_agent.conversational_analytics_data_agent_create,
-                                     conversational_analytics_data_agent.conversational_analytics_data_agent_delete
+                                     #conversational_analytics_chat.conversational_analytics_data_agent_chat_stateful_async,
+                                     #conversational_analytics_chat.conversational_analytics_data_agent_chat_stateless_async,
+                                     #conversational_analytics_chat.conversational_analytics_load_chat_payload_async,
+
+                                     rest_api_helper.agent_tool(conversational_analytics_conversation.conversational_analytics_data_agent_conversations_list_async),
+                                     rest_api_helper.agent_tool(conversational_analytics_conversation.conversational_analytics_data_agent_conversations_get_async),
+                                     rest_api_helper.agent_tool(conversational_analytics_conversation.conversational_analytics_data_agent_conversations_exists_async),
+                                     rest_api_helper.agent_tool(conversational_analytics_conversation.conversational_analytics_data_agent_conversations_create_async),
+
+                                     rest_api_helper.agent_tool(conversational_analytics_data_agent.conversational_analytics_data_agent_list_async),
+                                     rest_api_helper.agent_tool(conversational_analytics_data_agent.conversational_analytics_data_agent_exists_async),
+                                     rest_api_helper.agent_tool(conversational_analytics_data_agent.conversational_analytics_data_agent_get_async),
+                                     rest_api_helper.agent_tool(conversational_analytics_data_agent.conversational_analytics_data_agent_create_async),
+                                     rest_api_helper.agent_tool(conversational_analytics_data_agent.conversational_analytics_data_agent_delete_async)
                                     
                                    ],
                              model="gemini-2.5-flash")
 
 data_engineering_sub_agent = LlmAgent(name="DataEngineering", 
                              description="Provides the ability to create and update data engineering pipelines using natural language prompts.",
-                             tools=[ data_engineering_agent.execute_data_engineering_task,
-                                     data_engineering_agent.get_worflow_invocation_status
+                             tools=[ rest_api_helper.agent_tool(data_engineering_agent.execute_data_engineering_task_async),
+                                     rest_api_helper.agent_tool(data_engineering_agent.get_worflow_invocation_status_async)
                                    ],
                              model="gemini-2.5-flash")
 
@@ -148,7 +157,7 @@ AI LLM Agents that you can use to answer questions:
     - Assists with getting a list of all tables in a google cloud project.  This should be called when constructing a query.
 - DataCatalog: 
     - Assists with searching the data catalog.
-    - Assists with getting the data governance tags on a table (aspect types).
+    - Assists with getting the data governance tags on a table or on several tables at once (aspect types).
 - DataScan:
     - Assists with data profile scans.
 - DataInsight:
@@ -168,6 +177,7 @@ Rules:
 - Do not call the same tool agent with the EXACT same parameters to prevent yourself from looping.
 - You should use one of the agents to complete each task.  You may only do basic logic yourself.
 - You should always call get_bigquery_table_list to get the correct table and dataset names. 
+    - Pass the user's question to get_bigquery_table_list so only the most relevant tables are returned.
     - Do not trust the user to state the correct name.
 
 Your name is: Data Beans Agent.
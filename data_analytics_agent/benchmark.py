@@ -0,0 +1,457 @@
+# Local benchmarks that run against an in-process stub server (no Google Cloud access needed)
+# source .venv/bin/activate
+# cd /Users/paternostro/adk-web/
+# python -m data_analytics_agent.benchmark bench-rest-api-helper
+# python -m data_analytics_agent.benchmark bench-async-sessions --latency-ms 20
+# python -m data_analytics_agent.benchmark bench-storage-read --rows 200000
+# python -m data_analytics_agent.benchmark bench-decode --rows 1000000
+# python -m data_analytics_agent.benchmark bench-catalog-index --rows 100000
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import urllib.parse
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.run_bigquery_sql as run_bigquery_sql
+import data_analytics_agent.bigquery.bigquery_storage_read as bigquery_storage_read
+import data_analytics_agent.bigquery.bigquery_result_decoder as bigquery_result_decoder
+import data_analytics_agent.dataplex.data_catalog_index as data_catalog_index
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers every request with a small JSON body.  POST /token acts as the OAuth token endpoint."""
+    protocol_version = "HTTP/1.1" # Allows keep-alive
+    disable_nagle_algorithm = True # Headers and body are written separately, avoid the 40ms delayed-ACK stall
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.stats["connections"] += 1
+
+    def _send_json(self, status_code, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self):
+        content_length = int(self.headers.get("Content-Length", 0))
+        request_body = self.rfile.read(content_length) if content_length else b""
+
+        if self.server.latency_seconds:
+            time.sleep(self.server.latency_seconds)
+
+        if self.path.startswith("/token"):
+            with self.server.stats_lock:
+                self.server.stats["tokens_minted"] += 1
+            self._send_json(200, {"access_token": "stub-token", "expires_in": 3600, "token_type": "Bearer"})
+            return
+
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+        handler = self.server.route_handler
+        if handler is not None:
+            status_code, body = handler(self.command, self.path, request_body)
+        else:
+            status_code, body = 200, {"name": self.path, "state": "SUCCEEDED"}
+        self._send_json(status_code, body)
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_PATCH = _handle
+    do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass # Keep the benchmark output readable
+
+
+class _StubServer(ThreadingHTTPServer):
+    request_queue_size = 128 # The default listen backlog of 5 drops connections when many sessions connect at once
+
+
+def start_stub_server(latency_seconds: float = 0.0, route_handler=None):
+    """Starts the stub server on a free local port.  Returns (server, base_url)."""
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.latency_seconds = latency_seconds
+    server.route_handler = route_handler
+    server.stats_lock = threading.Lock()
+    server.stats = {"connections": 0, "tokens_minted": 0, "requests": 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def use_stub_credentials(base_url: str) -> None:
+    """Points Application Default Credentials at the stub token endpoint."""
+    import google.oauth2.credentials
+
+    adc = {
+        "type": "authorized_user",
+        "client_id": "stub-client",
+        "client_secret": "stub-secret",
+        "refresh_token": "stub-refresh-token"
+    }
+    # google-auth ignores token_uri for authorized_user files, so redirect the default endpoint instead
+    google.oauth2.credentials._GOOGLE_OAUTH2_TOKEN_ENDPOINT = f"{base_url}/token"
+    adc_file = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    json.dump(adc, adc_file)
+    adc_file.close()
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = adc_file.name
+    os.environ.pop("GOOGLE_CLOUD_PROJECT", None)
+
+
+def _reset_stats(server):
+    with server.stats_lock:
+        server.stats = {"connections": 0, "tokens_minted": 0, "requests": 0}
+
+
+def _legacy_rest_api_helper(url: str, http_verb: str, request_body: str) -> dict:
+    """The original rest_api_helper: new credentials, token refresh and TCP connection on every call."""
+    import google.auth.transport.requests
+    import requests
+    import google.auth
+
+    creds, project = google.auth.default()
+    auth_req = google.auth.transport.requests.Request()
+    creds.refresh(auth_req)
+    headers = {"Content-Type" : "application/json", "Authorization" : "Bearer " + creds.token}
+
+    if http_verb == "GET":
+        response = requests.get(url, headers=headers)
+    else:
+        response = requests.post(url, json=request_body, headers=headers)
+    return json.loads(response.content)
+
+
+def bench_rest_api_helper(num_calls: int = 20, latency_seconds: float = 0.0) -> dict:
+    """Times a sequence of REST calls through the legacy helper and the pooled helper."""
+    server, base_url = start_stub_server(latency_seconds)
+    use_stub_credentials(base_url)
+    urls = [f"{base_url}/v1/projects/p/locations/l/dataScans/scan-{i}" for i in range(num_calls)]
+    results = {}
+
+    for name, helper in [("before (legacy)", _legacy_rest_api_helper), ("after (pooled)", rest_api_helper.rest_api_helper)]:
+        _reset_stats(server)
+        start = time.perf_counter()
+        for url in urls:
+            helper(url, "GET", None)
+        elapsed = time.perf_counter() - start
+        results[name] = {"total_ms": round(elapsed * 1000, 1), "per_call_ms": round(elapsed * 1000 / num_calls, 2), **server.stats}
+
+    server.shutdown()
+    return results
+
+
+def bench_async_sessions(num_sessions: int = 50, calls_per_session: int = 5, latency_seconds: float = 0.02) -> dict:
+    """Simulates concurrent ADK sessions on one event loop calling tools that make REST calls.
+
+    "sync tools" call the blocking rest_api_helper from the event loop (what ADK does with a plain def tool).
+    "async tools" await rest_api_helper_async so the sessions overlap their network waits.
+    """
+    server, base_url = start_stub_server(latency_seconds)
+    use_stub_credentials(base_url)
+    rest_api_helper.get_access_token() # Mint the token outside of the timings
+    results = {}
+
+    async def sync_session(session_number):
+        for call_number in range(calls_per_session):
+            rest_api_helper.rest_api_helper(f"{base_url}/v1/sessions/{session_number}/calls/{call_number}", "GET", None)
+
+    async def async_session(session_number):
+        for call_number in range(calls_per_session):
+            await rest_api_helper.rest_api_helper_async(f"{base_url}/v1/sessions/{session_number}/calls/{call_number}", "GET", None)
+
+    async def run_sessions(session_function):
+        await asyncio.gather(*(session_function(i) for i in range(num_sessions)))
+        await rest_api_helper.close_async_client()
+
+    for name, session_function in [("sync tools", sync_session), ("async tools", async_session)]:
+        _reset_stats(server)
+        start = time.perf_counter()
+        asyncio.run(run_sessions(session_function))
+        elapsed = time.perf_counter() - start
+        total_requests = num_sessions * calls_per_session
+        results[name] = {"total_ms": round(elapsed * 1000, 1), "requests_per_second": round(total_requests / elapsed, 1), **server.stats}
+
+    server.shutdown()
+    return results
+
+
+_FIXTURE_SCHEMA = [
+    {"name": "id", "type": "INTEGER"},
+    {"name": "customer_name", "type": "STRING"},
+    {"name": "amount", "type": "FLOAT"},
+    {"name": "created_at", "type": "TIMESTAMP"},
+    {"name": "is_active", "type": "BOOLEAN"}
+]
+
+
+def _fixture_values(row_number: int) -> list:
+    """The values of one synthetic result row (the same data is used for the JSON and Arrow fixtures)."""
+    return [row_number, f"customer-{row_number % 5000}", row_number * 0.25, 1700000000.0 + row_number, row_number % 3 == 0]
+
+
+def _json_result_pages(num_rows: int, page_size: int) -> list:
+    """Serialized jobs.getQueryResults pages (f/v JSON encoding, values as strings) for the synthetic rows."""
+    pages = []
+    for page_start in range(0, num_rows, page_size):
+        rows = []
+        for row_number in range(page_start, min(page_start + page_size, num_rows)):
+            values = _fixture_values(row_number)
+            values[3] = int(values[3] * 1000000) # formatOptions.useInt64Timestamp
+            values[4] = "true" if values[4] else "false"
+            rows.append({"f": [{"v": str(value)} for value in values]})
+        page = {"schema": {"fields": _FIXTURE_SCHEMA}, "totalRows": str(num_rows), "rows": rows}
+        if page_start + page_size < num_rows:
+            page["pageToken"] = str(len(pages) + 1)
+        pages.append(json.dumps(page).encode("utf-8"))
+    return pages
+
+
+class _FixtureResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _FixtureSession:
+    """Stands in for the requests session, serving the serialized pages by pageToken."""
+    def __init__(self, pages):
+        self.pages = pages
+
+    def get(self, url, headers=None, timeout=None):
+        page_token = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)["pageToken"][0]
+        return _FixtureResponse(self.pages[int(page_token)])
+
+
+def _arrow_streams(num_rows: int, num_streams: int, batch_size: int):
+    """Serialized Arrow schema and record batches split over streams, as the Storage Read API sends them."""
+    import pyarrow
+
+    columns = list(zip(*(_fixture_values(row_number) for row_number in range(num_rows))))
+    table = pyarrow.table({
+        "id": pyarrow.array(columns[0], pyarrow.int64()),
+        "customer_name": pyarrow.array(columns[1], pyarrow.string()),
+        "amount": pyarrow.array(columns[2], pyarrow.float64()),
+        "created_at": pyarrow.array([int(value * 1000000) for value in columns[3]], pyarrow.timestamp("us", tz="UTC")),
+        "is_active": pyarrow.array(columns[4], pyarrow.bool_())
+    })
+    rows_per_stream = -(-num_rows // num_streams)
+    streams = []
+    for stream_start in range(0, num_rows, rows_per_stream):
+        stream_table = table.slice(stream_start, rows_per_stream)
+        streams.append([batch.serialize().to_pybytes() for batch in stream_table.to_batches(max_chunksize=batch_size)])
+    return table.schema.serialize().to_pybytes(), streams
+
+
+def bench_storage_read(num_rows: int = 200000, num_streams: int = 4) -> dict:
+    """Compares the JSON getQueryResults pagination with decoding Storage Read API Arrow streams (synthetic fixtures)."""
+    results = {}
+
+    pages = _json_result_pages(num_rows, page_size=20000)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")): # Silences the "Fetching next page" line logged per page, the timing covers paging and row decoding
+        rows = run_bigquery_sql._process_and_paginate_results(_FixtureSession(pages), json.loads(pages[0]), "project", "job", "US", {})
+    elapsed = time.perf_counter() - start
+    results["json pagination (rows)"] = {"total_ms": round(elapsed * 1000, 1), "rows": len(rows), "payload_bytes": sum(len(page) for page in pages)}
+    del rows
+
+    serialized_schema, streams = _arrow_streams(num_rows, num_streams, batch_size=10000)
+    payload_bytes = len(serialized_schema) + sum(len(batch) for stream in streams for batch in stream)
+
+    import pyarrow
+    start = time.perf_counter()
+    arrow_schema = bigquery_storage_read.arrow_schema_from_ipc(serialized_schema)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_streams) as executor:
+        stream_batches = list(executor.map(lambda stream: [bigquery_storage_read.arrow_batch_from_ipc(batch, arrow_schema) for batch in stream], streams))
+    arrow_table = pyarrow.Table.from_batches([batch for batches in stream_batches for batch in batches], schema=arrow_schema)
+    arrow_elapsed = time.perf_counter() - start
+    results[f"storage read ({num_streams} streams, arrow table)"] = {"total_ms": round(arrow_elapsed * 1000, 1), "rows": arrow_table.num_rows, "payload_bytes": payload_bytes}
+
+    start = time.perf_counter()
+    row_count = sum(1 for _ in bigquery_storage_read.iterate_arrow_rows(arrow_table))
+    elapsed = time.perf_counter() - start + arrow_elapsed
+    results[f"storage read ({num_streams} streams, rows)"] = {"total_ms": round(elapsed * 1000, 1), "rows": row_count, "payload_bytes": payload_bytes}
+
+    return results
+
+
+def _decode_raw_strings(pages: list):
+    """The original decoding: one dict per row holding the raw "v" strings."""
+    rows = []
+    for page in pages:
+        page_data = json.loads(page)
+        schema = [field['name'] for field in page_data['schema']['fields']]
+        rows.extend({schema[i]: cell.get('v') for i, cell in enumerate(row['f'])} for row in page_data['rows'])
+    return rows
+
+
+def _decode_typed_rows(pages: list):
+    decoder = bigquery_result_decoder.ResultDecoder(_FIXTURE_SCHEMA)
+    rows = []
+    for page in pages:
+        rows.extend(decoder.decode_row(row) for row in json.loads(page)['rows'])
+    return rows
+
+
+def _decode_typed_columns(pages: list):
+    decoder = bigquery_result_decoder.ResultDecoder(_FIXTURE_SCHEMA, json_safe=False)
+    columns = None
+    for page in pages:
+        columns = decoder.decode_columns(json.loads(page)['rows'], columns)
+    return columns
+
+
+def _decode_numpy_columns(pages: list):
+    decoder = bigquery_result_decoder.ResultDecoder(_FIXTURE_SCHEMA, json_safe=False)
+    return bigquery_result_decoder.columns_to_numpy(_decode_typed_columns(pages), decoder.column_types)
+
+
+def bench_decode(num_rows: int = 1000000) -> dict:
+    """Decode time and retained memory of a getQueryResults JSON fixture, raw strings vs typed rows vs columnar."""
+    pages = _json_result_pages(num_rows, page_size=100000)
+    parse_start = time.perf_counter()
+    for page in pages:
+        json.loads(page)
+    parse_ms = (time.perf_counter() - parse_start) * 1000
+    results = {"json.loads of the pages (included in every total)": {"total_ms": round(parse_ms, 1)}}
+
+    for name, decode in [("raw strings, dict per row (before)", _decode_raw_strings),
+                         ("typed, dict per row", _decode_typed_rows),
+                         ("typed, dict of lists", _decode_typed_columns),
+                         ("typed, numpy columns", _decode_numpy_columns)]:
+        start = time.perf_counter()
+        decoded = decode(pages)
+        elapsed = time.perf_counter() - start
+        del decoded
+
+        # Measured separately, tracemalloc slows the decoding down
+        tracemalloc.start()
+        decoded = decode(pages)
+        retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del decoded
+
+        results[name] = {"total_ms": round(elapsed * 1000, 1), "retained_mb": round(retained_bytes / 1048576, 1), "peak_mb": round(peak_bytes / 1048576, 1)}
+
+    return results
+
+
+def _catalog_entries(num_entries: int) -> list:
+    """Synthetic searchEntries results (as crawled for the catalog index): tables, views and datasets over 20 projects."""
+    subjects = ["customer", "order", "sales", "inventory", "payment", "shipment", "product", "campaign", "invoice", "employee"]
+    kinds = ["bigquery-table", "bigquery-table", "bigquery-table", "bigquery-view", "bigquery-dataset"]
+    results = []
+    for entry_number in range(num_entries):
+        project_id = f"project-{entry_number % 20:02d}"
+        dataset_id = f"{subjects[entry_number % 7]}_dataset_{entry_number % 50}"
+        table_id = f"{subjects[entry_number % 10]}_{subjects[(entry_number // 10) % 10]}_{entry_number}"
+        resource = f"projects/{project_id}/datasets/{dataset_id}/tables/{table_id}"
+        results.append({
+            "linkedResource": f"//bigquery.googleapis.com/{resource}",
+            "dataplexEntry": {
+                "name": f"projects/123/locations/us/entryGroups/@bigquery/entries/bigquery.googleapis.com/{resource}",
+                "entryType": f"projects/dataplex-types/locations/global/entryTypes/{kinds[entry_number % 5]}",
+                "updateTime": f"2024-{1 + entry_number % 12:02d}-{1 + entry_number % 28:02d}T10:00:00.000000Z",
+                "fullyQualifiedName": f"bigquery:{project_id}.{dataset_id}.{table_id}",
+                "entrySource": {
+                    "resource": resource,
+                    "system": "BIGQUERY",
+                    "location": "us",
+                    "displayName": table_id,
+                    "description": f"The {subjects[entry_number % 10]} facts loaded daily from the {subjects[(entry_number // 10) % 10]} system.",
+                    "ancestors": [{"name": f"projects/{project_id}/datasets/{dataset_id}", "type": "dataplex-types.global.bigquery-dataset"}]
+                }
+            }
+        })
+    return results
+
+
+def bench_catalog_index(num_entries: int = 100000, repeat: int = 20) -> dict:
+    """Build time, size and query latency of the local catalog index, compared with scanning the entries in Python."""
+    results = _catalog_entries(num_entries)
+    index = data_catalog_index.CatalogIndex(":memory:")
+    start = time.perf_counter()
+    for batch_start in range(0, num_entries, 500):
+        index.upsert(results[batch_start:batch_start + 500], crawl_id=1)
+    build_ms = (time.perf_counter() - start) * 1000
+    output = {"build": {"entries": index.count(), "total_ms": round(build_ms, 1), "size_mb": round(index.size_bytes() / 1048576, 1)}}
+
+    projected = [(result["dataplexEntry"]["entrySource"]["displayName"], result["dataplexEntry"]["entrySource"]["description"]) for result in results]
+    queries = ["name:customer_order", "inventory", "displayname:payment_sales_4242", "name:invoice type=TABLE system=BIGQUERY",
+               "projectid:project-07 description:campaign", "fully_qualified_name:sales_dataset_3.", "name:_9 type=VIEW"]
+    for query in queries:
+        latencies = []
+        for _ in range(repeat):
+            query_start = time.perf_counter()
+            found = index.search(query, 50)
+            latencies.append((time.perf_counter() - query_start) * 1000)
+        latencies.sort()
+        output[query] = {"results": len(found), "p50_ms": round(latencies[len(latencies) // 2], 3), "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3)}
+
+    # What answering "inventory" would cost without the index: a substring scan of every entry
+    scan_start = time.perf_counter()
+    matches = [name for name, description in projected if "inventory" in name.lower() or "inventory" in description.lower()][:50]
+    output["python substring scan (inventory)"] = {"results": len(matches), "total_ms": round((time.perf_counter() - scan_start) * 1000, 3)}
+    return output
+
+
+if __name__ == "__main__":
+    print()
+    print()
+    print("===================================================================================================")
+    print()
+    print()
+
+    parser = argparse.ArgumentParser(description="Run local benchmarks for the data analytics agent.")
+    parser.add_argument("benchmark_name", type=str, help="The name of the benchmark to run.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial server latency per request.")
+    parser.add_argument("--rows", type=int, default=200000, help="Number of rows in the synthetic result fixtures.")
+
+    args = parser.parse_args()
+
+    if args.benchmark_name == "bench-rest-api-helper":
+        results = bench_rest_api_helper(20, args.latency_ms / 1000)
+        print(f"bench-rest-api-helper (20 sequential calls): {json.dumps(results, indent=2)}")
+
+    elif args.benchmark_name == "bench-async-sessions":
+        results = bench_async_sessions(50, 5, args.latency_ms / 1000)
+        print(f"bench-async-sessions (50 concurrent sessions x 5 calls): {json.dumps(results, indent=2)}")
+
+    elif args.benchmark_name == "bench-storage-read":
+        results = bench_storage_read(args.rows)
+        print(f"bench-storage-read ({args.rows} rows): {json.dumps(results, indent=2)}")
+
+    elif args.benchmark_name == "bench-decode":
+        results = bench_decode(args.rows)
+        print(f"bench-decode ({args.rows} rows): {json.dumps(results, indent=2)}")
+
+    elif args.benchmark_name == "bench-catalog-index":
+        results = bench_catalog_index(args.rows)
+        print(f"bench-catalog-index ({args.rows} entries): {json.dumps(results, indent=2)}")
+
+    else:
+        print(f"Error: Benchmark '{args.benchmark_name}' not found.")
+
+    print()
+    print()
+    print("===================================================================================================")
+    print()
+    print()
@@ -0,0 +1,136 @@
+import json
+import base64
+import decimal
+import datetime
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# NUMERIC values with more significant digits than this are kept as strings in JSON safe mode (a float would round them)
+_MAX_FLOAT_DIGITS = 15
+
+
+def _parse_timestamp(value: str) -> datetime.datetime:
+    """TIMESTAMP values are int64 microseconds (formatOptions.useInt64Timestamp) or float seconds ("1.7E9")."""
+    if value.lstrip("-").isdigit():
+        return _EPOCH + datetime.timedelta(microseconds=int(value))
+    return _EPOCH + datetime.timedelta(seconds=float(value))
+
+
+def _parse_bool(value: str) -> bool:
+    return value == "true"
+
+
+def _numeric_json_value(value: str):
+    """NUMERIC/BIGNUMERIC as a JSON number when that does not lose precision, otherwise as the exact string."""
+    digits = value.lstrip("-").replace(".", "").lstrip("0")
+    if len(digits) > _MAX_FLOAT_DIGITS:
+        return value
+    return float(value) if "." in value else int(value)
+
+
+def decimal_json_value(value: decimal.Decimal):
+    """A Decimal (e.g. read from Arrow, which pads to the column scale) as _numeric_json_value returns the REST string."""
+    text = format(value, "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return _numeric_json_value(text)
+
+
+# BigQuery type -> (typed converter, JSON safe converter).  Both receive the non-null string value.
+_CONVERTERS = {
+    "INTEGER": (int, int),
+    "INT64": (int, int),
+    "FLOAT": (float, float),
+    "FLOAT64": (float, float),
+    "BOOLEAN": (_parse_bool, _parse_bool),
+    "BOOL": (_parse_bool, _parse_bool),
+    "NUMERIC": (decimal.Decimal, _numeric_json_value),
+    "BIGNUMERIC": (decimal.Decimal, _numeric_json_value),
+    "TIMESTAMP": (_parse_timestamp, lambda value: _parse_timestamp(value).isoformat()),
+    "DATE": (datetime.date.fromisoformat, str),
+    "DATETIME": (datetime.datetime.fromisoformat, str),
+    "TIME": (datetime.time.fromisoformat, str),
+    "BYTES": (base64.b64decode, str),
+    "JSON": (json.loads, json.loads)
+}
+
+
+def _build_field_converter(field: dict, json_safe: bool):
+    """Returns a function converting the raw "v" of one field (handles NULL, REPEATED and RECORD/STRUCT)."""
+    field_type = field.get("type", "STRING").upper()
+
+    if field_type in ("RECORD", "STRUCT"):
+        nested_decoder = ResultDecoder(field.get("fields", []), json_safe)
+        convert = lambda value: nested_decoder.decode_row(value)
+    else:
+        converters = _CONVERTERS.get(field_type)
+        convert = (converters[1] if json_safe else converters[0]) if converters else str
+
+    if field.get("mode", "NULLABLE").upper() == "REPEATED":
+        return lambda value: [] if value is None else [None if item["v"] is None else convert(item["v"]) for item in value]
+    return lambda value: None if value is None else convert(value)
+
+
+class ResultDecoder:
+    """
+    Decodes BigQuery REST result rows ({"f": [{"v": ...}]}) using the result schema.
+
+    With json_safe=True (what the tools return) numbers and booleans become JSON numbers and booleans,
+    TIMESTAMP becomes an ISO-8601 string and DATE/DATETIME/TIME/BYTES keep their string form.  With
+    json_safe=False the Python types are used: Decimal, datetime, date, time and bytes.
+    """
+
+    def __init__(self, schema_fields: list, json_safe: bool = True):
+        self.column_names = [field["name"] for field in schema_fields]
+        self.column_types = [field.get("type", "STRING").upper() for field in schema_fields]
+        self._converters = [_build_field_converter(field, json_safe) for field in schema_fields]
+
+    def decode_values(self, row: dict) -> list:
+        """Returns the typed values of one row, in column order."""
+        return [convert(cell["v"]) for convert, cell in zip(self._converters, row["f"])]
+
+    def decode_row(self, row: dict) -> dict:
+        """Returns one row as {column_name: typed value}."""
+        return dict(zip(self.column_names, self.decode_values(row)))
+
+    def decode_columns(self, rows: list, columns: dict = None) -> dict:
+        """Decodes rows straight into a column-oriented dict of lists, appending to columns when given."""
+        if columns is None:
+            columns = {name: [] for name in self.column_names}
+        for column_index, (convert, name) in enumerate(zip(self._converters, self.column_names)):
+            columns[name].extend([convert(row["f"][column_index]["v"]) for row in rows])
+        return columns
+
+
+def rows_to_columns(rows: list, column_names: list) -> dict:
+    """Turns a list of row dicts into {column_name: [values]} (keys are no longer repeated per row)."""
+    return {name: [row.get(name) for row in rows] for name in column_names}
+
+
+def columns_to_numpy(columns: dict, column_types: list) -> dict:
+    """
+    Converts decoded columns (json_safe=False) to NumPy arrays for vectorized aggregation.
+
+    INTEGER/BOOLEAN columns with NULLs become float64 (NaN for NULL), numeric columns become
+    int64/float64/bool arrays and every other column stays an object array.
+    """
+    import numpy
+
+    arrays = {}
+    for (name, values), column_type in zip(columns.items(), column_types):
+        has_nulls = any(value is None for value in values)
+        if column_type in ("INTEGER", "INT64", "BOOLEAN", "BOOL") and not has_nulls:
+            arrays[name] = numpy.array(values, dtype=numpy.int64 if column_type.startswith("INT") else numpy.bool_)
+        elif column_type in ("INTEGER", "INT64", "FLOAT", "FLOAT64", "BOOLEAN", "BOOL"):
+            arrays[name] = numpy.array([numpy.nan if value is None else value for value in values], dtype=numpy.float64)
+        else:
+            arrays[name] = numpy.array(values, dtype=object)
+    return arrays
+
+
+def columns_to_arrow(columns: dict):
+    """Converts decoded columns (json_safe=False) to a pyarrow.Table (types are inferred from the Python values)."""
+    import pyarrow
+
+    return pyarrow.table(columns)
@@ -0,0 +1,151 @@
+import os
+import re
+import datetime
+import decimal
+import base64
+import concurrent.futures
+import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.bigquery_result_decoder as bigquery_result_decoder
+
+
+# The BigQuery Storage Read API path is opt-in: it needs google-cloud-bigquery-storage and pyarrow
+# pip install google-cloud-bigquery-storage pyarrow
+def is_enabled() -> bool:
+    """Returns True if the Storage Read API fast path is switched on and its libraries are installed."""
+    if os.getenv("AGENT_ENV_BIGQUERY_STORAGE_READ_ENABLED", "false").lower() != "true":
+        return False
+    try:
+        import pyarrow
+        from google.cloud import bigquery_storage_v1
+    except ImportError:
+        print("bigquery_storage_read -> AGENT_ENV_BIGQUERY_STORAGE_READ_ENABLED is set but google-cloud-bigquery-storage/pyarrow are not installed.")
+        return False
+    return True
+
+
+def get_min_rows() -> int:
+    """Result sets with at least this many rows are read with the Storage Read API (when enabled)."""
+    return int(os.getenv("AGENT_ENV_BIGQUERY_STORAGE_READ_MIN_ROWS", "100000"))
+
+
+def get_max_streams() -> int:
+    """The maximum number of streams read in parallel."""
+    return int(os.getenv("AGENT_ENV_BIGQUERY_STORAGE_READ_MAX_STREAMS", "8"))
+
+
+def sql_has_order_by(sql: str) -> bool:
+    """Reading a table with several streams does not keep the row order, so ORDER BY queries use a single stream."""
+    return re.search(r"\bORDER\s+BY\b", sql, flags=re.IGNORECASE) is not None
+
+
+def arrow_schema_from_ipc(serialized_schema: bytes):
+    """Decodes the Arrow IPC schema sent at the start of a read session."""
+    import pyarrow
+
+    return pyarrow.ipc.read_schema(pyarrow.py_buffer(serialized_schema))
+
+
+def arrow_batch_from_ipc(serialized_record_batch: bytes, arrow_schema):
+    """Decodes one Arrow IPC record batch (a ReadRowsResponse payload) without copying the buffers."""
+    import pyarrow
+
+    return pyarrow.ipc.read_record_batch(pyarrow.py_buffer(serialized_record_batch), arrow_schema)
+
+
+def _read_stream(client, stream_name: str, arrow_schema) -> list:
+    """Reads every record batch of one stream.  ReadRowsStream reconnects on transient errors by itself."""
+    batches = []
+    for response in client.read_rows(stream_name):
+        batches.append(arrow_batch_from_ipc(response.arrow_record_batch.serialized_record_batch, arrow_schema))
+    return batches
+
+
+def read_table_arrow(project_id: str, dataset_id: str, table_id: str, max_streams: int = None):
+    """
+    Reads a whole BigQuery table (e.g. a query's destination table) with the Storage Read API.
+
+    The read session is split into up to max_streams streams which are read in parallel.  The
+    batches are returned in stream order (a single stream keeps the table's row order).
+
+    Returns:
+        pyarrow.Table: The table contents.
+    """
+    import pyarrow
+    from google.cloud import bigquery_storage_v1
+    from google.cloud.bigquery_storage_v1 import types
+
+    if max_streams is None:
+        max_streams = get_max_streams()
+
+    client = bigquery_storage_v1.BigQueryReadClient(credentials=rest_api_helper.get_credentials())
+    requested_session = types.ReadSession(
+        table=f"projects/{project_id}/datasets/{dataset_id}/tables/{table_id}",
+        data_format=types.DataFormat.ARROW
+    )
+    read_session = client.create_read_session(
+        parent=f"projects/{os.getenv('AGENT_ENV_PROJECT_ID', project_id)}",
+        read_session=requested_session,
+        max_stream_count=max_streams
+    )
+
+    arrow_schema = arrow_schema_from_ipc(read_session.arrow_schema.serialized_schema)
+    stream_names = [stream.name for stream in read_session.streams]
+    print(f"bigquery_storage_read -> reading {project_id}.{dataset_id}.{table_id} with {len(stream_names)} stream(s).")
+
+    if not stream_names: # An empty table has no streams
+        return arrow_schema.empty_table()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(stream_names)) as executor:
+        stream_batches = list(executor.map(lambda stream_name: _read_stream(client, stream_name, arrow_schema), stream_names))
+
+    return pyarrow.Table.from_batches([batch for batches in stream_batches for batch in batches], schema=arrow_schema)
+
+
+def _to_json_value(value):
+    """
+    Converts the Python values produced by Arrow into the JSON values bigquery_result_decoder returns for the
+    same column read with getQueryResults, so a result does not change type with its row count.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat() # TIMESTAMP is timezone aware (UTC) in Arrow, so it keeps its +00:00
+    if isinstance(value, decimal.Decimal):
+        return bigquery_result_decoder.decimal_json_value(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("utf-8")
+    if isinstance(value, list):
+        return [_to_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json_value(item) for key, item in value.items()}
+    return value
+
+
+def _json_safe_batch(batch):
+    """Casts DATE columns to strings inside Arrow (vectorized), the Arrow string form is the one getQueryResults uses.
+
+    Returns the batch and the names of the columns that still need _to_json_value: TIMESTAMP, DATETIME and
+    TIME (Arrow casts them to "2024-01-01 00:00:00.000000Z", not ISO-8601), NUMERIC (Arrow pads it to the
+    scale), binary and nested types.
+    """
+    import pyarrow
+
+    columns = []
+    python_columns = []
+    for field, column in zip(batch.schema, batch.columns):
+        field_type = field.type
+        if pyarrow.types.is_date(field_type):
+            column = column.cast(pyarrow.string())
+        elif pyarrow.types.is_temporal(field_type) or pyarrow.types.is_decimal(field_type) or \
+                pyarrow.types.is_binary(field_type) or pyarrow.types.is_nested(field_type):
+            python_columns.append(field.name)
+        columns.append(column)
+    return pyarrow.RecordBatch.from_arrays(columns, names=batch.schema.names), python_columns
+
+
+def iterate_arrow_rows(arrow_table):
+    """Lazily materializes an Arrow table as JSON-safe row dicts, one record batch at a time."""
+    for batch in arrow_table.to_batches():
+        batch, python_columns = _json_safe_batch(batch)
+        for row in batch.to_pylist():
+            for name in python_columns:
+                row[name] = _to_json_value(row[name])
+            yield row
@@ -0,0 +1,189 @@
+import os
+import threading
+from typing import Optional
+from google.adk.tools import ToolContext
+import data_analytics_agent.cache_helper as cache_helper
+import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.query_parameters as sql_parameters
+
+
+# Key in the ADK session state holding the bytes processed by the queries run so far in the session
+SESSION_BYTES_STATE_KEY = "bigquery_bytes_processed"
+
+# run_bigquery_sql_batch updates the session total from several threads
+_session_bytes_lock = threading.Lock()
+
+# Dry-run estimates keyed by (project, region, normalized SQL), so re-estimating the same statement makes no API call
+_estimate_cache = cache_helper.TTLCache(
+    max_entries=int(os.getenv("AGENT_ENV_BIGQUERY_ESTIMATE_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("AGENT_ENV_BIGQUERY_ESTIMATE_CACHE_TTL_SECONDS", "300"))
+)
+
+
+def get_bytes_budget() -> tuple:
+    """Returns (max_bytes_per_query, max_bytes_per_session), 0 meaning no limit."""
+    max_bytes_per_query = int(os.getenv("AGENT_ENV_BIGQUERY_MAX_BYTES_BILLED_PER_QUERY", str(100 * 1024 ** 3)))
+    max_bytes_per_session = int(os.getenv("AGENT_ENV_BIGQUERY_MAX_BYTES_BILLED_PER_SESSION", str(1024 ** 4)))
+    return max_bytes_per_query, max_bytes_per_session
+
+
+def is_guardrail_enabled() -> bool:
+    return os.getenv("AGENT_ENV_BIGQUERY_DRY_RUN_ENABLED", "true").lower() == "true"
+
+
+def get_estimate_cache_stats() -> dict:
+    """Returns the hit/miss counters of the dry-run estimate cache."""
+    return _estimate_cache.stats()
+
+
+def dry_run_sql(sql: str, bound_parameters: dict = None) -> dict:
+    """
+    Runs a dryRun job for the SQL and returns what it would process, using the estimate cache.
+
+    bound_parameters (from query_parameters.bind_parameters) are part of the cache key since the values
+    can change partition pruning.
+
+    Raises rest_api_helper.RestApiError if BigQuery rejects the statement (e.g. a syntax error).
+
+    Returns:
+        dict: {"total_bytes_processed": int, "referenced_tables": ["project.dataset.table"], "statement_type": "SELECT"}
+    """
+    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+    bigquery_region = os.getenv("AGENT_ENV_BIGQUERY_REGION")
+    statement = sql_parameters.prepare_statement(sql)
+    cache_key = (project_id, bigquery_region, statement["normalized_sql"], sql_parameters.parameters_cache_key(bound_parameters or {}))
+
+    estimate = _estimate_cache.get(cache_key)
+    if estimate is not None:
+        return estimate
+
+    # jobs.insert (unlike jobs.query) returns the referenced tables of a dry run
+    url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/jobs"
+    request_body = {
+        "jobReference": {"projectId": project_id, "location": bigquery_region},
+        "configuration": {"dryRun": True, "query": dict({"query": sql, "useLegacySql": False}, **(bound_parameters or {}))}
+    }
+    response = rest_api_helper.rest_api_helper(url, "POST", request_body)
+    query_statistics = response.get("statistics", {}).get("query", {})
+
+    estimate = {
+        "total_bytes_processed": int(query_statistics.get("totalBytesProcessed", response.get("statistics", {}).get("totalBytesProcessed", 0))),
+        "referenced_tables": [f"{table['projectId']}.{table['datasetId']}.{table['tableId']}" for table in query_statistics.get("referencedTables", [])],
+        "statement_type": query_statistics.get("statementType")
+    }
+    _estimate_cache.set(cache_key, estimate)
+    print(f"estimate_bigquery_sql_cost -> dry run: {estimate}")
+    return estimate
+
+
+def get_session_bytes(tool_context) -> int:
+    """Returns the bytes processed by the queries already run in this ADK session (0 without a tool context)."""
+    if tool_context is None:
+        return 0
+    return int(tool_context.state.get(SESSION_BYTES_STATE_KEY, 0))
+
+
+def add_session_bytes(tool_context, bytes_processed: int, reserved_bytes: int = 0) -> None:
+    """
+    Adds the bytes processed by a query to the ADK session total, replacing the estimate that
+    check_budget(reserve=True) reserved for it (pass 0 bytes processed to release a reservation).
+    """
+    if tool_context is None:
+        return
+    with _session_bytes_lock:
+        tool_context.state[SESSION_BYTES_STATE_KEY] = get_session_bytes(tool_context) + bytes_processed - reserved_bytes
+
+
+def check_budget(estimate: dict, tool_context=None, reserve: bool = False) -> dict:
+    """
+    Compares a dry-run estimate with the per-query and per-session budgets.
+
+    With reserve=True a query within the budget has its estimated bytes added to the session total in the
+    same step, so concurrent queries (run_bigquery_sql_batch) cannot all pass the check against the same
+    total and go over the session budget together.  The caller replaces the reservation with the bytes the
+    job processed through add_session_bytes.
+
+    Returns:
+        dict: The estimate plus "max_bytes_per_query", "max_bytes_per_session", "session_bytes_processed",
+              "within_budget" (bool), "reason" (None or why it is too expensive), "maximum_bytes_billed"
+              (the cap to set on the real job, 0 only when no limit is configured) and "reserved_bytes".
+    """
+    max_bytes_per_query, max_bytes_per_session = get_bytes_budget()
+    total_bytes = estimate["total_bytes_processed"]
+
+    with _session_bytes_lock:
+        session_bytes = get_session_bytes(tool_context)
+
+        reason = None
+        if max_bytes_per_query and total_bytes > max_bytes_per_query:
+            reason = f"The query would process {total_bytes:,} bytes which is over the per-query limit of {max_bytes_per_query:,} bytes."
+        elif max_bytes_per_session and session_bytes + total_bytes > max_bytes_per_session:
+            reason = (f"The query would process {total_bytes:,} bytes and {session_bytes:,} bytes were already processed in this session, "
+                      f"which is over the per-session limit of {max_bytes_per_session:,} bytes.")
+
+        reserved_bytes = 0
+        if reserve and reason is None and tool_context is not None:
+            reserved_bytes = total_bytes
+            tool_context.state[SESSION_BYTES_STATE_KEY] = session_bytes + reserved_bytes
+
+    # The real job may not bill more than what is left of either budget.  A maximumBytesBilled of 0 means
+    # no cap to BigQuery, so an exhausted session budget still caps the job at 1 byte.
+    limits = []
+    if max_bytes_per_query:
+        limits.append(max_bytes_per_query)
+    if max_bytes_per_session:
+        limits.append(max(1, max_bytes_per_session - session_bytes))
+
+    return dict(estimate,
+                max_bytes_per_query=max_bytes_per_query,
+                max_bytes_per_session=max_bytes_per_session,
+                session_bytes_processed=session_bytes,
+                within_budget=reason is None,
+                reason=reason,
+                maximum_bytes_billed=min(limits) if limits else 0,
+                reserved_bytes=reserved_bytes)
+
+
+def estimate_bigquery_sql_cost(sql: str, query_parameters: Optional[dict] = None, tool_context: ToolContext = None) -> dict:
+    """Estimates how much data a SQL statement would scan in BigQuery without running it (a dry run).
+
+    Use this before running a query against large tables.  If the estimate is over the budget, add
+    filters (especially on partition columns), select fewer columns or query smaller tables.
+
+    Args:
+        sql (str): The full SQL statement to estimate.
+        query_parameters (dict, optional): Values for the @name parameters in the SQL (as for run_bigquery_sql).
+
+    Returns:
+        dict:
+        {
+            "status": "success",
+            "tool_name": "estimate_bigquery_sql_cost",
+            "query": "The SQL statement used",
+            "messages": ["List of messages during processing"],
+            "results": {
+                "total_bytes_processed": 1073741824,
+                "referenced_tables": ["project.dataset.table"],
+                "statement_type": "SELECT",
+                "max_bytes_per_query": 107374182400,
+                "max_bytes_per_session": 1099511627776,
+                "session_bytes_processed": 0,
+                "within_budget": True,
+                "reason": None,
+                "maximum_bytes_billed": 107374182400,
+                "reserved_bytes": 0
+            }
+        }
+    """
+    messages = []
+    try:
+        bound_parameters = sql_parameters.bind_parameters(sql_parameters.prepare_statement(sql), query_parameters)
+        estimate = check_budget(dry_run_sql(sql, bound_parameters), tool_context)
+    except Exception as e:
+        messages.append(f"The dry run failed: {e}")
+        return { "status": "failed", "tool_name": "estimate_bigquery_sql_cost", "query": sql, "messages": messages, "results": None }
+
+    messages.append(f"The query would process {estimate['total_bytes_processed']:,} bytes.")
+    if estimate["reason"]:
+        messages.append(estimate["reason"])
+    return { "status": "success", "tool_name": "estimate_bigquery_sql_cost", "query": sql, "messages": messages, "results": estimate }
@@ -1,17 +1,184 @@
+import os
+import re
 import json
+import math
+import time
+import fnmatch
+import data_analytics_agent.cache_helper as cache_helper
 import data_analytics_agent.rest_api_helper as rest_api_helper
 import data_analytics_agent.bigquery.run_bigquery_sql as bq_sql 
 
-def get_bigquery_table_list() -> dict:
+
+# Process level cache of the table catalog keyed by (project_id, bigquery_region).
+# Once the TTL expires the catalog is refreshed incrementally: only tables created since the last read have their DDL
+# sent back and parsed (INFORMATION_SCHEMA still scans the DDL and columns of every table, so this saves transfer and
+# parsing, not bytes billed).  INFORMATION_SCHEMA.TABLES has no last modified time, so a schema change made outside
+# the agent (ALTER TABLE, SET OPTIONS) keeps the creation_time; the catalog is reloaded in full every
+# AGENT_ENV_TABLE_CATALOG_FULL_REFRESH_SECONDS to pick those up.  DDL run through run_bigquery_sql drops it right away.
+_table_catalog_cache = cache_helper.TTLCache(
+    max_entries=int(os.getenv("AGENT_ENV_TABLE_CATALOG_CACHE_MAX_ENTRIES", "16")),
+    max_bytes=int(os.getenv("AGENT_ENV_TABLE_CATALOG_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("AGENT_ENV_TABLE_CATALOG_CACHE_TTL_SECONDS", "300"))
+)
+
+
+def get_full_refresh_seconds() -> float:
+    return float(os.getenv("AGENT_ENV_TABLE_CATALOG_FULL_REFRESH_SECONDS", "3600"))
+
+
+def invalidate_table_catalog(sql: str = None) -> None:
+    """Drops the cached table catalogs so the next call re-reads INFORMATION_SCHEMA.  Called after DDL runs through run_bigquery_sql."""
+    _table_catalog_cache.clear()
+
+bq_sql.register_ddl_listener(invalidate_table_catalog)
+
+
+# Relative weight of a token depending on where it was found
+_TABLE_NAME_WEIGHT = 3.0
+_DATASET_NAME_WEIGHT = 1.5
+_COLUMN_NAME_WEIGHT = 1.0
+
+_STOP_WORDS = {"a", "an", "the", "of", "for", "in", "on", "by", "to", "and", "or", "is", "are", "what", "which",
+               "how", "many", "much", "show", "me", "list", "get", "give", "all", "with", "from", "per", "each", "my"}
+
+
+def _tokenize(text: str) -> list:
+    """Splits names and questions into lowercase word tokens (snake_case, camelCase and punctuation aware)."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text or "")
+    tokens = []
+    for token in re.split(r"[^A-Za-z0-9]+", text.lower()):
+        if not token or token in _STOP_WORDS:
+            continue
+        # Cheap plural folding so "orders" matches "order"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _build_table_index(tables: dict) -> dict:
+    """Builds an inverted index {token: {table_key: weight}} over dataset, table and column names."""
+    index = {}
+    for table_key, table in tables.items():
+        for names, weight in ((table["table_name"], _TABLE_NAME_WEIGHT),
+                              (table["dataset_id"], _DATASET_NAME_WEIGHT),
+                              (" ".join(table.get("column_names", [])), _COLUMN_NAME_WEIGHT)):
+            for token in _tokenize(names):
+                postings = index.setdefault(token, {})
+                postings[table_key] = max(postings.get(table_key, 0.0), weight)
+    return index
+
+
+def _rank_tables(catalog: dict, question: str) -> list:
+    """Returns [(table_key, score)] ordered by lexical relevance to the question (IDF weighted token matches)."""
+    index = catalog["index"]
+    table_count = max(len(catalog["tables"]), 1)
+    scores = {}
+    for token in set(_tokenize(question)):
+        postings = index.get(token)
+        if not postings:
+            continue
+        idf = math.log(1 + table_count / len(postings))
+        for table_key, weight in postings.items():
+            scores[table_key] = scores.get(table_key, 0.0) + weight * idf
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _load_table_catalog(project_id: str, bigquery_region: str, previous_catalog: dict = None) -> dict:
+    """
+    Reads the table catalog from INFORMATION_SCHEMA.TABLES.
+
+    When a previous catalog is passed, only tables created at or after its watermark (CREATE OR REPLACE
+    resets creation_time) have their DDL returned; the other tables keep their cached DDL and dropped
+    tables fall out of the catalog.  Changes to an existing table's schema are not detected this way,
+    get_table_catalog passes no previous catalog once the last full load is too old.
+
+    Returns:
+        dict: {"tables": {"dataset.table": {...}}, "watermark_micros": int, "tables_read": int,
+               "full_loaded_at": epoch seconds of the last full load, "index": {...}}
+    """
+    watermark_micros = previous_catalog["watermark_micros"] if previous_catalog else -1
+    previous_tables = previous_catalog["tables"] if previous_catalog else {}
+
+    sql = f"""
+    SELECT
+        t.table_catalog AS project_id,
+        t.table_schema AS dataset_id,
+        t.table_name,
+        UNIX_MICROS(t.creation_time) AS creation_time_micros,
+        IF(UNIX_MICROS(t.creation_time) >= @watermark_micros, t.ddl, NULL) AS table_ddl,
+        IF(UNIX_MICROS(t.creation_time) >= @watermark_micros, c.column_names, NULL) AS column_names
+    FROM `{project_id}.region-{bigquery_region}.INFORMATION_SCHEMA.TABLES` AS t
+    LEFT JOIN (
+        SELECT table_schema, table_name, STRING_AGG(column_name, ',' ORDER BY ordinal_position) AS column_names
+        FROM `{project_id}.region-{bigquery_region}.INFORMATION_SCHEMA.COLUMNS`
+        GROUP BY table_schema, table_name
+    ) AS c
+    ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+    """
+
+    tables = {}
+    tables_read = 0
+    new_watermark_micros = watermark_micros
+    # The catalog is read in full (the run_bigquery_sql tool would cap the rows).  The watermark is a
+    # parameter so every refresh sends the same statement text.
+    for row in bq_sql.iterate_bigquery_sql_rows(sql, {"watermark_micros": watermark_micros}):
+        table_key = f"{row['dataset_id']}.{row['table_name']}"
+        new_watermark_micros = max(new_watermark_micros, int(row["creation_time_micros"]))
+
+        if row["table_ddl"] is None and table_key in previous_tables:
+            tables[table_key] = previous_tables[table_key]
+        else:
+            tables[table_key] = {
+                "project_id": row["project_id"],
+                "dataset_id": row["dataset_id"],
+                "table_name": row["table_name"],
+                "table_ddl": row["table_ddl"],
+                "column_names": row["column_names"].split(",") if row["column_names"] else []
+            }
+            tables_read += 1
+
+    full_loaded_at = previous_catalog["full_loaded_at"] if previous_catalog else time.time()
+    return {"tables": tables, "watermark_micros": new_watermark_micros, "tables_read": tables_read,
+            "full_loaded_at": full_loaded_at, "index": _build_table_index(tables)}
+
+
+def get_table_catalog(project_id: str, bigquery_region: str) -> dict:
+    """
+    Returns the (cached) table catalog for the project and region.  When the TTL has expired it is refreshed
+    incrementally, or reloaded in full once the last full load is older than get_full_refresh_seconds().
+    """
+    cache_key = (project_id, bigquery_region)
+
+    catalog = _table_catalog_cache.get(cache_key)
+    if catalog is not None:
+        return catalog
+
+    previous_catalog = _table_catalog_cache.get_stale(cache_key)
+    if previous_catalog is not None and time.time() - previous_catalog.get("full_loaded_at", 0) >= get_full_refresh_seconds():
+        previous_catalog = None
+    catalog = _load_table_catalog(project_id, bigquery_region, previous_catalog)
+    _table_catalog_cache.set(cache_key, catalog)
+    return catalog
+
+
+def get_bigquery_table_list(question: str = "", dataset_filter: str = "", table_name_pattern: str = "",
+                            max_results: int = 0, include_ddl: bool = True) -> dict:
     """
     Gathers all the tables in BigQuery.
     This will gather all the tables along with the specific dataset in which they reside.
     This is useful when generating SQL for BigQuery.
     This tool should be called before calling run_bigquery_sql in order to get the data needed to construct a valid SQL statement.
     This tool also is useful to get the correct dataset and table names.  The user might use a shortened or mispelled name.
+    Pass the user's question to only get the most relevant tables, this keeps the response small in large warehouses.
 
     Args:
-        None
+        question (str, optional): The user's question.  When given only the tables whose dataset, table or column names
+                                  best match the question are returned (most relevant first, 10 tables unless max_results is set).
+        dataset_filter (str, optional): Only return tables in these datasets (comma separated, case insensitive).
+        table_name_pattern (str, optional): Only return tables whose name matches this wildcard pattern (e.g. "sales*", "*order*").
+        max_results (int, optional): The maximum number of tables to return.  0 returns every matching table.
+        include_ddl (bool, optional): When False the table_ddl is omitted and only the column_names are returned.
 
     Returns:
         dict:
@@ -37,27 +204,54 @@ def get_bigquery_table_list() -> dict:
         }        
 
     """
-    import os
-
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     bigquery_region = os.getenv("AGENT_ENV_BIGQUERY_REGION")
     messages = []
 
-    sql = f"""
-    SELECT
-        table_catalog AS project_id,
-        table_schema AS dataset_id,
-        table_name,
-        ddl as table_ddl
-    FROM `{project_id}.region-{bigquery_region}.INFORMATION_SCHEMA.TABLES`
-    """
-
     try:
-        # Call the generic runner method to execute the SQL
-        json_result = bq_sql.run_bigquery_sql(sql)
-        print(f"get_bigquery_table_list -> response: {json.dumps(json_result, indent=2)}")
+        catalog = get_table_catalog(project_id, bigquery_region)
+        tables = catalog["tables"]
+
+        if question:
+            ranked = _rank_tables(catalog, question)
+            table_keys = [table_key for table_key, _ in ranked]
+            scores = dict(ranked)
+            if max_results <= 0:
+                max_results = 10
+        else:
+            table_keys = list(tables.keys())
+            scores = None
 
-        return_value = { "status": "success", "tool_name": "get_bigquery_table_list", "query": None, "messages": messages, "results": json_result }
+        if dataset_filter:
+            datasets = {dataset.strip().lower() for dataset in dataset_filter.split(",") if dataset.strip()}
+            table_keys = [table_key for table_key in table_keys if tables[table_key]["dataset_id"].lower() in datasets]
+
+        if table_name_pattern:
+            pattern = table_name_pattern.lower()
+            table_keys = [table_key for table_key in table_keys if fnmatch.fnmatchcase(tables[table_key]["table_name"].lower(), pattern)]
+
+        matching_count = len(table_keys)
+        if max_results > 0:
+            table_keys = table_keys[:max_results]
+
+        results = []
+        for table_key in table_keys:
+            table = tables[table_key]
+            result = {"project_id": table["project_id"], "dataset_id": table["dataset_id"], "table_name": table["table_name"]}
+            if scores is not None:
+                result["relevance_score"] = round(scores[table_key], 3)
+            if include_ddl:
+                result["table_ddl"] = table["table_ddl"]
+            else:
+                result["column_names"] = table["column_names"]
+            results.append(result)
+
+        messages.append(f"Returned {len(results)} of {matching_count} matching tables ({len(tables)} tables in total).")
+        if question and not results:
+            messages.append("No table names matched the question, call again without the question to get every table.")
+        print(f"get_bigquery_table_list -> table catalog cache: {_table_catalog_cache.stats()}")
+
+        return_value = { "status": "success", "tool_name": "get_bigquery_table_list", "query": None, "messages": messages, "results": results }
         print(f"get_bigquery_table_list -> return_value: {json.dumps(return_value, indent=2)}")
 
         return return_value
@@ -65,4 +259,4 @@ def get_bigquery_table_list() -> dict:
     except Exception as e:
         messages.append(f"Error when calling rest api: {e}")
         return_value = { "status": "failed", "tool_name": "get_bigquery_table_list", "query": None, "messages": messages, "results": None }   
-        return return_value
\ No newline at end of file
+        return return_value
@@ -1,5 +1,188 @@
+import os
 import json
+import concurrent.futures
+import data_analytics_agent.cache_helper as cache_helper
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.run_bigquery_sql as bq_sql
+import data_analytics_agent.bigquery.table_metadata_cache as table_metadata_cache
+
+
+# Schemas read with INFORMATION_SCHEMA keyed by "project.dataset.table".  Schemas read with tables.get live in
+# table_metadata_cache, whose expired entries are revalidated with If-None-Match (a body-less 304 when unchanged).
+_schema_cache = cache_helper.TTLCache(
+    max_entries=int(os.getenv("AGENT_ENV_BIGQUERY_SCHEMA_CACHE_MAX_ENTRIES", "2048")),
+    max_bytes=int(os.getenv("AGENT_ENV_BIGQUERY_SCHEMA_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("AGENT_ENV_BIGQUERY_SCHEMA_CACHE_TTL_SECONDS", "300"))
+)
+
+
+def get_batch_settings() -> tuple:
+    """Returns (min_tables, max_concurrency): datasets with at least min_tables uncached tables are read with one
+    INFORMATION_SCHEMA query, the other tables with up to max_concurrency concurrent tables.get calls."""
+    min_tables = int(os.getenv("AGENT_ENV_BIGQUERY_SCHEMA_BATCH_MIN_TABLES", "4"))
+    max_concurrency = int(os.getenv("AGENT_ENV_BIGQUERY_SCHEMA_MAX_CONCURRENCY", "8"))
+    return min_tables, max_concurrency
+
+
+def invalidate_schema_cache(sql: str = None) -> None:
+    """Drops the cached schemas and table metadata.  Called after DDL runs through run_bigquery_sql."""
+    _schema_cache.clear()
+    table_metadata_cache.invalidate()
+
+bq_sql.register_ddl_listener(invalidate_schema_cache)
+
+
+def get_schema_cache_stats() -> dict:
+    return {"information_schema": _schema_cache.stats(), "table_metadata": table_metadata_cache.get_cache_stats()}
+
+
+def _fetch_schema_with_tables_get(project_id: str, dataset_id: str, table_id: str) -> dict:
+    """tables.get for one table through the table metadata cache (an expired copy is revalidated with its etag)."""
+    return table_metadata_cache.get_table(project_id, dataset_id, table_id).get("schema")
+
+
+# INFORMATION_SCHEMA reports the standard SQL type names, tables.get the legacy ones
+_LEGACY_TYPE_NAMES = {"INT64": "INTEGER", "FLOAT64": "FLOAT", "BOOL": "BOOLEAN"}
+
+
+def _field_type(data_type: str) -> dict:
+    """
+    The tables.get type keys of an INFORMATION_SCHEMA data_type (without ARRAY<>): e.g. INT64 -> {"type": "INTEGER"},
+    STRING(10) -> {"type": "STRING", "maxLength": "10"}, NUMERIC(10, 2) -> {"type": "NUMERIC", "precision": "10", "scale": "2"}.
+    """
+    if data_type.startswith("STRUCT<"):
+        return {"type": "RECORD"}
+    if data_type.startswith("RANGE<"):
+        return {"type": "RANGE", "rangeElementType": {"type": data_type[6:-1]}}
+
+    type_name, _, type_parameters = data_type.partition("(")
+    field_type = {"type": _LEGACY_TYPE_NAMES.get(type_name, type_name)}
+    type_parameters = [parameter.strip() for parameter in type_parameters.rstrip(")").split(",") if parameter.strip()]
+    if type_name in ("STRING", "BYTES") and type_parameters:
+        field_type["maxLength"] = type_parameters[0]
+    elif type_name in ("NUMERIC", "BIGNUMERIC") and type_parameters:
+        field_type["precision"] = type_parameters[0]
+        if len(type_parameters) > 1:
+            field_type["scale"] = type_parameters[1]
+    return field_type
+
+
+def _schema_from_field_paths(rows: list, required_columns: set = frozenset()) -> dict:
+    """
+    Builds a tables.get style schema ({"fields": [...]}) from INFORMATION_SCHEMA.COLUMN_FIELD_PATHS rows.
+
+    Types use the tables.get names, ARRAY<T> becomes mode REPEATED of T and STRUCT<...> becomes a RECORD whose
+    nested fields come from the longer field paths.  The columns in required_columns (IS_NULLABLE = "NO") are
+    REQUIRED.  INFORMATION_SCHEMA does not report it for nested fields, those are NULLABLE.
+    """
+    schema = {"fields": []}
+    fields_by_path = {}
+    for row in rows:
+        data_type = row["data_type"]
+        mode = "REQUIRED" if row["field_path"] in required_columns else "NULLABLE"
+        if data_type.startswith("ARRAY<"):
+            mode, data_type = "REPEATED", data_type[6:-1]
+        field = dict({"name": row["field_path"].rsplit(".", 1)[-1]}, **_field_type(data_type), mode=mode)
+        if row.get("description"):
+            field["description"] = row["description"]
+
+        parent_path = row["field_path"].rsplit(".", 1)[0] if "." in row["field_path"] else None
+        parent = fields_by_path.get(parent_path, schema) if parent_path else schema
+        parent.setdefault("fields", []).append(field)
+        fields_by_path[row["field_path"]] = field
+    return schema
+
+
+def _fetch_dataset_schemas(project_id: str, dataset_id: str, table_ids: list) -> dict:
+    """Reads the schemas of several tables of one dataset with a COLUMN_FIELD_PATHS query (and a COLUMNS query for the modes)."""
+    sql = f"""
+    SELECT table_name, column_name, field_path, data_type, description
+    FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.COLUMN_FIELD_PATHS`
+    WHERE table_name IN UNNEST(@table_names)
+    """
+    rows_by_table = {}
+    # COLUMN_FIELD_PATHS returns a column before its nested fields and keeps the column order
+    for row in bq_sql.iterate_bigquery_sql_rows(sql, {"table_names": list(table_ids)}):
+        rows_by_table.setdefault(row["table_name"], []).append(row)
+
+    # A separate query since joining COLUMNS would lose that order
+    required_sql = f"""
+    SELECT table_name, column_name
+    FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.COLUMNS`
+    WHERE table_name IN UNNEST(@table_names) AND is_nullable = 'NO'
+    """
+    required_columns_by_table = {}
+    for row in bq_sql.iterate_bigquery_sql_rows(required_sql, {"table_names": list(table_ids)}):
+        required_columns_by_table.setdefault(row["table_name"], set()).add(row["column_name"])
+
+    schemas = {}
+    for table_id in table_ids:
+        if table_id in rows_by_table:
+            schemas[table_id] = _schema_from_field_paths(rows_by_table[table_id], required_columns_by_table.get(table_id, frozenset()))
+            _schema_cache.set(f"{project_id}.{dataset_id}.{table_id}", schemas[table_id])
+    return schemas
+
+
+def get_table_schemas(table_names: list) -> dict:
+    """
+    Returns the schemas of many tables with as few round trips as possible.
+
+    Cached schemas are used as is.  Expired entries with an etag are revalidated (304), datasets with at
+    least AGENT_ENV_BIGQUERY_SCHEMA_BATCH_MIN_TABLES other tables are read with one INFORMATION_SCHEMA
+    query each and the remaining tables with concurrent tables.get calls.
+
+    Args:
+        table_names (list): "dataset.table" or "project.dataset.table" names.
+
+    Returns:
+        dict: {table_name: schema dict, or None if not found} keyed by the names as passed in.
+    """
+    default_project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+    min_tables, max_concurrency = get_batch_settings()
+
+    schemas = {}
+    pending = {} # (project, dataset, table) -> name as passed in
+    for table_name in table_names:
+        parts = table_name.replace("`", "").split(".")
+        project_id, dataset_id, table_id = parts if len(parts) == 3 else [default_project_id] + parts
+        cached = _schema_cache.get(f"{project_id}.{dataset_id}.{table_id}")
+        if cached is not None:
+            schemas[table_name] = cached
+        else:
+            pending[(project_id, dataset_id, table_id)] = table_name
+
+    tables_by_dataset = {}
+    single_tables = []
+    for table_reference in pending:
+        if table_metadata_cache.is_cached(*table_reference):
+            single_tables.append(table_reference) # Fresh, or a cheap If-None-Match revalidation
+        else:
+            tables_by_dataset.setdefault(table_reference[:2], []).append(table_reference)
+
+    for (project_id, dataset_id), table_references in tables_by_dataset.items():
+        if len(table_references) < min_tables:
+            single_tables.extend(table_references)
+            continue
+        print(f"get_bigquery_table_schema -> reading {len(table_references)} schemas of {project_id}.{dataset_id} with INFORMATION_SCHEMA.")
+        dataset_schemas = _fetch_dataset_schemas(project_id, dataset_id, [table_id for _, _, table_id in table_references])
+        for table_reference in table_references:
+            schemas[pending[table_reference]] = dataset_schemas.get(table_reference[2])
+
+    if single_tables:
+        def fetch(table_reference):
+            try:
+                return _fetch_schema_with_tables_get(*table_reference)
+            except rest_api_helper.RestApiError as e:
+                if e.status_code == 404:
+                    return None
+                raise
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(single_tables)))) as executor:
+            for table_reference, schema in zip(single_tables, executor.map(fetch, single_tables)):
+                schemas[pending[table_reference]] = schema
+
+    return {table_name: schemas.get(table_name) for table_name in table_names}
+
 
 def get_bigquery_table_schema(dataset_id: str, table_id: str) -> dict:
     """Fetches the schema and metadata for a specific BigQuery table.
@@ -39,28 +222,68 @@ def get_bigquery_table_schema(dataset_id: str, table_id: str) -> dict:
                         }
             }
     """
-    import os
-
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     messages = []
     return_value = None
   
-    url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/datasets/{dataset_id}/tables/{table_id}"
-
     try:
-        response = rest_api_helper.rest_api_helper(url, "GET", None)
-        print(f"get_bigquery_table_schema -> response: {json.dumps(response, indent=2)}")
+        schema = _schema_cache.get(f"{project_id}.{dataset_id}.{table_id}") or _fetch_schema_with_tables_get(project_id, dataset_id, table_id)
 
-        if "schema" in response:
-            schema = response["schema"]        
+        if schema is not None:
             return_value = { "status": "success", "tool_name": "get_bigquery_table_schema", "query": None, "messages": messages, "results": schema }
             print(f"get_bigquery_table_schema -> return_value: {json.dumps(return_value, indent=2)}")
         else:
-            messages.add(f"Schema not found in the API response for the specified table ({table_id}).")
+            messages.append(f"Schema not found in the API response for the specified table ({table_id}).")
             return_value = { "status": "failed", "tool_name": "get_bigquery_table_schema", "query": None, "messages": messages, "results": None }
 
         return return_value 
       
     except Exception as e:
-        messages.add(f"Error when calling rest api: {e}")
-        return_value = { "status": "failed", "tool_name": "get_bigquery_table_schema", "query": None, "messages": messages, "results": None }
\ No newline at end of file
+        messages.append(f"Error when calling rest api: {e}")
+        return_value = { "status": "failed", "tool_name": "get_bigquery_table_schema", "query": None, "messages": messages, "results": None }
+        return return_value
+
+
+def get_bigquery_table_schemas(table_names: list[str]) -> dict:
+    """Fetches the schemas of several BigQuery tables at once.
+    Use this instead of calling get_bigquery_table_schema once per table.
+
+    Args:
+        table_names (list[str]): The tables as "dataset_id.table_id" (or "project_id.dataset_id.table_id").
+
+    Returns:
+        dict: This will return:
+        {
+            "status": "success",
+            "tool_name": "get_bigquery_table_schemas",
+            "query": None,
+            "messages": ["List of messages during processing"],
+            "results": {
+                "dataset_id.table_id": {
+                    "fields": [
+                        {
+                            "name": "customer_id",
+                            "type": "INTEGER",
+                            "mode": "NULLABLE",
+                            "description": "Unique identifier for the customer."
+                        }
+                    ]
+                }
+            }
+        }
+    """
+    messages = []
+
+    try:
+        schemas = get_table_schemas(table_names)
+    except Exception as e:
+        messages.append(f"Error when fetching the table schemas: {e}")
+        return { "status": "failed", "tool_name": "get_bigquery_table_schemas", "query": None, "messages": messages, "results": None }
+
+    missing_tables = [table_name for table_name, schema in schemas.items() if schema is None]
+    if missing_tables:
+        messages.append(f"No schema was found for: {', '.join(missing_tables)}.")
+    print(f"get_bigquery_table_schemas -> {len(schemas) - len(missing_tables)} of {len(schemas)} schemas (cache: {get_schema_cache_stats()}).")
+
+    status = "success" if not missing_tables else "failed"
+    return { "status": status, "tool_name": "get_bigquery_table_schemas", "query": None, "messages": messages, "results": schemas }
@@ -0,0 +1,145 @@
+import os
+import json
+import decimal
+import datetime
+import data_analytics_agent.cache_helper as cache_helper
+import data_analytics_agent.bigquery.sql_helper as sql_helper
+
+
+# Prepared statements keyed by the exact SQL text.  The agent re-sends the same parameterized SQL with
+# different values, so the template is parsed once and every later call only binds new values.
+_statement_cache = cache_helper.TTLCache(max_entries=int(os.getenv("AGENT_ENV_BIGQUERY_STATEMENT_CACHE_MAX_ENTRIES", "256")))
+
+
+class QueryParameterError(ValueError):
+    """Raised when the parameters passed do not match the placeholders of the statement."""
+
+
+def prepare_statement(sql: str) -> dict:
+    """
+    Parses a SQL template once and caches it.
+
+    Returns:
+        dict: {"sql": the SQL text, "normalized_sql": cache key form, "parameter_names": ["name"],
+               "positional_count": int, "is_cacheable": bool}
+    """
+    statement = _statement_cache.get(sql)
+    if statement is None:
+        statement = {
+            "sql": sql,
+            "normalized_sql": sql_helper.normalize_sql(sql),
+            "parameter_names": sql_helper.find_named_parameters(sql),
+            "positional_count": sql_helper.count_positional_parameters(sql),
+            "is_cacheable": sql_helper.is_cacheable(sql)
+        }
+        _statement_cache.set(sql, statement, size_bytes=len(sql))
+    return statement
+
+
+def get_statement_cache_stats() -> dict:
+    """Returns the hit/miss counters of the prepared statement cache."""
+    return _statement_cache.stats()
+
+
+def _parse_type(type_name: str) -> dict:
+    """Turns "INT64" or "ARRAY<DATE>" into a QueryParameterType."""
+    type_name = type_name.strip().upper()
+    if type_name.startswith("ARRAY<") and type_name.endswith(">"):
+        return {"type": "ARRAY", "arrayType": _parse_type(type_name[6:-1])}
+    return {"type": type_name}
+
+
+def _infer_type(value) -> dict:
+    """The QueryParameterType for a Python value (bool is checked before int since bool is an int)."""
+    if isinstance(value, bool):
+        return {"type": "BOOL"}
+    if isinstance(value, int):
+        return {"type": "INT64"}
+    if isinstance(value, float):
+        return {"type": "FLOAT64"}
+    if isinstance(value, decimal.Decimal):
+        return {"type": "NUMERIC"}
+    if isinstance(value, datetime.datetime):
+        return {"type": "TIMESTAMP" if value.tzinfo is not None else "DATETIME"}
+    if isinstance(value, datetime.date):
+        return {"type": "DATE"}
+    if isinstance(value, (list, tuple)):
+        first = next((item for item in value if item is not None), "")
+        return {"type": "ARRAY", "arrayType": _infer_type(first)}
+    if isinstance(value, dict):
+        return {"type": "STRUCT", "structTypes": [{"name": name, "type": _infer_type(item)} for name, item in value.items()]}
+    return {"type": "STRING"}
+
+
+def _to_parameter_value(value, parameter_type: dict) -> dict:
+    """The QueryParameterValue for a value of the given type (scalars are sent as strings)."""
+    if parameter_type["type"] == "ARRAY":
+        return {"arrayValues": [_to_parameter_value(item, parameter_type["arrayType"]) for item in value or []]}
+    if parameter_type["type"] == "STRUCT":
+        return {"structValues": {field["name"]: _to_parameter_value(value.get(field["name"]), field["type"]) for field in parameter_type["structTypes"]}}
+    if value is None:
+        return {"value": None}
+    if isinstance(value, bool):
+        return {"value": "true" if value else "false"}
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return {"value": value.isoformat()}
+    if isinstance(value, (dict, list)): # e.g. a JSON parameter
+        return {"value": json.dumps(value)}
+    return {"value": str(value)}
+
+
+def to_query_parameter(name: str, value) -> dict:
+    """
+    Builds a BigQuery QueryParameter.  The type is inferred from the Python value unless the value
+    is {"type": "DATE", "value": "2024-01-31"} (any BigQuery type, e.g. "NUMERIC" or "ARRAY<STRING>").
+    """
+    if isinstance(value, dict) and set(value) == {"type", "value"}:
+        parameter_type = _parse_type(value["type"])
+        value = value["value"]
+    else:
+        parameter_type = _infer_type(value)
+
+    query_parameter = {"parameterType": parameter_type, "parameterValue": _to_parameter_value(value, parameter_type)}
+    if name is not None:
+        query_parameter = dict(name=name, **query_parameter)
+    return query_parameter
+
+
+def bind_parameters(statement: dict, parameters) -> dict:
+    """
+    Binds values to a prepared statement.
+
+    Args:
+        statement (dict): From prepare_statement.
+        parameters (dict or list): {name: value} for @name placeholders or [value, ...] for ? placeholders.
+
+    Returns:
+        dict: {"parameterMode": "NAMED" or "POSITIONAL", "queryParameters": [...]} to add to the query
+              request, or {} when the statement has no placeholders.
+
+    Raises:
+        QueryParameterError: A placeholder has no value or a value has no placeholder.
+    """
+    if not parameters:
+        if statement["parameter_names"] or statement["positional_count"]:
+            raise QueryParameterError("The statement has query parameters but no values were passed.")
+        return {}
+
+    if isinstance(parameters, dict):
+        values = {name.lower(): value for name, value in parameters.items()}
+        placeholders = {name.lower() for name in statement["parameter_names"]}
+        missing = [name for name in statement["parameter_names"] if name.lower() not in values]
+        unused = [name for name in parameters if name.lower() not in placeholders]
+        if missing or unused:
+            raise QueryParameterError(f"The parameters do not match the statement. Missing: {missing} Unused: {unused}")
+        return {"parameterMode": "NAMED",
+                "queryParameters": [to_query_parameter(name, values[name.lower()]) for name in statement["parameter_names"]]}
+
+    if len(parameters) != statement["positional_count"]:
+        raise QueryParameterError(f"The statement has {statement['positional_count']} ? placeholders but {len(parameters)} values were passed.")
+    return {"parameterMode": "POSITIONAL", "queryParameters": [to_query_parameter(None, value) for value in parameters]}
+
+
+def parameters_cache_key(bound_parameters: dict) -> str:
+    """A stable string for the bound values, used in result and estimate cache keys."""
+    return json.dumps(bound_parameters, sort_keys=True)
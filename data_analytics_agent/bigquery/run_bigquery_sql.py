@@ -1,46 +1,384 @@
 import os
 import json
-import time
+from typing import Optional
+import concurrent.futures
 import requests
 import google.auth
-import google.auth.transport.requests
+from google.adk.tools import ToolContext
+import data_analytics_agent.cache_helper as cache_helper
+import data_analytics_agent.polling_helper as polling_helper
+import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.sql_helper as sql_helper
+import data_analytics_agent.bigquery.query_parameters as sql_parameters
+import data_analytics_agent.bigquery.estimate_bigquery_sql_cost as cost_estimator
+import data_analytics_agent.bigquery.bigquery_storage_read as bigquery_storage_read
+import data_analytics_agent.bigquery.bigquery_result_decoder as bigquery_result_decoder
 
 
-# Helper function to avoid code duplication for processing paginated results
-def _process_and_paginate_results(session, initial_response_data, project_id, job_id, bigquery_region, headers):
-    """Processes a query result set, handling pagination."""
-    all_rows = []
-    
-    # Process the first page of results
-    schema = [field['name'] for field in initial_response_data['schema']['fields']]
-    for row in initial_response_data.get('rows', []):
-        all_rows.append({schema[i]: cell.get('v') for i, cell in enumerate(row['f'])})
-
-    # Handle subsequent pages
-    page_token = initial_response_data.get('pageToken')
-    while page_token:
+# Callbacks run after a DDL statement succeeds (e.g. to invalidate cached table metadata)
+_ddl_listeners = []
+
+
+# Results of deterministic SELECTs keyed by (project, region, normalized SQL, caps, format).  A hit is only served
+# if none of the tables the query read has been modified since the query ran (lastModifiedTime).
+_result_cache = cache_helper.TTLCache(
+    max_entries=int(os.getenv("AGENT_ENV_BIGQUERY_RESULT_CACHE_MAX_ENTRIES", "256")),
+    max_bytes=int(os.getenv("AGENT_ENV_BIGQUERY_RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("AGENT_ENV_BIGQUERY_RESULT_CACHE_TTL_SECONDS", "600"))
+)
+
+
+def get_result_cache_stats() -> dict:
+    """Returns the hit/miss counters and size of the query result cache."""
+    return _result_cache.stats()
+
+
+def clear_result_cache() -> None:
+    """Drops every cached query result."""
+    _result_cache.clear()
+
+
+def register_ddl_listener(listener) -> None:
+    """Registers listener(sql), called after a DDL statement executed by run_bigquery_sql succeeds."""
+    if listener not in _ddl_listeners:
+        _ddl_listeners.append(listener)
+
+
+def _notify_ddl_listeners(sql: str) -> None:
+    """Calls the DDL listeners if the statement was DDL.  A failing listener never fails the query."""
+    if not sql_helper.is_ddl_statement(sql):
+        return
+    for listener in list(_ddl_listeners):
+        try:
+            listener(sql)
+        except Exception as e:
+            print(f"run_bigquery_sql -> DDL listener {listener} failed: {e}")
+
+
+def get_result_limits(max_rows: int = 0, max_bytes: int = 0) -> tuple:
+    """Returns the (max_rows, max_bytes) caps for a tool result, 0 meaning the configured default."""
+    if max_rows <= 0:
+        max_rows = int(os.getenv("AGENT_ENV_BIGQUERY_MAX_RESULT_ROWS", "1000"))
+    if max_bytes <= 0:
+        max_bytes = int(os.getenv("AGENT_ENV_BIGQUERY_MAX_RESULT_BYTES", str(1024 * 1024)))
+    return max_rows, max_bytes
+
+
+def _iterate_raw_pages(session, initial_response_data, project_id, job_id, bigquery_region, headers, timeout=None, page_size=None):
+    """
+    Yields the getQueryResults pages of a query.  The next page is only requested once the previous one has been consumed.
+    page_size (maxResults) bounds the rows of each page, otherwise BigQuery returns up to about 10 MB per page.
+    """
+    page_data = initial_response_data
+
+    while True:
+        yield page_data
+
+        page_token = page_data.get('pageToken')
+        if not page_token:
+            return
+
         print(f"Fetching next page of results with pageToken...")
-        results_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/queries/{job_id}?location={bigquery_region}&pageToken={page_token}"
-        response = session.get(results_url, headers=headers)
+        max_results = f"&maxResults={page_size}" if page_size else ""
+        results_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/queries/{job_id}?location={bigquery_region}&pageToken={page_token}{max_results}&formatOptions.useInt64Timestamp=true"
+        response = session.get(results_url, headers=headers, timeout=timeout)
         response.raise_for_status()
-        
         page_data = response.json()
+
+
+def _iterate_result_pages(session, initial_response_data, project_id, job_id, bigquery_region, headers, timeout=None, page_size=None):
+    """Yields the typed (JSON safe) rows of a query result set, fetching pages as they are consumed."""
+    decoder = bigquery_result_decoder.ResultDecoder(initial_response_data['schema']['fields'])
+
+    for page_data in _iterate_raw_pages(session, initial_response_data, project_id, job_id, bigquery_region, headers, timeout, page_size):
         for row in page_data.get('rows', []):
-             all_rows.append({schema[i]: cell.get('v') for i, cell in enumerate(row['f'])})
-        
-        page_token = page_data.get('pageToken')
+            yield decoder.decode_row(row)
+
+
+# Helper function to avoid code duplication for processing paginated results
+def _process_and_paginate_results(session, initial_response_data, project_id, job_id, bigquery_region, headers, timeout=None):
+    """Processes a query result set, handling pagination."""
+    return list(_iterate_result_pages(session, initial_response_data, project_id, job_id, bigquery_region, headers, timeout))
+
+
+def _read_results_with_storage_api(session, sql, project_id, job_id, location, headers, timeout=None):
+    """Reads a finished query's destination table with the BigQuery Storage Read API (Arrow, parallel streams)."""
+    job_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/jobs/{job_id}?location={location}"
+    response = session.get(job_url, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    destination_table = response.json()['configuration']['query']['destinationTable']
+
+    # Several streams do not keep the row order
+    max_streams = 1 if bigquery_storage_read.sql_has_order_by(sql) else None
+    return bigquery_storage_read.read_table_arrow(destination_table['projectId'], destination_table['datasetId'], destination_table['tableId'], max_streams)
+
+
+def _iterate_select_rows(query_job: dict, sql: str, row_limit: int = None):
+    """
+    Yields the rows of a finished SELECT, lazily.
+
+    Large results are read with the Storage Read API when it is enabled, unless the caller will stop
+    before row_limit rows (the Storage Read API always downloads the whole result).
+    """
+    session, headers, timeout = query_job["session"], query_job["headers"], query_job["timeout"]
+    total_rows = query_job["total_rows"]
+    min_rows = bigquery_storage_read.get_min_rows()
+
+    if total_rows >= min_rows and (row_limit is None or row_limit >= min_rows) and bigquery_storage_read.is_enabled():
+        try:
+            print(f"Reading {total_rows} rows with the BigQuery Storage Read API...")
+            arrow_table = _read_results_with_storage_api(session, sql, query_job["project_id"], query_job["job_id"], query_job["location"], headers, timeout)
+        except Exception as e:
+            print(f"BigQuery Storage Read API failed, falling back to paginated results: {e}")
+        else:
+            yield from bigquery_storage_read.iterate_arrow_rows(arrow_table)
+            return
+
+    yield from _iterate_result_pages(session, query_job["first_page"], query_job["project_id"], query_job["job_id"], query_job["location"], headers, timeout,
+                                     query_job.get("page_size"))
+
+
+def get_polling_settings() -> tuple:
+    """Returns (long_poll_seconds, deadline_seconds): how long each jobs.query/getQueryResults call may wait and the overall deadline."""
+    long_poll_seconds = float(os.getenv("AGENT_ENV_BIGQUERY_LONG_POLL_SECONDS", "10"))
+    deadline_seconds = float(os.getenv("AGENT_ENV_BIGQUERY_QUERY_DEADLINE_SECONDS", "1800"))
+    return long_poll_seconds, deadline_seconds
+
+
+def cancel_query_job(project_id: str, job_id: str, location: str) -> dict:
+    """Requests cancellation of a running BigQuery job (jobs.cancel).  Cancellation is best effort, the job may still finish."""
+    print(f"run_bigquery_sql -> cancelling job {job_id}.")
+    cancel_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/jobs/{job_id}/cancel?location={location}"
+    return rest_api_helper.rest_api_helper(cancel_url, "POST", {})
+
+
+def _wait_for_query_results(query_job: dict, deadline_seconds: float, long_poll_seconds: float, cancel_event=None) -> dict:
+    """
+    Long-polls getQueryResults until the job is complete and returns the response (the first result page).
+
+    Each call waits server side for up to long_poll_seconds (timeoutMs), so a job finishing mid-wait is seen
+    immediately; the pauses between calls back off exponentially.  The job is cancelled when the deadline
+    passes or cancel_event is set.
+    """
+    session, headers, timeout = query_job["session"], query_job["headers"], query_job["timeout"]
+    project_id, job_id, location = query_job["project_id"], query_job["job_id"], query_job["location"]
+    # DML/DDL only need the status and statistics, not rows.  A SELECT's first page is bounded like the jobs.query one.
+    if not query_job["is_select_query"]:
+        max_results = "&maxResults=0"
+    else:
+        max_results = f"&maxResults={query_job['page_size']}" if query_job.get("page_size") else ""
+
+    def poll_query_results(remaining_seconds: float) -> dict:
+        timeout_ms = int(min(long_poll_seconds, remaining_seconds) * 1000)
+        print(f"Waiting up to {timeout_ms} ms for job {job_id}...")
+        results_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/queries/{job_id}?location={location}&timeoutMs={timeout_ms}{max_results}&formatOptions.useInt64Timestamp=true"
+        response = session.get(results_url, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    return polling_helper.poll_until_done(
+        poll_query_results,
+        lambda response_data: response_data.get('jobComplete', False),
+        deadline_seconds=deadline_seconds,
+        on_cancel=lambda: cancel_query_job(project_id, job_id, location),
+        cancel_event=cancel_event,
+        description=f"BigQuery job {job_id}"
+    )
+
+
+def _execute_query(sql: str, cancel_event=None, maximum_bytes_billed: int = 0, bound_parameters: dict = None, page_size: int = None) -> dict:
+    """
+    Submits the SQL with jobs.query and waits for the job to finish.
+
+    Queries that do not finish within the jobs.query wait are long-polled with getQueryResults (see
+    _wait_for_query_results) and cancelled once AGENT_ENV_BIGQUERY_QUERY_DEADLINE_SECONDS has passed or
+    cancel_event (a threading.Event) is set.  maximum_bytes_billed (when not 0) makes BigQuery fail the job
+    instead of billing more.  bound_parameters ({"parameterMode", "queryParameters"} from
+    sql_parameters.bind_parameters) are sent with the statement.  page_size (maxResults) bounds the rows of the
+    first and every later result page; without it BigQuery returns pages of up to about 10 MB.
+
+    Returns:
+        dict: {"status": "success" or "failed", "messages": [...], "is_select_query": bool, "project_id", "job_id", "location",
+               "first_page": the first result page (SELECT), "total_rows": int, "rows_affected": int (DML/DDL),
+               "bytes_processed": int, "page_size", "session", "headers", "timeout"}
+    """
+    print("--- Starting BigQuery jobs.query Execution ---")
+
+    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+    bigquery_region = os.getenv("AGENT_ENV_BIGQUERY_REGION")
+    long_poll_seconds, deadline_seconds = get_polling_settings()
+    messages = []
+
+    # 1. Authentication and Setup (cached credentials and a pooled keep-alive session shared with rest_api_helper)
+    try:
+        headers = rest_api_helper.get_auth_headers()
+    except google.auth.exceptions.DefaultCredentialsError as e:
+        raise Exception(f"Authentication failed. Run 'gcloud auth application-default login'. Error: {e}")
+
+    session = rest_api_helper.get_session("https://bigquery.googleapis.com")
+    timeout = rest_api_helper.get_timeout()
+    query_job = { "status": "failed", "messages": messages, "is_select_query": sql_helper.is_select_statement(sql),
+                  "project_id": project_id, "page_size": page_size, "session": session, "headers": headers, "timeout": timeout }
+
+    # 2. Submit Query to the Synchronous Endpoint (jobs.query)
+    query_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/queries"
+    
+    # Short queries complete within the first wait, longer ones return jobComplete false and are long-polled
+    payload = {
+        "query": sql,
+        "useLegacySql": False,
+        "timeoutMs": int(min(long_poll_seconds, deadline_seconds) * 1000),
+        "jobTimeoutMs": int(deadline_seconds * 1000), # BigQuery also stops the job at the deadline
+        "formatOptions": {"useInt64Timestamp": True} # Exact microsecond timestamps instead of float seconds
+    }
+    if maximum_bytes_billed:
+        payload["maximumBytesBilled"] = str(maximum_bytes_billed)
+    if bound_parameters:
+        payload.update(bound_parameters)
+    if page_size and query_job["is_select_query"]:
+        payload["maxResults"] = page_size
+    
+    print(f"Submitting query to {query_url} with a {long_poll_seconds}s wait...")
+    try:       
+        response = session.post(query_url, data=json.dumps(payload), headers=headers, timeout=timeout)
+        response.raise_for_status()
+        response_data = response.json()
+
+        job_id = response_data['jobReference']['jobId']
+        location = response_data['jobReference']['location']
+        job_complete = response_data['jobComplete']
         
-    print(f"all_rows: {all_rows}")
-    return all_rows
+    except Exception as e:
+        messages.append(f"Error when calling rest api ({query_url}): {e}")
+        return query_job
+
+    query_job.update({"job_id": job_id, "location": location})
+
+    # 3. Long-poll getQueryResults if the job did not complete within the first wait
+    if not job_complete:
+        print("Query still running, long-polling getQueryResults (slow path)...")
+        try:
+            response_data = _wait_for_query_results(query_job, max(0.0, deadline_seconds - long_poll_seconds), long_poll_seconds, cancel_event)
+        except polling_helper.PollingTimeoutError:
+            messages.append(f"The query did not finish within {deadline_seconds} seconds and job {job_id} was cancelled.")
+            return query_job
+        except polling_helper.PollingCancelledError:
+            messages.append(f"The query was cancelled (job {job_id}).")
+            return query_job
+        except requests.HTTPError as e:
+            # getQueryResults reports a failed job as an HTTP error carrying the job's error
+            messages.append(f"Error when waiting for job {job_id}: {e.response.text}")
+            return query_job
+        except Exception as e:
+            messages.append(f"Error when waiting for job {job_id}: {e}")
+            return query_job
+
+    if response_data.get('errors'):
+        messages.append(f"{json.dumps(response_data['errors'], indent=2)}")
+        return query_job
+
+    print(f"run_bigquery_sql -> job {job_id} completed (totalRows: {response_data.get('totalRows')}).")
+    query_job.update({
+        "status": "success",
+        "first_page": response_data,
+        "total_rows": int(response_data.get('totalRows', 0)),
+        "rows_affected": int(response_data.get('numDmlAffectedRows', 0)),
+        "bytes_processed": int(response_data.get('totalBytesProcessed', 0))
+    })
+    return query_job
+
+
+def _get_referenced_tables(query_job: dict) -> tuple:
+    """Returns the tables a finished query read and its start time (epoch ms), from jobs.get."""
+    job_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{query_job['project_id']}/jobs/{query_job['job_id']}?location={query_job['location']}"
+    response = query_job["session"].get(job_url, headers=query_job["headers"], timeout=query_job["timeout"])
+    response.raise_for_status()
+    statistics = response.json().get('statistics', {})
+    return statistics.get('query', {}).get('referencedTables', []), int(statistics.get('startTime', 0))
+
+
+def _table_last_modified_ms(table_reference: dict) -> int:
+    url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{table_reference['projectId']}/datasets/{table_reference['datasetId']}/tables/{table_reference['tableId']}?fields=lastModifiedTime"
+    return int(rest_api_helper.rest_api_helper(url, "GET", None).get('lastModifiedTime', 0))
+
+
+def _cached_result_is_current(cached_result: dict) -> bool:
+    """
+    True if none of the referenced tables changed after the cached query started (checked concurrently).
+    A query without referenced tables (INFORMATION_SCHEMA, external or wildcard tables) can not be checked
+    and is never current.
+    """
+    referenced_tables = cached_result["referenced_tables"]
+    if not referenced_tables:
+        return False
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(referenced_tables), 8)) as executor:
+            last_modified = list(executor.map(_table_last_modified_ms, referenced_tables))
+    except Exception as e:
+        print(f"run_bigquery_sql -> could not validate the cached result, running the query: {e}")
+        return False
+    return all(modified_ms <= cached_result["job_start_ms"] for modified_ms in last_modified)
+
+
+def iterate_bigquery_sql_rows(sql: str, query_parameters=None):
+    """
+    Runs a SELECT statement and yields its rows one at a time.
+
+    Result pages are fetched as the rows are consumed, so a caller that stops early never downloads
+    the rest of the result.  Unlike the run_bigquery_sql tool no size cap is applied.  query_parameters
+    ({name: value} or [value]) are bound as in run_bigquery_sql.
+
+    Raises:
+        RuntimeError: If the query fails.
+    """
+    bound_parameters = sql_parameters.bind_parameters(sql_parameters.prepare_statement(sql), query_parameters)
+    query_job = _execute_query(sql, bound_parameters=bound_parameters)
+    if query_job["status"] == "failed":
+        raise RuntimeError(f"Query failed: {query_job['messages']}")
+    if query_job["is_select_query"]:
+        yield from _iterate_select_rows(query_job, sql)
 
 
-def run_bigquery_sql(sql: str) -> dict:
+def read_bigquery_sql_columns(sql: str, json_safe: bool = False, output: str = "lists", query_parameters=None):
+    """
+    Runs a SELECT statement and returns the whole result column-oriented, without building a dict per row.
+
+    Args:
+        sql (str): The SELECT statement.
+        json_safe (bool): Decode to JSON values (as the tools return) instead of Python types (Decimal, datetime...).
+        output (str): "lists" for {column: [values]}, "numpy" for {column: numpy array} or "arrow" for a pyarrow.Table.
+        query_parameters (dict or list): Values for the @name or ? parameters.
+
+    Raises:
+        RuntimeError: If the query fails.
+    """
+    bound_parameters = sql_parameters.bind_parameters(sql_parameters.prepare_statement(sql), query_parameters)
+    query_job = _execute_query(sql, bound_parameters=bound_parameters)
+    if query_job["status"] == "failed":
+        raise RuntimeError(f"Query failed: {query_job['messages']}")
+
+    first_page = query_job["first_page"]
+    decoder = bigquery_result_decoder.ResultDecoder(first_page['schema']['fields'], json_safe)
+    columns = None
+    for page_data in _iterate_raw_pages(query_job["session"], first_page, query_job["project_id"], query_job["job_id"], query_job["location"], query_job["headers"], query_job["timeout"]):
+        columns = decoder.decode_columns(page_data.get('rows', []), columns)
+
+    if output == "numpy":
+        return bigquery_result_decoder.columns_to_numpy(columns, decoder.column_types)
+    if output == "arrow":
+        return bigquery_result_decoder.columns_to_arrow(columns)
+    return columns
+
+
+def run_bigquery_sql(sql: str, max_rows: int = 0, max_bytes: int = 0, result_format: str = "rows",
+                     query_parameters: Optional[dict] = None, tool_context: ToolContext = None) -> dict:
     """Executes a SQL statement against Google BigQuery.
 
     IMPORTANT: When formatting the table names in the join clause make sure you use backticks.
         - e.g.: `project_id.dataset_name.table_name`
 
     This function connects to the BigQuery and runs the provided SQL.
+    Values are typed: numbers and booleans are JSON numbers/booleans and timestamps are ISO-8601 strings.
     It intelligently handles two types of queries:
     1.  Data-returning queries (`SELECT`, `WITH`): It fetches all resulting rows,
         paginating if necessary, and returns them as a JSON array of objects.
@@ -48,8 +386,27 @@ def run_bigquery_sql(sql: str) -> dict:
         completion, and returns a JSON object confirming success or raises an
         exception on failure.
 
+    Large results are capped: once max_rows rows or max_bytes bytes have been collected no further
+    pages are fetched, "truncated" is set to true and "total_rows" holds the full row count.  Use
+    aggregations, filters or LIMIT to get at the rows you need instead of raising the caps.
+
+    Prefer query parameters over literals for values that change between similar questions: write
+    "WHERE state = @state AND amount > @min_amount" and pass {"state": "CA", "min_amount": 100}.  The
+    type is inferred from the value; pass {"type": "DATE", "value": "2024-01-31"} to set it explicitly
+    (any BigQuery type such as NUMERIC or ARRAY<STRING>).  Reusing the same SQL text with different
+    values lets BigQuery and the local caches reuse the statement.
+
+    Before running, a dry run estimates the bytes the statement will scan.  If that is over the per-query or
+    per-session budget the statement is not run: "status" is "failed" and "estimate" holds the estimate and
+    the reason.  Rewrite the query to scan less (filter on partition columns, select fewer columns).
+
     Args:
         sql (str): The full SQL statement to execute on BigQuery.
+        max_rows (int, optional): The maximum number of rows to return.  0 uses the configured default (1000).
+        max_bytes (int, optional): The maximum size of the returned rows (JSON encoded).  0 uses the configured default (1MB).
+        result_format (str, optional): "rows" (default) returns a list of row objects.  "columns" returns a single object
+                                       {"column-name": [value-1, value-2, ...]} which is much smaller for many rows.
+        query_parameters (dict, optional): Values for the @name parameters in the SQL.  (From Python a list binds ? placeholders.)
 
     Returns:
         NOTE: If this is a DML operation the results will be None or null.  The messages will contain if this was a SELECT (return results) 
@@ -59,7 +416,9 @@ def run_bigquery_sql(sql: str) -> dict:
             "status": "success",
             "tool_name": "run_bigquery_sql",
             "query": "The SQL statement used",
-            "messages": ["List of messages during processing"]
+            "messages": ["List of messages during processing"],
+            "truncated": False,
+            "total_rows": 2,
             "results": [ 
                         {
                           "field-1": "value-1",
@@ -74,107 +433,103 @@ def run_bigquery_sql(sql: str) -> dict:
                        ] 
         }        
     """
-    print("--- Starting BigQuery jobs.query Execution ---")
+    max_rows, max_bytes = get_result_limits(max_rows, max_bytes)
 
-    import os
+    # The SQL template is parsed once (prepared statement cache), later calls only bind the values
+    statement = sql_parameters.prepare_statement(sql)
+    try:
+        bound_parameters = sql_parameters.bind_parameters(statement, query_parameters)
+    except sql_parameters.QueryParameterError as e:
+        return { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql, "messages": [str(e)], "results": None }
 
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    bigquery_region = os.getenv("AGENT_ENV_BIGQUERY_REGION")
-    messages = []
+    # Deterministic SELECTs are answered from the result cache while the tables they read are unchanged
+    cache_key = None
+    if os.getenv("AGENT_ENV_BIGQUERY_RESULT_CACHE_ENABLED", "true").lower() == "true" and statement["is_cacheable"]:
+        cache_key = (os.getenv("AGENT_ENV_PROJECT_ID"), os.getenv("AGENT_ENV_BIGQUERY_REGION"), statement["normalized_sql"],
+                     sql_parameters.parameters_cache_key(bound_parameters), max_rows, max_bytes, result_format)
+        cached_result = _result_cache.get(cache_key, validate=_cached_result_is_current)
+        if cached_result is not None:
+            print(f"run_bigquery_sql -> result cache hit ({get_result_cache_stats()}).")
+            return_value = dict(cached_result["return_value"], query=sql)
+            return_value["messages"] = return_value["messages"] + ["Returned cached results, the tables queried have not changed since they were computed."]
+            return return_value
+
+    # Pre-flight dry run: refuse statements over the bytes budget and cap what the real job may bill
+    maximum_bytes_billed = 0
+    reserved_bytes = 0
+    if cost_estimator.is_guardrail_enabled():
+        try:
+            # Reserves the estimate in the session total until the job reports what it processed
+            estimate = cost_estimator.check_budget(cost_estimator.dry_run_sql(sql, bound_parameters), tool_context, reserve=True)
+        except Exception as e:
+            return { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql, "messages": [f"The dry run failed: {e}"], "results": None }
+
+        if not estimate["within_budget"]:
+            print(f"run_bigquery_sql -> not running, too expensive: {estimate}")
+            return { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql,
+                     "messages": [estimate["reason"], "The query was not run. Rewrite it to scan less data."],
+                     "estimate": estimate, "results": None }
+        maximum_bytes_billed = estimate["maximum_bytes_billed"]
+        reserved_bytes = estimate["reserved_bytes"]
 
-    # 1. Authentication and Setup
+    # One row more than the cap, so a truncated result is detected without requesting a second page
     try:
-        credentials, _ = google.auth.default(
-            scopes=["https://www.googleapis.com/auth/cloud-platform", "https://www.googleapis.com/auth/bigquery"]
-        )
-        auth_req = google.auth.transport.requests.Request()
-        credentials.refresh(auth_req)
-        print("Successfully authenticated.")
-    except google.auth.exceptions.DefaultCredentialsError as e:
-        raise Exception(f"Authentication failed. Run 'gcloud auth application-default login'. Error: {e}")
+        query_job = _execute_query(sql, maximum_bytes_billed=maximum_bytes_billed, bound_parameters=bound_parameters, page_size=max_rows + 1)
+    except Exception:
+        cost_estimator.add_session_bytes(tool_context, 0, reserved_bytes)
+        raise
+    messages = query_job["messages"]
 
-    headers = {"Authorization": f"Bearer {credentials.token}", "Content-Type": "application/json"}
-    session = requests.Session()
-    
-    # 2. Submit Query to the Synchronous Endpoint (jobs.query)
-    query_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/queries"
-    
-    # Set a reasonable timeout. If the query takes longer, jobComplete will be false.
-    payload = {
-        "query": sql,
-        "useLegacySql": False,
-        "timeoutMs": 60 * 1000 * 5 # seconds * ms * minutes
-    }
-    
-    print(f"Submitting query to {query_url} with a 30s timeout...")
-    is_select_query = sql.strip().upper().startswith(("SELECT", "WITH"))
-    try:       
-        response = session.post(query_url, data=json.dumps(payload), headers=headers)
-        response.raise_for_status()
-        response_data = response.json()
+    cost_estimator.add_session_bytes(tool_context, query_job["bytes_processed"] if query_job["status"] == "success" else 0, reserved_bytes)
 
-        job_id = response_data['jobReference']['jobId']
-        location = response_data['jobReference']['location']
-        job_complete = response_data['jobComplete']
-        
+    if query_job["status"] == "failed":
+        return_value = { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": None }
+        return return_value
+
+    if not query_job["is_select_query"]: # DML/DDL
+        messages.append(f"Executed a DML query which affected {query_job['rows_affected']} rows.")
+        _notify_ddl_listeners(sql)
+        return_value = { "status": "success", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": None }
+        return return_value
+
+    rows = []
+    result_bytes = 0
+    truncated = False
+    try:
+        # Stops pulling (and so fetching pages) as soon as a cap is reached
+        for row in _iterate_select_rows(query_job, sql, max_rows):
+            row_bytes = len(json.dumps(row, default=str))
+            if len(rows) >= max_rows or result_bytes + row_bytes > max_bytes:
+                truncated = True
+                break
+            rows.append(row)
+            result_bytes += row_bytes
     except Exception as e:
-        messages.append(f"Error when calling rest api ({query_url}): {e}")
+        messages.append(f"Error when reading the query results: {e}")
         return_value = { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": None }
         return return_value
 
-    # 3. Handle the response based on whether the job completed in time
-    if job_complete:
-        print("Query completed within timeout (fast path).")
-        if response_data.get('errors'):
-            messages.append(f"{json.dumps(response_data['errors'], indent=2)}")
-            return_value = { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": None }
-            return return_value
+    row_count = len(rows)
+    if result_format == "columns":
+        column_names = [field['name'] for field in query_job["first_page"]['schema']['fields']]
+        rows = bigquery_result_decoder.rows_to_columns(rows, column_names)
 
-        print(f"run_bigquery_sql -> response: {json.dumps(response_data, indent=2)}")
+    messages.append("Executed a SELECT query so the results will be poplulated with rows.")
+    if truncated:
+        messages.append(f"The results were truncated to the first {row_count} of {query_job['total_rows']} rows ({result_bytes} bytes).")
+    print(f"run_bigquery_sql -> returning {row_count} of {query_job['total_rows']} rows ({result_bytes} bytes, truncated: {truncated}).")
 
-        if is_select_query:
-            rows = _process_and_paginate_results(session, response_data, project_id, job_id, location, headers)
-            messages.append("Executed a SELECT query so the results will be poplulated with rows.")
-            return_value = { "status": "success", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": rows }
-            return return_value
-        else: # DML/DDL
-            rows_affected = int(response_data.get('numDmlAffectedRows', 0))
-            messages.append(f"Executed a DML query which affected {rows_affected} rows.")
-            return_value = { "status": "success", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": None }
-            return return_value
+    return_value = { "status": "success", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages,
+                     "truncated": truncated, "total_rows": query_job["total_rows"], "results": rows }
 
-    else:
-        print("Query timed out, falling back to polling (slow path)...")
-        # Fallback to polling the jobs.get endpoint
-        job_status_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/jobs/{job_id}?location={bigquery_region}"
-        while True:
-            time.sleep(2)
-            print("Polling job status...")
-            job_status_response = session.get(job_status_url, headers=headers)
-            job_status_response.raise_for_status()
-            status_data = job_status_response.json()
-
-            if status_data['status']['state'] == 'DONE':
-                print("Job finished.")
-                if status_data['status'].get('errorResult'):
-                    messages.append(f"{json.dumps(status_data['status']['errorResult'], indent=2)}")
-                    return_value = { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": None }  
-                    return return_value             
-                
-                # Job is done, now process the final result
-                if is_select_query:
-                    # We need to fetch the results now that the job is complete
-                    results_url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/jobs/{job_id}/results?location={bigquery_region}"
-                    final_results_res = session.get(results_url, headers=headers)
-                    final_results_res.raise_for_status()
-                    rows = _process_and_paginate_results(session, final_results_res.json(), project_id, job_id, location, headers)
-                    messages.append("Executed a SELECT query so the results will be poplulated with rows.")
-                    return_value = { "status": "success", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": rows }
-                    return return_value
-
-                else: # DML/DDL
-                    rows_affected = int(status_data.get('statistics', {}).get('query', {}).get('numDmlAffectedRows', 0))
-                    messages.append(f"Executed a DML query which affected {rows_affected} rows.")
-                    return_value = { "status": "success", "tool_name": "run_bigquery_sql", "query": sql, "messages": messages, "results": None }
-                    return return_value
-                
\ No newline at end of file
+    if cache_key is not None:
+        try:
+            referenced_tables, job_start_ms = _get_referenced_tables(query_job)
+            if not referenced_tables:
+                raise ValueError("the job has no referenced tables")
+            _result_cache.set(cache_key, {"return_value": return_value, "referenced_tables": referenced_tables, "job_start_ms": job_start_ms},
+                              size_bytes=result_bytes)
+        except Exception as e:
+            print(f"run_bigquery_sql -> not caching the result, the referenced tables are unknown: {e}")
+
+    return return_value
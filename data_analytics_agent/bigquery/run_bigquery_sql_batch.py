@@ -0,0 +1,81 @@
+import os
+import time
+import concurrent.futures
+from google.adk.tools import ToolContext
+import data_analytics_agent.bigquery.run_bigquery_sql as bq_sql
+
+
+def get_max_concurrency() -> int:
+    """The number of queries of a batch running at once, kept under BigQuery's concurrent interactive query quota."""
+    return int(os.getenv("AGENT_ENV_BIGQUERY_BATCH_MAX_CONCURRENCY", "8"))
+
+
+def _run_one(index: int, sql: str, max_rows: int, max_bytes: int, result_format: str, tool_context) -> dict:
+    """Runs one query of the batch and times it.  An exception fails only this query."""
+    start = time.perf_counter()
+    try:
+        result = bq_sql.run_bigquery_sql(sql, max_rows=max_rows, max_bytes=max_bytes, result_format=result_format, tool_context=tool_context)
+    except Exception as e:
+        result = { "status": "failed", "tool_name": "run_bigquery_sql", "query": sql, "messages": [f"Error running the query: {e}"], "results": None }
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    print(f"run_bigquery_sql_batch -> query {index} {result['status']} in {elapsed_ms} ms.")
+    return dict(result, index=index, elapsed_ms=elapsed_ms)
+
+
+def run_bigquery_sql_batch(queries: list[str], max_rows: int = 0, max_bytes: int = 0, result_format: str = "rows",
+                           tool_context: ToolContext = None) -> dict:
+    """Executes several independent SQL statements against Google BigQuery at the same time.
+
+    Use this instead of calling run_bigquery_sql repeatedly when the statements do not depend on each
+    other (e.g. counting the rows of several tables or profiling several columns).  Each statement is run
+    exactly as run_bigquery_sql would run it (same caps, dry-run budget and caching) but up to the
+    configured number run concurrently.
+
+    Args:
+        queries (list[str]): The SQL statements to run.
+        max_rows (int, optional): The maximum number of rows returned per statement.  0 uses the configured default (1000).
+        max_bytes (int, optional): The maximum size of the rows returned per statement.  0 uses the configured default (1MB).
+        result_format (str, optional): "rows" or "columns", as for run_bigquery_sql.
+
+    Returns:
+        dict: The results are in the same order as the queries, each one is a run_bigquery_sql result plus
+              its "index" and "elapsed_ms".
+        {
+            "status": "success",
+            "tool_name": "run_bigquery_sql_batch",
+            "query": None,
+            "messages": ["List of messages during processing"],
+            "results": [
+                {
+                    "index": 0,
+                    "elapsed_ms": 812.4,
+                    "status": "success",
+                    "tool_name": "run_bigquery_sql",
+                    "query": "SELECT COUNT(*) AS row_count FROM `project.dataset.table`",
+                    "messages": [...],
+                    "truncated": False,
+                    "total_rows": 1,
+                    "results": [{"row_count": 1000}]
+                }
+            ]
+        }
+    """
+    messages = []
+    if not queries:
+        messages.append("No queries were passed.")
+        return { "status": "failed", "tool_name": "run_bigquery_sql_batch", "query": None, "messages": messages, "results": None }
+
+    max_workers = max(1, min(get_max_concurrency(), len(queries)))
+    start = time.perf_counter()
+    # The jobs share the pooled keep-alive session of rest_api_helper and each is long-polled on its own thread
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_one, index, sql, max_rows, max_bytes, result_format, tool_context) for index, sql in enumerate(queries)]
+        results = [future.result() for future in futures]
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    messages.append(f"{succeeded} of {len(queries)} queries succeeded in {elapsed_ms} ms ({max_workers} at a time, "
+                    f"{round(sum(result['elapsed_ms'] for result in results), 1)} ms if run one after another).")
+
+    status = "success" if succeeded == len(queries) else "failed"
+    return { "status": status, "tool_name": "run_bigquery_sql_batch", "query": None, "messages": messages, "results": results }
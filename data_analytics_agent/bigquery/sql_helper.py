@@ -0,0 +1,119 @@
+import re
+
+
+# Quoted strings, quoted identifiers and comments.  Everything else in a statement is "code".
+_QUOTED_OR_COMMENT_PATTERN = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|--[^\n]*|#[^\n]*|/\*.*?\*/)""", re.DOTALL)
+
+# Functions whose result changes between runs, queries using them must never be served from a cache
+_NON_DETERMINISTIC_PATTERN = re.compile(
+    r"\b(current_timestamp|current_date|current_datetime|current_time|rand|generate_uuid|session_user|"
+    r"generate_timestamp_array|now|tablesample)\b")
+
+_SELECT_KEYWORDS = ("select", "with", "(")
+
+# Statements that change which tables exist or what they look like
+_DDL_KEYWORDS = ("create", "alter", "drop")
+
+# The reserved keywords of GoogleSQL.  They are case insensitive and can never be an unquoted name, so
+# folding them is safe; every other word (table, dataset and column names, aliases) keeps its case.
+_RESERVED_KEYWORDS = frozenset("""
+    all and any array as asc assert_rows_modified at between by case cast collate contains create cross cube
+    current default define desc distinct else end enum escape except exclude exists extract false fetch following
+    for from full group grouping groups hash having if ignore in inner intersect interval into is join lateral left
+    like limit lookup merge natural new no not null nulls of on or order outer over partition preceding proto
+    qualify range recursive respect right rollup rows select set some struct tablesample then to treat true
+    unbounded union unnest using when where window with within
+""".split())
+
+# A word, unless it follows a "." (a field of a path expression may be named like a keyword)
+_WORD_PATTERN = re.compile(r"(?<![.\w@])[A-Za-z_]\w*")
+
+# @name query parameters (@@name are system variables)
+_NAMED_PARAMETER_PATTERN = re.compile(r"(?<![@\w])@(\w+)")
+
+
+def _split_sql(sql: str) -> list:
+    """Splits SQL into [(is_code, text)] pieces, dropping comments."""
+    pieces = []
+    for index, piece in enumerate(_QUOTED_OR_COMMENT_PATTERN.split(sql)):
+        if not piece:
+            continue
+        is_code = index % 2 == 0
+        if not is_code and piece.startswith(("--", "#", "/*")):
+            pieces.append((True, " ")) # A comment separates tokens like whitespace
+            continue
+        pieces.append((is_code, piece))
+    return pieces
+
+
+def _normalize_code(code: str) -> str:
+    code = _WORD_PATTERN.sub(lambda match: match.group(0).lower() if match.group(0).lower() in _RESERVED_KEYWORDS else match.group(0), code)
+    return re.sub(r"\s+", " ", code)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Returns a canonical form of a statement for use as a cache key.
+
+    Comments are removed, whitespace is collapsed and reserved keywords are lower cased, so formatting
+    and keyword case variants match.  Names keep their case (BigQuery dataset and table names are case
+    sensitive and aliases become the field names of the result), string literals and quoted identifiers
+    are kept byte for byte.
+    """
+    # Adjacent code pieces (e.g. around a removed comment) are joined first so whitespace is collapsed
+    # across them, literals and quoted identifiers are kept byte for byte
+    runs = []
+    for is_code, piece in _split_sql(sql):
+        if is_code and runs and runs[-1][0]:
+            runs[-1][1] += piece
+        else:
+            runs.append([is_code, piece])
+    normalized = "".join(_normalize_code(piece) if is_code else piece for is_code, piece in runs)
+    return normalized.strip().rstrip(";").strip()
+
+
+def _code_text(sql: str) -> str:
+    """The lower cased SQL without literals, quoted identifiers and comments."""
+    return " ".join(piece.lower() for is_code, piece in _split_sql(sql) if is_code)
+
+
+def is_single_statement(sql: str) -> bool:
+    """Returns False for a script: a ; outside of literals and comments that is not the trailing one."""
+    return ";" not in _code_text(sql).strip().rstrip(";")
+
+
+def is_select_statement(sql: str) -> bool:
+    """
+    Returns True for read-only queries (SELECT / WITH), ignoring leading comments.  A script is never a
+    read-only query, even if its first statement is a SELECT.
+    """
+    return _code_text(sql).lstrip().startswith(_SELECT_KEYWORDS) and is_single_statement(sql)
+
+
+def is_ddl_statement(sql: str) -> bool:
+    """Returns True for CREATE / ALTER / DROP statements, ignoring leading comments."""
+    return _code_text(sql).lstrip().startswith(_DDL_KEYWORDS)
+
+
+def is_deterministic(sql: str) -> bool:
+    """Returns False if the query calls a function such as CURRENT_TIMESTAMP() or RAND()."""
+    return _NON_DETERMINISTIC_PATTERN.search(_code_text(sql)) is None
+
+
+def is_cacheable(sql: str) -> bool:
+    """Only deterministic read-only queries can be answered from a cache."""
+    return is_select_statement(sql) and is_deterministic(sql)
+
+
+def find_named_parameters(sql: str) -> list:
+    """Returns the names of the @name parameters the statement uses, in order of first use (names are case insensitive)."""
+    code = " ".join(piece for is_code, piece in _split_sql(sql) if is_code)
+    names = {}
+    for name in _NAMED_PARAMETER_PATTERN.findall(code):
+        names.setdefault(name.lower(), name)
+    return list(names.values())
+
+
+def count_positional_parameters(sql: str) -> int:
+    """Returns the number of ? placeholders outside of literals and comments."""
+    return _code_text(sql).count("?")
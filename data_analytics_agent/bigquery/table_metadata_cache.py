@@ -0,0 +1,128 @@
+import os
+import data_analytics_agent.cache_helper as cache_helper
+import data_analytics_agent.rest_api_helper as rest_api_helper
+
+
+# BigQuery table resources keyed by "project.dataset.table" -> {"table": {...}, "etag": str}.  Entries are
+# evicted least recently used once the byte budget is reached.  Expired entries are not dropped but
+# revalidated with If-None-Match, an unchanged table then costs a 304 without a body.
+_table_cache = cache_helper.TTLCache(
+    max_entries=int(os.getenv("AGENT_ENV_BIGQUERY_TABLE_METADATA_CACHE_MAX_ENTRIES", "4096")),
+    max_bytes=int(os.getenv("AGENT_ENV_BIGQUERY_TABLE_METADATA_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("AGENT_ENV_BIGQUERY_TABLE_METADATA_CACHE_TTL_SECONDS", "300"))
+)
+
+# HTTP 412: the table changed since the etag sent with If-Match was read
+_PRECONDITION_FAILED = 412
+
+
+def get_table_url(project_id: str, dataset_id: str, table_id: str) -> str:
+    return f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/datasets/{dataset_id}/tables/{table_id}"
+
+
+def _table_key(project_id: str, dataset_id: str, table_id: str) -> str:
+    return f"{project_id}.{dataset_id}.{table_id}"
+
+
+def get_cache_stats() -> dict:
+    """Returns the hit/miss/eviction counters of the table metadata cache."""
+    return _table_cache.stats()
+
+
+def is_cached(project_id: str, dataset_id: str, table_id: str) -> bool:
+    """True if the table has an entry (fresh or expired), so reading it is at most a cheap revalidation."""
+    return _table_cache.get_stale(_table_key(project_id, dataset_id, table_id)) is not None
+
+
+def invalidate(project_id: str = None, dataset_id: str = None, table_id: str = None) -> None:
+    """Drops one table, or every table when no name is given."""
+    if table_id is None:
+        _table_cache.clear()
+    else:
+        _table_cache.pop(_table_key(project_id, dataset_id, table_id))
+
+
+def _store(table_key: str, table: dict, etag: str) -> dict:
+    _table_cache.set(table_key, {"table": table, "etag": etag or table.get("etag")})
+    return table
+
+
+def get_table(project_id: str, dataset_id: str, table_id: str, revalidate: bool = False) -> dict:
+    """
+    Returns the tables.get resource of a table.
+
+    A fresh cached copy is returned without a call unless revalidate is True.  Otherwise the cached
+    etag is sent with If-None-Match and the copy is reused on 304.
+
+    Raises:
+        rest_api_helper.RestApiError: e.g. status_code 404 if the table does not exist.
+    """
+    table_key = _table_key(project_id, dataset_id, table_id)
+    if not revalidate:
+        cached = _table_cache.get(table_key)
+        if cached is not None:
+            return cached["table"]
+
+    stale_entry = _table_cache.get_stale(table_key)
+    table, etag = rest_api_helper.rest_api_helper_conditional_get(get_table_url(project_id, dataset_id, table_id), stale_entry["etag"] if stale_entry else None)
+    if table is None: # 304 Not Modified
+        print(f"table_metadata_cache -> {table_key} is unchanged (304).")
+        table = stale_entry["table"]
+    return _store(table_key, table, etag)
+
+
+async def get_table_async(project_id: str, dataset_id: str, table_id: str, revalidate: bool = False) -> dict:
+    """Async version of get_table."""
+    table_key = _table_key(project_id, dataset_id, table_id)
+    if not revalidate:
+        cached = _table_cache.get(table_key)
+        if cached is not None:
+            return cached["table"]
+
+    stale_entry = _table_cache.get_stale(table_key)
+    table, etag = await rest_api_helper.rest_api_helper_conditional_get_async(get_table_url(project_id, dataset_id, table_id), stale_entry["etag"] if stale_entry else None)
+    if table is None: # 304 Not Modified
+        print(f"table_metadata_cache -> {table_key} is unchanged (304).")
+        table = stale_entry["table"]
+    return _store(table_key, table, etag)
+
+
+async def patch_table_async(project_id: str, dataset_id: str, table_id: str, request_body: dict) -> dict:
+    """
+    PATCHes a table with optimistic concurrency: the cached etag is sent with If-Match.
+
+    If the table changed in between (412) its metadata is re-read and the PATCH is sent once more with
+    the new etag.  The returned resource is stored in the cache.
+    """
+    table_key = _table_key(project_id, dataset_id, table_id)
+    url = get_table_url(project_id, dataset_id, table_id)
+
+    for attempt in range(2):
+        stale_entry = _table_cache.get_stale(table_key)
+        extra_headers = {"If-Match": stale_entry["etag"]} if stale_entry and stale_entry["etag"] else None
+        try:
+            table = await rest_api_helper.rest_api_helper_async(url, "PATCH", request_body, extra_headers)
+        except rest_api_helper.RestApiError as e:
+            if e.status_code != _PRECONDITION_FAILED or attempt == 1:
+                raise
+            print(f"table_metadata_cache -> {table_key} changed since it was read (412), re-reading it.")
+            await get_table_async(project_id, dataset_id, table_id, revalidate=True)
+            continue
+        return _store(table_key, table, table.get("etag"))
+
+
+async def update_table_labels_async(project_id: str, dataset_id: str, table_id: str, labels: dict) -> tuple:
+    """
+    Sets labels on a table, skipping the PATCH when the table already has them.
+
+    The table is revalidated first (a 304 when unchanged) so the check never uses stale labels.
+
+    Returns:
+        tuple: (table resource, patched) where patched is False if the labels were already set.
+    """
+    table = await get_table_async(project_id, dataset_id, table_id, revalidate=True)
+    current_labels = table.get("labels", {})
+    if all(current_labels.get(key) == value for key, value in labels.items()):
+        print(f"table_metadata_cache -> {_table_key(project_id, dataset_id, table_id)} already has the labels, not patching.")
+        return table, False
+    return await patch_table_async(project_id, dataset_id, table_id, {"labels": labels}), True
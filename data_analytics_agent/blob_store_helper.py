@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+from google.genai import types
+
+
+# Handles returned by save_json_async: "artifact:<filename>" for the ADK artifact service of the session,
+# "blob:<filename>" for the local blob store directory
+_ARTIFACT_PREFIX = "artifact:"
+_BLOB_PREFIX = "blob:"
+
+
+def get_blob_store_path() -> str:
+  """The directory of the local blob store (AGENT_ENV_BLOB_STORE_PATH, a temp directory by default)."""
+  return os.getenv("AGENT_ENV_BLOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "data_analytics_agent_blobs"))
+
+
+def get_blob_store_limits() -> tuple:
+  """Returns (max_bytes, max_age_seconds) of the local blob store, 0 meaning no limit."""
+  max_bytes = int(os.getenv("AGENT_ENV_BLOB_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+  max_age_seconds = float(os.getenv("AGENT_ENV_BLOB_STORE_MAX_AGE_SECONDS", str(24 * 60 * 60)))
+  return max_bytes, max_age_seconds
+
+
+def prune_blob_store(keep: str = None) -> int:
+  """
+  Deletes the blobs older than max_age_seconds, then the least recently used ones until the store is
+  under max_bytes (put_json and get_json refresh a blob's modification time).  The blob named keep and
+  the files other writers are still writing are never deleted.  Returns the number of files deleted.
+  """
+  max_bytes, max_age_seconds = get_blob_store_limits()
+  try:
+    entries = [entry for entry in os.scandir(get_blob_store_path()) if entry.is_file() and entry.name != keep]
+  except FileNotFoundError:
+    return 0
+
+  now = time.time()
+  files = [] # (modification time, size, path), oldest first
+  for entry in entries:
+    try:
+      stat = entry.stat()
+    except FileNotFoundError: # Deleted by another process
+      continue
+    files.append((stat.st_mtime, stat.st_size, entry.path))
+  files.sort()
+
+  total_bytes = sum(size for _, size, _ in files)
+  if keep is not None:
+    try:
+      total_bytes += os.path.getsize(os.path.join(get_blob_store_path(), keep))
+    except FileNotFoundError:
+      pass
+
+  deleted = 0
+  for modified_at, size, path in files:
+    too_old = max_age_seconds and now - modified_at > max_age_seconds
+    too_large = max_bytes and total_bytes > max_bytes
+    if not too_old and not too_large:
+      break
+    if path.endswith(".tmp") and not too_old:
+      continue
+    try:
+      os.remove(path)
+      deleted += 1
+    except FileNotFoundError:
+      pass
+    total_bytes -= size
+  return deleted
+
+
+def _filename(value_bytes: bytes, name_prefix: str) -> str:
+  """Content addressed, so saving the same payload twice reuses the stored copy."""
+  return f"{name_prefix}-{hashlib.sha256(value_bytes).hexdigest()[:24]}.json"
+
+
+def put_json(value, name_prefix: str) -> str:
+  """Stores a JSON value in the local blob store and returns its handle."""
+  value_bytes = json.dumps(value, default=str).encode("utf-8")
+  filename = _filename(value_bytes, name_prefix)
+  path = os.path.join(get_blob_store_path(), filename)
+  try:
+    os.utime(path) # Already stored, now recently used
+  except FileNotFoundError:
+    os.makedirs(get_blob_store_path(), exist_ok=True)
+    # Written to a temporary file first so a reader never sees a partial blob
+    with tempfile.NamedTemporaryFile("wb", dir=get_blob_store_path(), suffix=".tmp", delete=False) as file:
+      file.write(value_bytes)
+    os.replace(file.name, path)
+    prune_blob_store(keep=filename)
+  return _BLOB_PREFIX + filename
+
+
+def get_json(handle: str):
+  """Reads a value stored by put_json.  Raises KeyError for an unknown handle."""
+  filename = os.path.basename(handle.removeprefix(_BLOB_PREFIX))
+  path = os.path.join(get_blob_store_path(), filename)
+  try:
+    os.utime(path) # Recently used, pruned last
+    with open(path, "rb") as file:
+      return json.loads(file.read())
+  except FileNotFoundError:
+    raise KeyError(f"No payload is stored for {handle}")
+
+
+async def save_json_async(value, name_prefix: str, tool_context=None) -> str:
+  """Stores a JSON value as an artifact of the ADK session, or in the local blob store when there is no
+  tool context or the runner has no artifact service.  Returns the handle to load it with.
+  """
+  if tool_context is not None:
+    value_bytes = json.dumps(value, default=str).encode("utf-8")
+    filename = _filename(value_bytes, name_prefix)
+    try:
+      await tool_context.save_artifact(filename, types.Part.from_bytes(data=value_bytes, mime_type="application/json"))
+      return _ARTIFACT_PREFIX + filename
+    except ValueError: # Artifact service is not initialized
+      pass
+  return put_json(value, name_prefix)
+
+
+async def load_json_async(handle: str, tool_context=None):
+  """Reads a value stored by save_json_async.  Raises KeyError for an unknown handle."""
+  if not handle.startswith(_ARTIFACT_PREFIX):
+    return get_json(handle)
+
+  if tool_context is None:
+    raise KeyError(f"{handle} is an artifact of an ADK session, it can only be loaded from a tool of that session")
+  artifact = await tool_context.load_artifact(handle.removeprefix(_ARTIFACT_PREFIX))
+  if artifact is None or artifact.inline_data is None:
+    raise KeyError(f"No payload is stored for {handle}")
+  return json.loads(artifact.inline_data.data)
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def estimate_size_bytes(value) -> int:
+  """Approximates the memory used by a JSON-like value by the length of its JSON encoding."""
+  try:
+    return len(json.dumps(value, default=str))
+  except (TypeError, ValueError):
+    return len(str(value))
+
+
+class TTLCache:
+  """A thread-safe LRU cache whose entries expire after ttl_seconds.
+
+  The cache is bounded both by the number of entries and by the (estimated)
+  total size in bytes; the least recently used entries are evicted first.
+  Hit/miss/eviction/invalidation counters are kept so callers can report cache efficiency.
+  """
+
+  def __init__(self, max_entries: int = 128, max_bytes: int = None, ttl_seconds: float = None):
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.ttl_seconds = ttl_seconds
+    self._entries = OrderedDict() # key -> (value, size_bytes, stored_at)
+    self._total_bytes = 0
+    self._lock = threading.RLock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.invalidations = 0
+
+  def _is_expired(self, stored_at: float) -> bool:
+    return self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds
+
+  def get(self, key, validate=None):
+    """Returns the cached value, or None if it is missing or expired.
+
+    validate(value) -> bool can veto a cached value (e.g. the source changed); a
+    rejected entry is removed and counted as a miss and an invalidation.  It is
+    called outside of the lock since it may make network calls.
+    """
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None or self._is_expired(entry[2]):
+        self.misses += 1
+        return None
+      value = entry[0]
+
+    if validate is not None and not validate(value):
+      with self._lock:
+        if self._entries.get(key) is entry:
+          self._remove(key)
+        self.misses += 1
+        self.invalidations += 1
+      return None
+
+    with self._lock:
+      if key in self._entries:
+        self._entries.move_to_end(key)
+      self.hits += 1
+    return value
+
+  def get_stale(self, key):
+    """Returns the cached value even if it has expired (without counting a hit or miss).
+
+    Lets callers refresh an expired value incrementally instead of rebuilding it.
+    """
+    with self._lock:
+      entry = self._entries.get(key)
+      return None if entry is None else entry[0]
+
+  def get_age_seconds(self, key) -> float:
+    """Returns how long ago the entry was stored, or None if it is not cached."""
+    with self._lock:
+      entry = self._entries.get(key)
+      return None if entry is None else time.monotonic() - entry[2]
+
+  def set(self, key, value, size_bytes: int = None, age_seconds: float = 0.0) -> None:
+    """Stores a value, evicting least recently used entries to stay within the bounds.
+
+    age_seconds backdates the entry, e.g. for a value loaded from disk that was stored earlier.
+    """
+    if size_bytes is None:
+      size_bytes = estimate_size_bytes(value)
+
+    with self._lock:
+      self._remove(key)
+      # A value larger than the whole budget is never cached
+      if self.max_bytes is not None and size_bytes > self.max_bytes:
+        return
+
+      self._entries[key] = (value, size_bytes, time.monotonic() - age_seconds)
+      self._total_bytes += size_bytes
+
+      while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._total_bytes > self.max_bytes):
+        oldest_key = next(iter(self._entries))
+        self._remove(oldest_key)
+        self.evictions += 1
+
+  def _remove(self, key) -> bool:
+    entry = self._entries.pop(key, None)
+    if entry is None:
+      return False
+    self._total_bytes -= entry[1]
+    return True
+
+  def pop(self, key) -> bool:
+    """Removes an entry.  Returns True if it was cached."""
+    with self._lock:
+      return self._remove(key)
+
+  def clear(self) -> None:
+    """Removes every entry (the counters are kept)."""
+    with self._lock:
+      self._entries.clear()
+      self._total_bytes = 0
+
+  def save(self, path: str) -> None:
+    """Writes the unexpired entries to a JSON file (string keys, JSON values), least recently used first.
+
+    The file is replaced atomically so load never reads a partially written file.
+    """
+    wall_now, monotonic_now = time.time(), time.monotonic()
+    with self._lock:
+      entries = [{"key": key, "value": value, "stored_at": wall_now - (monotonic_now - stored_at)}
+                 for key, (value, size_bytes, stored_at) in self._entries.items() if not self._is_expired(stored_at)]
+
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp", delete=False) as file:
+      json.dump(entries, file)
+    os.replace(file.name, path)
+
+  def load(self, path: str) -> int:
+    """Adds the entries of a file written by save that have not expired since.  Returns how many were loaded."""
+    try:
+      with open(path) as file:
+        entries = json.load(file)
+    except (OSError, ValueError):
+      return 0
+
+    loaded = 0
+    wall_now = time.time()
+    for entry in entries:
+      age_seconds = max(0.0, wall_now - entry["stored_at"])
+      if self.ttl_seconds is not None and age_seconds > self.ttl_seconds:
+        continue
+      self.set(entry["key"], entry["value"], age_seconds=age_seconds)
+      loaded += 1
+    return loaded
+
+  def keys(self) -> list:
+    with self._lock:
+      return list(self._entries.keys())
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def stats(self) -> dict:
+    """Returns the counters and current size of the cache."""
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "entries": len(self._entries),
+        "bytes": self._total_bytes,
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions,
+        "invalidations": self.invalidations,
+        "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+      }
+
+
+class SingleFlight:
+  """Coalesces concurrent calls for the same key: the first caller runs the function and the
+  callers arriving while it runs wait for its result (or its exception) instead of repeating it.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._calls = {} # key -> {"done": Event, "result": ..., "error": ...}
+    self.coalesced = 0
+
+  def do(self, key, function):
+    """Returns function(), sharing one call between the threads asking for the same key at once."""
+    with self._lock:
+      call = self._calls.get(key)
+      is_leader = call is None
+      if is_leader:
+        call = {"done": threading.Event(), "result": None, "error": None}
+        self._calls[key] = call
+      else:
+        self.coalesced += 1
+
+    if not is_leader:
+      call["done"].wait()
+      if call["error"] is not None:
+        raise call["error"]
+      return call["result"]
+
+    try:
+      call["result"] = function()
+      return call["result"]
+    except Exception as e:
+      call["error"] = e
+      raise
+    finally:
+      with self._lock:
+        del self._calls[key]
+      call["done"].set()
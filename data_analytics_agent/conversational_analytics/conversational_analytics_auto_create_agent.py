@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import yaml
 import data_analytics_agent.rest_api_helper as rest_api_helper
 import data_analytics_agent.conversational_analytics.conversational_analytics_data_agent as conversational_analytics_data_agent
@@ -7,7 +8,7 @@ import data_analytics_agent.bigquery.get_bigquery_table_schema as get_bigquery_t
 import data_analytics_agent.gemini.gemini_helper as gemini_helper
 
 
-def create_conversational_analytics_data_agent(conversational_analytics_data_agent_id:str, bigquery_table_list: list[dict]) -> dict:
+async def create_conversational_analytics_data_agent_async(conversational_analytics_data_agent_id:str, bigquery_table_list: list[dict]) -> dict:
     """
     Orchestrates the creation of a complete Conversational Analytics Data Agent.
     
@@ -41,7 +42,7 @@ def create_conversational_analytics_data_agent(conversational_analytics_data_age
     messages = []
     
     # --- Step 1: Check if the data agent already exists ---
-    existence_check = conversational_analytics_data_agent.conversational_analytics_data_agent_exists(conversational_analytics_data_agent_id)
+    existence_check = await conversational_analytics_data_agent.conversational_analytics_data_agent_exists_async(conversational_analytics_data_agent_id)
     messages.extend(existence_check.get("messages", []))
 
     if existence_check["status"] == "failed":
@@ -71,6 +72,9 @@ def create_conversational_analytics_data_agent(conversational_analytics_data_age
         }
     
     messages.append("Preparing data sources and gathering table schemas.")
+    # One bulk fetch (INFORMATION_SCHEMA per dataset / concurrent tables.get) instead of a call per table
+    table_schemas = await asyncio.to_thread(get_bigquery_table_schema.get_bigquery_table_schemas,
+                                            [f"{item['dataset_name']}.{item['table_name']}" for item in bigquery_table_list])
     for item in bigquery_table_list:
         table_id = f"{project_id}.{item['dataset_name']}.{item['table_name']}"
         table_names += f"- {table_id}\n"
@@ -79,7 +83,7 @@ def create_conversational_analytics_data_agent(conversational_analytics_data_age
             "datasetId": item["dataset_name"],
             "tableId": item["table_name"],
         })
-        table_description = get_bigquery_table_schema.get_bigquery_table_schema(item['dataset_name'], item['table_name']) 
+        table_description = (table_schemas["results"] or {}).get(f"{item['dataset_name']}.{item['table_name']}")
         table_descriptions += f"- {table_id}: {table_description}\n"
 
     bigquery_data_source = {"bq": {"tableReferences": table_references}}
@@ -256,7 +260,7 @@ def create_conversational_analytics_data_agent(conversational_analytics_data_age
     messages.append("Generating system instruction YAML with Gemini...")
     try:
         print(conversational_analytics_prompt)
-        gemini_response = gemini_helper.gemini_llm(conversational_analytics_prompt, response_schema=response_schema)
+        gemini_response = await asyncio.to_thread(gemini_helper.gemini_llm, conversational_analytics_prompt, response_schema=response_schema)
         gemini_response_json = json.loads(gemini_response)
         system_instruction = gemini_response_json["generated_yaml"]
         print("*** system_instruction ***")
@@ -273,7 +277,7 @@ def create_conversational_analytics_data_agent(conversational_analytics_data_age
 
     # --- Step 4: Create the Conversational Agent using the agent tool ---
     messages.append("Creating the Conversational Agent...")
-    create_result = conversational_analytics_data_agent.conversational_analytics_data_agent_create(
+    create_result = await conversational_analytics_data_agent.conversational_analytics_data_agent_create_async(
         data_agent_id=conversational_analytics_data_agent_id,
         system_instruction=system_instruction,
         bigquery_data_source=bigquery_data_source,
@@ -288,4 +292,6 @@ def create_conversational_analytics_data_agent(conversational_analytics_data_age
         "query": None,
         "messages": messages,
         "results": create_result.get("results")
-    }
\ No newline at end of file
+    }
+
+create_conversational_analytics_data_agent = rest_api_helper.sync_tool(create_conversational_analytics_data_agent_async)
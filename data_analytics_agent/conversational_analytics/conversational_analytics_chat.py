@@ -1,13 +1,225 @@
 import os
 import json
-import json_stream
-import requests
-import google.auth
-import google.auth.transport.requests
-import collections.abc
+from google.adk.tools import ToolContext
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.blob_store_helper as blob_store_helper
+import data_analytics_agent.conversational_analytics.conversational_analytics_chat_client as chat_client
+
+# The kinds of events iterate_chat_events yields, one per message of the chat stream
+EVENT_CONNECTED = "connected" # The stream is open, sent before the first message
+EVENT_QUESTION = "question"   # The question the agent is answering (systemMessage.schema.query)
+EVENT_QUERY = "query"         # The agent started a query (systemMessage.data.query)
+EVENT_SQL = "sql"             # The SQL generated for the query (systemMessage.data.generatedSql)
+EVENT_DATA = "data"           # The query result rows (systemMessage.data.result)
+EVENT_CHART = "chart"         # A chart request or the generated chart (systemMessage.chart)
+EVENT_TEXT = "text"           # Text from the agent, e.g. the final summary (systemMessage.text)
+EVENT_OTHER = "other"         # Anything else, e.g. the echoed userMessage or a schema resolution
+EVENT_RETRY = "retry"         # The connection broke before the first message and the chat is sent again
+
+
+def _classify_message(message_dict: dict) -> tuple:
+    """Returns (event type, formatted string for the log or None) for a single message dictionary."""
+    system_message = message_dict.get("systemMessage")
+    if not system_message:
+        return EVENT_OTHER, None # Ignore non-system messages like userMessage
+
+    if question := system_message.get("schema", {}).get("query", {}).get("question"):
+        return EVENT_QUESTION, f"User Question: {question}"
+    if generated_sql := system_message.get("data", {}).get("generatedSql"):
+        return EVENT_SQL, f"Generated SQL:\n{generated_sql.strip()}"
+    if instructions := system_message.get("chart", {}).get("query", {}).get("instructions"):
+        return EVENT_CHART, f"Charting Task: {instructions}"
+    if parts := system_message.get("text", {}).get("parts"):
+        return EVENT_TEXT, f"Final Summary: {' '.join(parts)}"
+    if data_query := system_message.get("data", {}).get("query"):
+        return EVENT_QUERY, f"Running Query: {data_query.get('question', '')}".rstrip()
+    if "result" in system_message.get("data", {}):
+        rows = system_message["data"]["result"].get("data", [])
+        return EVENT_DATA, f"Query Result: {len(rows)} rows"
+    if "result" in system_message.get("chart", {}):
+        return EVENT_CHART, "Chart Generated"
+    return EVENT_OTHER, None
+
+
+def _process_message(message_dict: dict) -> str:
+    """Processes a single message dictionary and returns a formatted string for the log."""
+    return _classify_message(message_dict)[1]
+
+
+def _build_chat_request(conversational_analytics_data_agent_id: str, chat_message: str, conversation_id: str) -> tuple:
+    """Returns (url, request_body) of a :chat call, with a conversation_reference when conversation_id is given."""
+    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+    global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
+
+    url = f"https://geminidataanalytics.googleapis.com/v1alpha/projects/{project_id}/locations/{global_location}:chat"
+    data_agent_context = {"data_agent": f"projects/{project_id}/locations/{global_location}/dataAgents/{conversational_analytics_data_agent_id}"}
+
+    if conversation_id:
+        request_body = {
+            "messages": [{"userMessage": {"text": chat_message}}],
+            "conversation_reference": {
+                "conversation": f"projects/{project_id}/locations/{global_location}/conversations/{conversation_id}",
+                "data_agent_context": data_agent_context
+            }
+        }
+    else:
+        request_body = {
+            "messages": [{"userMessage": {"text": chat_message}}],
+            "data_agent_context": data_agent_context
+        }
+    return url, request_body
+
+
+def iterate_chat_events(conversational_analytics_data_agent_id: str, chat_message: str, conversation_id: str = "", metrics: chat_client.ChatMetrics = None):
+    """
+    Sends a chat message and yields an event for each message of the streamed reply as soon as it
+    has been received, while the rest of the stream is still being read.
+
+    The stream is parsed transiently: each top-level message is converted to native Python types on
+    its own and then released, so memory is bounded by one message and not by the whole reply.
+    Timeouts and retries are handled by the shared ConversationalAnalyticsChatClient, a retried
+    attempt is announced with an EVENT_RETRY event.
+
+    Yields:
+        dict: {"type": one of the EVENT_ constants, "text": the log line (or None), "message": the native message (None for "connected" and "retry")}
+
+    Raises:
+        requests.HTTPError: The chat call was rejected.
+        chat_client.ChatTimeoutError: The chat did not finish within the deadline.
+    """
+    url, request_body = _build_chat_request(conversational_analytics_data_agent_id, chat_message, conversation_id)
+
+    connected = False
+    for kind, value in chat_client.get_client().stream_chat(url, request_body, metrics=metrics):
+        if kind == chat_client.RETRY:
+            yield {"type": EVENT_RETRY, "text": f"The connection was lost ({value['error']}), sending the chat again (retry {value['attempt']}).", "message": None}
+            continue
+        if not connected:
+            connected = True
+            yield {"type": EVENT_CONNECTED, "text": "Connection successful. Receiving and processing stream...", "message": None}
+        event_type, text = _classify_message(value)
+        yield {"type": event_type, "text": text, "message": value}
+
+
+async def iterate_chat_events_async(conversational_analytics_data_agent_id: str, chat_message: str, conversation_id: str = "", metrics: chat_client.ChatMetrics = None):
+    """Async iterator version of iterate_chat_events (the stream is read on a worker thread), e.g. for ADK streaming output."""
+    async for event in rest_api_helper.iterate_in_thread_async(iterate_chat_events, conversational_analytics_data_agent_id, chat_message, conversation_id, metrics):
+        yield event
+
+
+def get_compaction_settings() -> tuple:
+    """Returns (enabled, preview_rows): whether large payloads are replaced by handles and how many rows are kept inline."""
+    enabled = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_COMPACT_RESULTS", "true").lower() == "true"
+    preview_rows = int(os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_PREVIEW_ROWS", "5"))
+    return enabled, preview_rows
+
+
+def _column_stats(rows: list) -> dict:
+    """Per column: the null count, the distinct count and for numeric columns min, max and mean."""
+    stats = {}
+    for column in dict.fromkeys(key for row in rows for key in row):
+        values = [row.get(column) for row in rows]
+        present = [value for value in values if value is not None]
+        column_stats = {"nulls": len(values) - len(present), "distinct": len({json.dumps(value, sort_keys=True, default=str) for value in present})}
+        try:
+            numbers = [float(value) for value in present if not isinstance(value, (bool, dict, list))]
+        except (TypeError, ValueError):
+            numbers = []
+        if numbers and len(numbers) == len(present):
+            column_stats.update(min=min(numbers), max=max(numbers), mean=round(sum(numbers) / len(numbers), 6))
+        stats[column] = column_stats
+    return stats
+
+
+async def _compact_message_async(message: dict, tool_context, preview_rows: int) -> dict:
+    """
+    Replaces the large parts of a message (result rows, charts, schema echoes) with a handle to the
+    stored payload and a small summary.  The payloads are read back with conversational_analytics_load_chat_payload.
+    """
+    system_message = message.get("systemMessage", {})
+
+    result = system_message.get("data", {}).get("result")
+    if result and len(result.get("data", [])) > preview_rows:
+        rows = result["data"]
+        system_message["data"]["result"] = dict(
+            {key: value for key, value in result.items() if key != "data"},
+            row_count=len(rows),
+            column_stats=_column_stats(rows),
+            preview_rows=rows[:preview_rows],
+            rows_handle=await blob_store_helper.save_json_async(rows, "chat-rows", tool_context))
+
+    chart_result = system_message.get("chart", {}).get("result")
+    if chart_result:
+        vega_config = chart_result.get("vegaConfig", {})
+        encoding = vega_config.get("encoding", {})
+        system_message["chart"]["result"] = {
+            "mark": vega_config.get("mark", {}).get("type") if isinstance(vega_config.get("mark"), dict) else vega_config.get("mark"),
+            "title": vega_config.get("title"),
+            "fields": {channel: definition.get("field") for channel, definition in encoding.items() if isinstance(definition, dict)},
+            "chart_handle": await blob_store_helper.save_json_async(chart_result, "chat-chart", tool_context)
+        }
+
+    schema_result = system_message.get("schema", {}).get("result")
+    if schema_result:
+        datasources = schema_result.get("datasources", [])
+        system_message["schema"]["result"] = {
+            "datasources": [{key: value for key, value in datasource.items() if key != "schema"} for datasource in datasources],
+            "schema_handle": await blob_store_helper.save_json_async(schema_result, "chat-schema", tool_context)
+        }
+
+    return message
+
+
+async def _chat_async(conversational_analytics_data_agent_id: str, chat_message: str, conversation_id: str, tool_context) -> dict:
+    """
+    Runs a chat to the end and returns the tool result: the log lines in "messages" and the messages in "results".
+    Each message is compacted as it arrives, so neither the full rows nor the charts are ever held for the whole reply.
+    """
+    compact, preview_rows = get_compaction_settings()
+    messages = []
+    if conversation_id:
+        messages.append(f"Starting stateful conversation (ID: {conversation_id}).")
+    else:
+        messages.append("Starting stateless conversation.")
+
+    metrics = chat_client.ChatMetrics()
+    try:
+        streamed_messages = []
+        async for event in iterate_chat_events_async(conversational_analytics_data_agent_id, chat_message, conversation_id, metrics):
+            if event["text"]:
+                messages.append(event["text"])
+            if event["message"] is not None:
+                message = event["message"]
+                if compact:
+                    message = await _compact_message_async(message, tool_context, preview_rows)
+                streamed_messages.append(message)
 
-def conversational_analytics_data_agent_chat_stateful(conversational_analytics_data_agent_id: str, chat_message: str, conversation_id: str) -> dict:
+        messages.append("Stream finished successfully.")
+        messages.append(f"Received {metrics.bytes_received:,} bytes in {metrics.elapsed_ms()} ms "
+                        f"(first message after {metrics.first_message_ms} ms, {metrics.retries} retries).")
+
+        return {
+            "status": "success",
+            "tool_name": "conversational_analytics_data_agent_chat_streaming",
+            "query": chat_message,
+            "messages": messages,
+            "results": streamed_messages
+        }
+
+    except Exception as e:
+        error_message = f"An error occurred during the chat stream: {e}"
+        messages.append(error_message)
+        return {
+            "status": "failed",
+            "tool_name": "conversational_analytics_data_agent_chat_streaming",
+            "query": chat_message,
+            "messages": messages,
+            "results": None
+        }
+
+
+async def conversational_analytics_data_agent_chat_stateful_async(conversational_analytics_data_agent_id: str, chat_message: str, conversation_id: str,
+                                                                  tool_context: ToolContext = None) -> dict:
     """
     Initiates a chat with a Conversational Analytics Data Agent and captures the full streaming response.
     This is a stateful conversation since it has a conversation_id.
@@ -15,11 +227,13 @@ def conversational_analytics_data_agent_chat_stateful(conversational_analytics_d
     This tool handles both stateless (one-off) and stateful (memory-enabled) conversations.
     It connects to the streaming API, collects all the message chunks, processes them to create
     a human-readable log, and returns the complete, structured conversation transcript.
+    Large payloads are not returned inline: result rows, charts and schemas are replaced by a summary
+    (row count, column statistics, the first rows) and a handle that conversational_analytics_load_chat_payload reads.
 
     Args:
         conversational_analytics_data_agent_id (str): The short ID of the data agent to chat with.
         chat_message (str): The user's message or question to send to the agent.
-        conversation_id (str): The ID of an existing conversation to continue a stateful chat. 
+        conversation_id (str): The ID of an existing conversation to continue a stateful chat.
 
     Returns:
         dict: A standard agent tool dictionary containing the status and results.
@@ -51,6 +265,19 @@ def conversational_analytics_data_agent_chat_stateful(conversational_analytics_d
                         "data": { "generatedSql": "SELECT COUNT(*) FROM orders WHERE status = 'shipped';" }
                     }
                 },
+                {
+                    "systemMessage": {
+                        "data": {
+                            "result": {
+                                "schema": { "fields": [{ "name": "status", "type": "STRING" }, { "name": "orders", "type": "INT64" }] },
+                                "row_count": 1250,
+                                "column_stats": { "orders": { "nulls": 0, "distinct": 97, "min": 1, "max": 123, "mean": 14.2 } },
+                                "preview_rows": [{ "status": "shipped", "orders": 123 }],
+                                "rows_handle": "artifact:chat-rows-4f1c2a9b0e7d3c5a8b6f2e1d.json"
+                            }
+                        }
+                    }
+                },
                 {
                     "systemMessage": {
                         "text": { "parts": ["There were 123 shipped orders."] }
@@ -59,106 +286,11 @@ def conversational_analytics_data_agent_chat_stateful(conversational_analytics_d
             ]
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
-    messages = []
-
-    # --- Helper functions are nested to encapsulate them within the tool ---
-
-    def _convert_to_native(obj):
-        """Recursively converts json-stream's objects into native Python types."""
-        if isinstance(obj, collections.abc.Mapping):
-            return {key: _convert_to_native(value) for key, value in obj.items()}
-        elif isinstance(obj, collections.abc.Sequence) and not isinstance(obj, str):
-            return [_convert_to_native(item) for item in obj]
-        else:
-            return obj
-
-    def _process_message(message_dict):
-        """Processes a single message dictionary and returns a formatted string for the log."""
-        system_message = message_dict.get("systemMessage")
-        if not system_message:
-            return None # Ignore non-system messages like userMessage
-
-        if question := system_message.get("schema", {}).get("query", {}).get("question"):
-            return f"User Question: {question}"
-        if generated_sql := system_message.get("data", {}).get("generatedSql"):
-            return f"Generated SQL:\n{generated_sql.strip()}"
-        if instructions := system_message.get("chart", {}).get("query", {}).get("instructions"):
-            return f"Charting Task: {instructions}"
-        if parts := system_message.get("text", {}).get("parts"):
-            return f"Final Summary: {' '.join(parts)}"
-        return None
-
-    # --- Main function logic ---
-
-    url = f"https://geminidataanalytics.googleapis.com/v1alpha/projects/{project_id}/locations/{global_location}:chat"
-    
-    if conversation_id:
-        messages.append(f"Starting stateful conversation (ID: {conversation_id}).")
-        request_body = {
-            "messages": [{"userMessage": {"text": chat_message}}],
-            "conversation_reference": {
-                "conversation": f"projects/{project_id}/locations/{global_location}/conversations/{conversation_id}",
-                "data_agent_context": {"data_agent": f"projects/{project_id}/locations/{global_location}/dataAgents/{conversational_analytics_data_agent_id}"}
-            }
-        }
-    else:
-        messages.append("Starting stateless conversation.")
-        request_body = {
-            "messages": [{"userMessage": {"text": chat_message}}],
-            "data_agent_context": {"data_agent": f"projects/{project_id}/locations/{global_location}/dataAgents/{conversational_analytics_data_agent_id}"}
-        }
-    
-    try:
-        creds, _ = google.auth.default()
-        auth_req = google.auth.transport.requests.Request()
-        creds.refresh(auth_req)
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer " + creds.token
-        }
-
-        all_streamed_objects = []
-        with requests.post(url, json=request_body, headers=headers, stream=True) as response:
-            response.raise_for_status()
-            messages.append("Connection successful. Receiving and processing stream...")
-
-            # Use a persistent listener to capture the entire stream structure
-            message_stream = json_stream.load(response.iter_content(), persistent=True)
-
-            for message_obj in message_stream:
-                processed_info = _process_message(message_obj)
-                if processed_info:
-                    messages.append(processed_info)
-                all_streamed_objects.append(message_obj)
-        
-        messages.append("Stream finished successfully.")
-        
-        # Convert the entire captured stream from custom objects to native Python types
-        native_python_list = _convert_to_native(all_streamed_objects)
-
-        return {
-            "status": "success",
-            "tool_name": "conversational_analytics_data_agent_chat_streaming",
-            "query": chat_message,
-            "messages": messages,
-            "results": native_python_list
-        }
-
-    except Exception as e:
-        error_message = f"An error occurred during the chat stream: {e}"
-        messages.append(error_message)
-        return {
-            "status": "failed",
-            "tool_name": "conversational_analytics_data_agent_chat_streaming",
-            "query": chat_message,
-            "messages": messages,
-            "results": None
-        }
+    return await _chat_async(conversational_analytics_data_agent_id, chat_message, conversation_id, tool_context)
 
 
-def conversational_analytics_data_agent_chat_stateless(conversational_analytics_data_agent_id: str, chat_message: str) -> dict:
+async def conversational_analytics_data_agent_chat_stateless_async(conversational_analytics_data_agent_id: str, chat_message: str,
+                                                                   tool_context: ToolContext = None) -> dict:
     """
     Initiates a chat with a Conversational Analytics Data Agent and captures the full streaming response.
     This is a stateless conversation since it does not have a conversation_id.
@@ -166,6 +298,8 @@ def conversational_analytics_data_agent_chat_stateless(conversational_analytics_
     This tool handles both stateless (one-off) and stateful (memory-enabled) conversations.
     It connects to the streaming API, collects all the message chunks, processes them to create
     a human-readable log, and returns the complete, structured conversation transcript.
+    Large payloads are not returned inline: result rows, charts and schemas are replaced by a summary
+    (row count, column statistics, the first rows) and a handle that conversational_analytics_load_chat_payload reads.
 
     Args:
         conversational_analytics_data_agent_id (str): The short ID of the data agent to chat with.
@@ -178,7 +312,7 @@ def conversational_analytics_data_agent_chat_stateless(conversational_analytics_
             "tool_name": "conversational_analytics_data_agent_chat_streaming",
             "query": "The original user chat_message",
             "messages": [
-                "Starting stateful conversation (ID: my-convo-123).",
+                "Starting stateless conversation.",
                 "Connection successful. Receiving and processing stream...",
                 "User Question: How many orders were shipped?",
                 "Generated SQL:\nSELECT COUNT(*) FROM orders WHERE status = 'shipped';",
@@ -201,6 +335,19 @@ def conversational_analytics_data_agent_chat_stateless(conversational_analytics_
                         "data": { "generatedSql": "SELECT COUNT(*) FROM orders WHERE status = 'shipped';" }
                     }
                 },
+                {
+                    "systemMessage": {
+                        "data": {
+                            "result": {
+                                "schema": { "fields": [{ "name": "status", "type": "STRING" }, { "name": "orders", "type": "INT64" }] },
+                                "row_count": 1250,
+                                "column_stats": { "orders": { "nulls": 0, "distinct": 97, "min": 1, "max": 123, "mean": 14.2 } },
+                                "preview_rows": [{ "status": "shipped", "orders": 123 }],
+                                "rows_handle": "artifact:chat-rows-4f1c2a9b0e7d3c5a8b6f2e1d.json"
+                            }
+                        }
+                    }
+                },
                 {
                     "systemMessage": {
                         "text": { "parts": ["There were 123 shipped orders."] }
@@ -209,102 +356,50 @@ def conversational_analytics_data_agent_chat_stateless(conversational_analytics_
             ]
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
-    messages = []
+    return await _chat_async(conversational_analytics_data_agent_id, chat_message, None, tool_context)
 
-    # --- Helper functions are nested to encapsulate them within the tool ---
-
-    def _convert_to_native(obj):
-        """Recursively converts json-stream's objects into native Python types."""
-        if isinstance(obj, collections.abc.Mapping):
-            return {key: _convert_to_native(value) for key, value in obj.items()}
-        elif isinstance(obj, collections.abc.Sequence) and not isinstance(obj, str):
-            return [_convert_to_native(item) for item in obj]
-        else:
-            return obj
-
-    def _process_message(message_dict):
-        """Processes a single message dictionary and returns a formatted string for the log."""
-        system_message = message_dict.get("systemMessage")
-        if not system_message:
-            return None # Ignore non-system messages like userMessage
-
-        if question := system_message.get("schema", {}).get("query", {}).get("question"):
-            return f"User Question: {question}"
-        if generated_sql := system_message.get("data", {}).get("generatedSql"):
-            return f"Generated SQL:\n{generated_sql.strip()}"
-        if instructions := system_message.get("chart", {}).get("query", {}).get("instructions"):
-            return f"Charting Task: {instructions}"
-        if parts := system_message.get("text", {}).get("parts"):
-            return f"Final Summary: {' '.join(parts)}"
-        return None
-
-    # --- Main function logic ---
-
-    url = f"https://geminidataanalytics.googleapis.com/v1alpha/projects/{project_id}/locations/{global_location}:chat"
-    
-    conversation_id = None
 
-    if conversation_id:
-        messages.append(f"Starting stateful conversation (ID: {conversation_id}).")
-        request_body = {
-            "messages": [{"userMessage": {"text": chat_message}}],
-            "conversation_reference": {
-                "conversation": f"projects/{project_id}/locations/{global_location}/conversations/{conversation_id}",
-                "data_agent_context": {"data_agent": f"projects/{project_id}/locations/{global_location}/dataAgents/{conversational_analytics_data_agent_id}"}
-            }
-        }
-    else:
-        messages.append("Starting stateless conversation.")
-        request_body = {
-            "messages": [{"userMessage": {"text": chat_message}}],
-            "data_agent_context": {"data_agent": f"projects/{project_id}/locations/{global_location}/dataAgents/{conversational_analytics_data_agent_id}"}
-        }
-    
-    try:
-        creds, _ = google.auth.default()
-        auth_req = google.auth.transport.requests.Request()
-        creds.refresh(auth_req)
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer " + creds.token
-        }
+conversational_analytics_data_agent_chat_stateful = rest_api_helper.sync_tool(conversational_analytics_data_agent_chat_stateful_async)
+conversational_analytics_data_agent_chat_stateless = rest_api_helper.sync_tool(conversational_analytics_data_agent_chat_stateless_async)
 
-        all_streamed_objects = []
-        with requests.post(url, json=request_body, headers=headers, stream=True) as response:
-            response.raise_for_status()
-            messages.append("Connection successful. Receiving and processing stream...")
 
-            # Use a persistent listener to capture the entire stream structure
-            message_stream = json_stream.load(response.iter_content(), persistent=True)
+async def conversational_analytics_load_chat_payload_async(handle: str, offset: int = 0, limit: int = 100, tool_context: ToolContext = None) -> dict:
+    """
+    Reads a payload the chat tools stored instead of returning it inline: the result rows
+    ("rows_handle"), a chart ("chart_handle") or a schema ("schema_handle").
 
-            for message_obj in message_stream:
-                processed_info = _process_message(message_obj)
-                if processed_info:
-                    messages.append(processed_info)
-                all_streamed_objects.append(message_obj)
-        
-        messages.append("Stream finished successfully.")
-        
-        # Convert the entire captured stream from custom objects to native Python types
-        native_python_list = _convert_to_native(all_streamed_objects)
+    Args:
+        handle (str): The handle from the chat result.
+        offset (int, optional): For rows, the first row to return.  Defaults to 0.
+        limit (int, optional): For rows, how many rows to return.  Defaults to 100.
 
-        return {
+    Returns:
+        dict:
+        {
             "status": "success",
-            "tool_name": "conversational_analytics_data_agent_chat_streaming",
-            "query": chat_message,
-            "messages": messages,
-            "results": native_python_list
+            "tool_name": "conversational_analytics_load_chat_payload",
+            "query": None,
+            "messages": ["Returned rows 0 to 99 of 1250."],
+            "results": [{ "status": "shipped", "orders": 123 }]
         }
-
+    """
+    messages = []
+    try:
+        payload = await blob_store_helper.load_json_async(handle, tool_context)
     except Exception as e:
-        error_message = f"An error occurred during the chat stream: {e}"
-        messages.append(error_message)
-        return {
-            "status": "failed",
-            "tool_name": "conversational_analytics_data_agent_chat_streaming",
-            "query": chat_message,
-            "messages": messages,
-            "results": None
-        }
\ No newline at end of file
+        messages.append(f"Could not load {handle}: {e}")
+        return { "status": "failed", "tool_name": "conversational_analytics_load_chat_payload", "query": None, "messages": messages, "results": None }
+
+    if isinstance(payload, list):
+        offset = max(0, offset)
+        payload_slice = payload[offset:offset + max(1, limit)]
+        messages.append(f"Returned rows {offset} to {offset + len(payload_slice) - 1} of {len(payload)}.")
+        payload = payload_slice
+    return { "status": "success", "tool_name": "conversational_analytics_load_chat_payload", "query": None, "messages": messages, "results": payload }
+
+conversational_analytics_load_chat_payload = rest_api_helper.sync_tool(conversational_analytics_load_chat_payload_async)
+
+
+def get_chat_metrics() -> dict:
+    """Returns the latency and bytes received of the last chats."""
+    return chat_client.get_client().get_metrics()
@@ -0,0 +1,195 @@
+import os
+import time
+import threading
+import collections
+import json_stream
+import requests
+import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.polling_helper as polling_helper
+
+# HTTP statuses of the :chat call that are worth retrying (throttling and server side errors)
+_RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Kinds of the items ConversationalAnalyticsChatClient.stream_chat yields
+MESSAGE = "message" # A native message of the reply
+RETRY = "retry"     # The connection broke before the first message and the request is being sent again
+
+
+class ChatTimeoutError(TimeoutError):
+    """Raised when a chat is still streaming when its overall deadline passes."""
+
+
+class ChatMetrics:
+    """Latency and size of one chat."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.first_byte_ms = None
+        self.first_message_ms = None
+        self.total_ms = None
+        self.bytes_received = 0
+        self.messages = 0
+        self.retries = 0
+        self.status = "running"
+
+    def elapsed_ms(self) -> float:
+        return round((time.monotonic() - self.started_at) * 1000, 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "total_ms": self.total_ms,
+            "first_byte_ms": self.first_byte_ms,
+            "first_message_ms": self.first_message_ms,
+            "bytes_received": self.bytes_received,
+            "messages": self.messages,
+            "retries": self.retries
+        }
+
+
+class ConversationalAnalyticsChatClient:
+    """
+    Streams :chat replies over the pooled keep-alive session with the shared (cached) credentials.
+
+    A stalled stream fails after idle_timeout_seconds without a byte and the whole chat after
+    deadline_seconds.  A broken connection (or a 429/5xx) is retried up to max_retries times with
+    backoff, but only until the first message of the reply has arrived.  A :chat call cannot be resumed:
+    sending it again after the data agent started answering would run the question a second time and,
+    for a stateful chat, add a duplicate user turn to the conversation.
+    The metrics of the last chats are kept for get_metrics.
+    """
+
+    def __init__(self, idle_timeout_seconds: float = None, deadline_seconds: float = None, max_retries: int = None):
+        self.idle_timeout_seconds = idle_timeout_seconds if idle_timeout_seconds is not None else \
+            float(os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_CHAT_IDLE_TIMEOUT_SECONDS", "120"))
+        self.deadline_seconds = deadline_seconds if deadline_seconds is not None else \
+            float(os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_CHAT_DEADLINE_SECONDS", "600"))
+        self.max_retries = max_retries if max_retries is not None else \
+            int(os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_CHAT_MAX_RETRIES", "2"))
+        self._metrics_lock = threading.Lock()
+        self._recent_metrics = collections.deque(maxlen=100)
+
+    def _open_stream(self, url: str, request_body: dict, deadline: polling_helper.Deadline) -> requests.Response:
+        connect_timeout, _ = rest_api_helper.get_timeout()
+        # The read timeout applies to every socket read, so it bounds the silence between two chunks
+        read_timeout = min(self.idle_timeout_seconds, max(deadline.remaining(), 0.001))
+        response = rest_api_helper.get_session(url).post(url, json=request_body, headers=rest_api_helper.get_auth_headers(),
+                                                        stream=True, timeout=(connect_timeout, read_timeout))
+        if response.status_code == 401:
+            response.close()
+            rest_api_helper.invalidate_access_token()
+            response = rest_api_helper.get_session(url).post(url, json=request_body, headers=rest_api_helper.get_auth_headers(),
+                                                            stream=True, timeout=(connect_timeout, read_timeout))
+        return response
+
+    def _read_chunks(self, response: requests.Response, metrics: ChatMetrics, deadline: polling_helper.Deadline, read_errors: list):
+        """
+        Yields the body as it arrives.  An error is also put in read_errors: the json_stream tokenizer
+        wraps errors of its input in its own I/O error, which would hide whether a retry makes sense.
+        """
+        try:
+            # chunk_size=None hands over the bytes as they arrive instead of waiting for fixed size blocks
+            for chunk in response.iter_content(chunk_size=None):
+                if metrics.first_byte_ms is None:
+                    metrics.first_byte_ms = metrics.elapsed_ms()
+                metrics.bytes_received += len(chunk)
+                if deadline.expired():
+                    raise ChatTimeoutError(f"The chat did not finish within {self.deadline_seconds} seconds.")
+                yield chunk
+        except Exception as e:
+            read_errors.append(e)
+            raise
+
+    def stream_chat(self, url: str, request_body: dict, metrics: ChatMetrics = None):
+        """
+        Sends a :chat request and yields (MESSAGE, native message) for each message of the reply as it
+        arrives, or (RETRY, {"attempt": n, "error": str}) before a retried attempt is streamed.
+
+        Pass a ChatMetrics to read the latency and size of this chat once the stream has finished.
+
+        Raises:
+            ChatTimeoutError: The overall deadline passed.
+            requests.HTTPError: The call was rejected (and not retryable or out of retries).
+            requests.RequestException: The connection broke after the first message or could not be retried.
+        """
+        metrics = metrics or ChatMetrics()
+        deadline = polling_helper.Deadline(self.deadline_seconds)
+        backoff = polling_helper.Backoff(initial_delay=1.0, max_delay=10.0)
+        attempt = 0
+
+        try:
+            while True:
+                received_message = False
+                try:
+                    with self._open_stream(url, request_body, deadline) as response:
+                        response.raise_for_status()
+                        read_errors = []
+                        messages = iter(json_stream.load(self._read_chunks(response, metrics, deadline, read_errors), persistent=False))
+                        while True:
+                            try:
+                                message = json_stream.to_standard_types(next(messages))
+                            except StopIteration:
+                                break
+                            except Exception as e:
+                                if read_errors:
+                                    raise read_errors[0] from e
+                                raise
+                            if metrics.first_message_ms is None:
+                                metrics.first_message_ms = metrics.elapsed_ms()
+                            metrics.messages += 1
+                            received_message = True
+                            yield MESSAGE, message
+                    metrics.status = "success"
+                    return
+
+                except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, requests.HTTPError) as e:
+                    if isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code not in _RETRYABLE_STATUS_CODES:
+                        raise
+                    if attempt >= self.max_retries or received_message:
+                        raise
+                    delay = backoff.next_delay()
+                    if delay >= deadline.remaining():
+                        raise ChatTimeoutError(f"The chat did not finish within {self.deadline_seconds} seconds.") from e
+                    attempt += 1
+                    metrics.retries = attempt
+                    print(f"conversational_analytics_chat_client -> the chat stream broke ({e}), retry {attempt} of {self.max_retries} in {round(delay, 1)}s.")
+                    time.sleep(delay)
+                    yield RETRY, {"attempt": attempt, "error": str(e)}
+
+        except Exception:
+            metrics.status = "failed"
+            raise
+
+        finally:
+            metrics.total_ms = metrics.elapsed_ms()
+            if metrics.status == "running": # The caller stopped reading
+                metrics.status = "abandoned"
+            with self._metrics_lock:
+                self._recent_metrics.append(metrics)
+
+    def get_metrics(self) -> dict:
+        """Returns the metrics of the last chats (newest last) and their totals."""
+        with self._metrics_lock:
+            recent = [metrics.to_dict() for metrics in self._recent_metrics]
+        finished = [metrics for metrics in recent if metrics["status"] == "success"]
+        return {
+            "chats": len(recent),
+            "failed": sum(1 for metrics in recent if metrics["status"] == "failed"),
+            "retries": sum(metrics["retries"] for metrics in recent),
+            "bytes_received": sum(metrics["bytes_received"] for metrics in recent),
+            "average_total_ms": round(sum(metrics["total_ms"] for metrics in finished) / len(finished), 1) if finished else None,
+            "recent": recent
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ConversationalAnalyticsChatClient:
+    """Returns the process wide chat client (configured from the environment on first use)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ConversationalAnalyticsChatClient()
+        return _client
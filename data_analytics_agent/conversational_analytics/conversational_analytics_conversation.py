@@ -2,14 +2,19 @@ import os
 import json
 import yaml
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.conversational_analytics.conversational_analytics_registry as conversational_analytics_registry
 
+# HTTP 409: a conversation with the requested id exists (created outside this process since the registry was loaded)
+_ALREADY_EXISTS = 409
 
-def conversational_analytics_data_agent_conversations_list() -> dict:
+
+async def conversational_analytics_data_agent_conversations_list_async() -> dict:
     """
     Lists all existing conversations in the configured project and region.
 
     This tool is useful for discovering past conversations that can be resumed or analyzed.
-    It returns a list of all conversation resources.
+    It returns a list of all conversation resources (every page of the list is read), and the
+    conversation registry is refreshed with the result.
 
     Returns:
         dict: A standard agent tool dictionary containing the status and results.
@@ -34,20 +39,17 @@ def conversational_analytics_data_agent_conversations_list() -> dict:
             }
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
     messages = []
-    url = f"https://geminidataanalytics.googleapis.com/v1alpha/projects/{project_id}/locations/{global_location}/conversations"
-    
+
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        conversations = await conversational_analytics_registry.conversation_registry.load_async(force=True)
         messages.append("Successfully listed conversations.")
         return {
             "status": "success",
             "tool_name": "conversational_analytics_data_agent_conversations_list",
             "query": None,
             "messages": messages,
-            "results": json_result
+            "results": {"conversations": conversations}
         }
     except Exception as e:
         messages.append(f"An error occurred while listing conversations: {e}")
@@ -59,8 +61,10 @@ def conversational_analytics_data_agent_conversations_list() -> dict:
             "results": None
         }
 
+conversational_analytics_data_agent_conversations_list = rest_api_helper.sync_tool(conversational_analytics_data_agent_conversations_list_async)
+
 
-def conversational_analytics_data_agent_conversations_get(conversation_id: str) -> dict:
+async def conversational_analytics_data_agent_conversations_get_async(conversation_id: str) -> dict:
     """
     Retrieves the full details of a specific conversation by its ID.
 
@@ -89,7 +93,8 @@ def conversational_analytics_data_agent_conversations_get(conversation_id: str)
     url = f"https://geminidataanalytics.googleapis.com/v1alpha/projects/{project_id}/locations/{global_location}/conversations/{conversation_id}"
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
+        conversational_analytics_registry.conversation_registry.put(conversation_id, json_result)
         messages.append(f"Successfully retrieved conversation '{conversation_id}'.")
         return {
             "status": "success",
@@ -108,13 +113,16 @@ def conversational_analytics_data_agent_conversations_get(conversation_id: str)
             "results": None
         }
 
+conversational_analytics_data_agent_conversations_get = rest_api_helper.sync_tool(conversational_analytics_data_agent_conversations_get_async)
 
-def conversational_analytics_data_agent_conversations_exists(conversation_id: str) -> dict:
+
+async def conversational_analytics_data_agent_conversations_exists_async(conversation_id: str) -> dict:
     """
     Checks if a conversation with the specified ID already exists.
 
     This is a convenient pre-flight check to avoid errors when attempting to create a
-    conversation with an ID that is already in use.
+    conversation with an ID that is already in use.  It is answered from the conversation
+    registry, which only lists the conversations again once it is stale.
 
     Args:
         conversation_id (str): The unique identifier for the conversation to check.
@@ -131,25 +139,13 @@ def conversational_analytics_data_agent_conversations_exists(conversation_id: st
             }
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
-    
-    list_result = conversational_analytics_data_agent_conversations_list()
-    messages = list_result.get("messages", [])
-
-    if list_result["status"] == "failed":
-        return list_result
+    messages = []
 
     try:
-        convo_exists = False
-        full_convo_name = f"projects/{project_id}/locations/{global_location}/conversations/{conversation_id}"
-        for item in list_result.get("results", {}).get("conversations", []):
-            if item.get("name") == full_convo_name:
-                convo_exists = True
-                messages.append(f"Conversation '{conversation_id}' already exists.")
-                break
-        
-        if not convo_exists:
+        convo_exists = await conversational_analytics_registry.conversation_registry.exists_async(conversation_id)
+        if convo_exists:
+            messages.append(f"Conversation '{conversation_id}' already exists.")
+        else:
             messages.append(f"Conversation '{conversation_id}' does not exist.")
 
         return {
@@ -169,8 +165,10 @@ def conversational_analytics_data_agent_conversations_exists(conversation_id: st
             "results": None
         }
 
+conversational_analytics_data_agent_conversations_exists = rest_api_helper.sync_tool(conversational_analytics_data_agent_conversations_exists_async)
 
-def conversational_analytics_data_agent_conversations_create(data_agent_id: str, conversation_id: str) -> dict:
+
+async def conversational_analytics_data_agent_conversations_create_async(data_agent_id: str, conversation_id: str) -> dict:
     """
     Creates a new, empty conversation and associates it with a specific data agent.
 
@@ -198,7 +196,7 @@ def conversational_analytics_data_agent_conversations_create(data_agent_id: str,
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
 
-    existence_check = conversational_analytics_data_agent_conversations_exists(conversation_id)
+    existence_check = await conversational_analytics_data_agent_conversations_exists_async(conversation_id)
     messages = existence_check.get("messages", [])
 
     if existence_check["status"] == "failed":
@@ -219,7 +217,8 @@ def conversational_analytics_data_agent_conversations_create(data_agent_id: str,
     }
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
+        conversational_analytics_registry.conversation_registry.put(conversation_id, json_result)
         messages.append(f"Successfully created conversation '{conversation_id}'.")
         return {
             "status": "success",
@@ -229,6 +228,16 @@ def conversational_analytics_data_agent_conversations_create(data_agent_id: str,
             "results": json_result
         }
     except Exception as e:
+        if isinstance(e, rest_api_helper.RestApiError) and e.status_code == _ALREADY_EXISTS:
+            conversational_analytics_registry.conversation_registry.put(conversation_id)
+            messages.append(f"Conversation '{conversation_id}' already exists.")
+            return {
+                "status": "success",
+                "tool_name": "conversational_analytics_data_agent_conversations_create",
+                "query": None,
+                "messages": messages,
+                "results": {"created": False, "reason": "Conversation already exists."}
+            }
         messages.append(f"An error occurred while creating conversation '{conversation_id}': {e}")
         return {
             "status": "failed",
@@ -236,4 +245,6 @@ def conversational_analytics_data_agent_conversations_create(data_agent_id: str,
             "query": None,
             "messages": messages,
             "results": None
-        }
\ No newline at end of file
+        }
+
+conversational_analytics_data_agent_conversations_create = rest_api_helper.sync_tool(conversational_analytics_data_agent_conversations_create_async)
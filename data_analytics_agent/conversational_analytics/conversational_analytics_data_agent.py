@@ -1,13 +1,18 @@
 import os
 import json
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.conversational_analytics.conversational_analytics_registry as conversational_analytics_registry
 
+# HTTP 409: a data agent with the requested id exists (created outside this process since the registry was loaded)
+_ALREADY_EXISTS = 409
 
-def conversational_analytics_data_agent_list() -> dict:
+
+async def conversational_analytics_data_agent_list_async() -> dict:
     """
     Lists all available Conversational Analytics Data Agents in the configured project and region.
 
     This tool is useful for discovering which agents have already been created.
+    Every page of the list is read, and the data agent registry is refreshed with the result.
 
     Returns:
         dict: A standard agent tool dictionary containing the status and results.
@@ -42,20 +47,17 @@ def conversational_analytics_data_agent_list() -> dict:
             }
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
     messages = []
-    url = f"https://geminidataanalytics.googleapis.com/v1alpha/projects/{project_id}/locations/{global_location}/dataAgents"
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        data_agents = await conversational_analytics_registry.data_agent_registry.load_async(force=True)
         messages.append("Successfully listed conversational data agents.")
         return {
             "status": "success",
             "tool_name": "conversational_analytics_data_agent_list",
             "query": None,
             "messages": messages,
-            "results": json_result
+            "results": {"dataAgents": data_agents}
         }
     except Exception as e:
         messages.append(f"An error occurred while listing data agents: {e}")
@@ -67,13 +69,16 @@ def conversational_analytics_data_agent_list() -> dict:
             "results": None
         }
 
+conversational_analytics_data_agent_list = rest_api_helper.sync_tool(conversational_analytics_data_agent_list_async)
 
-def conversational_analytics_data_agent_exists(data_agent_id: str) -> dict:
+
+async def conversational_analytics_data_agent_exists_async(data_agent_id: str) -> dict:
     """
     Checks if a Conversational Analytics Data Agent with a specific ID already exists.
 
     This is a key utility to prevent errors when attempting to create a data agent with
-    an ID that is already in use.
+    an ID that is already in use.  It is answered from the data agent registry, which only
+    lists the data agents again once it is stale.
 
     Args:
         data_agent_id (str): The short, unique identifier for the data agent to check.
@@ -90,25 +95,13 @@ def conversational_analytics_data_agent_exists(data_agent_id: str) -> dict:
             }
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
-
-    list_result = conversational_analytics_data_agent_list()
-    messages = list_result.get("messages", [])
-
-    if list_result["status"] == "failed":
-        return list_result
+    messages = []
 
     try:
-        agent_exists = False
-        full_agent_name = f"projects/{project_id}/locations/{global_location}/dataAgents/{data_agent_id}"
-        for item in list_result.get("results", {}).get("dataAgents", []):
-            if item.get("name") == full_agent_name:
-                agent_exists = True
-                messages.append(f"Data agent '{data_agent_id}' already exists.")
-                break
-        
-        if not agent_exists:
+        agent_exists = await conversational_analytics_registry.data_agent_registry.exists_async(data_agent_id)
+        if agent_exists:
+            messages.append(f"Data agent '{data_agent_id}' already exists.")
+        else:
             messages.append(f"Data agent '{data_agent_id}' does not exist.")
 
         return {
@@ -128,8 +121,10 @@ def conversational_analytics_data_agent_exists(data_agent_id: str) -> dict:
             "results": None
         }
 
+conversational_analytics_data_agent_exists = rest_api_helper.sync_tool(conversational_analytics_data_agent_exists_async)
 
-def conversational_analytics_data_agent_get(data_agent_id: str) -> dict:
+
+async def conversational_analytics_data_agent_get_async(data_agent_id: str) -> dict:
     """
     Retrieves the full configuration and details of a single, specified data agent.
 
@@ -164,7 +159,8 @@ def conversational_analytics_data_agent_get(data_agent_id: str) -> dict:
     url = f"https://geminidataanalytics.googleapis.com/v1alpha/projects/{project_id}/locations/{global_location}/dataAgents/{data_agent_id}"
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
+        conversational_analytics_registry.data_agent_registry.put(data_agent_id, json_result)
         messages.append(f"Successfully retrieved data agent '{data_agent_id}'.")
         return {
             "status": "success",
@@ -183,8 +179,10 @@ def conversational_analytics_data_agent_get(data_agent_id: str) -> dict:
             "results": None
         }
 
+conversational_analytics_data_agent_get = rest_api_helper.sync_tool(conversational_analytics_data_agent_get_async)
+
 
-def conversational_analytics_data_agent_create(data_agent_id: str, system_instruction: str, bigquery_data_source: dict, enable_python: bool = False) -> dict:
+async def conversational_analytics_data_agent_create_async(data_agent_id: str, system_instruction: str, bigquery_data_source: dict, enable_python: bool = False) -> dict:
     """
     Creates a new Conversational Analytics Data Agent if it does not already exist.
 
@@ -218,7 +216,7 @@ def conversational_analytics_data_agent_create(data_agent_id: str, system_instru
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
 
-    existence_check = conversational_analytics_data_agent_exists(data_agent_id)
+    existence_check = await conversational_analytics_data_agent_exists_async(data_agent_id)
     messages = existence_check.get("messages", [])
 
     if existence_check["status"] == "failed":
@@ -245,7 +243,8 @@ def conversational_analytics_data_agent_create(data_agent_id: str, system_instru
     }
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
+        conversational_analytics_registry.data_agent_registry.put(data_agent_id)
         messages.append(f"Successfully created data agent '{data_agent_id}'.")
         return {
             "status": "success",
@@ -255,6 +254,16 @@ def conversational_analytics_data_agent_create(data_agent_id: str, system_instru
             "results": json_result
         }
     except Exception as e:
+        if isinstance(e, rest_api_helper.RestApiError) and e.status_code == _ALREADY_EXISTS:
+            conversational_analytics_registry.data_agent_registry.put(data_agent_id)
+            messages.append(f"Data agent '{data_agent_id}' already exists.")
+            return {
+                "status": "success",
+                "tool_name": "conversational_analytics_data_agent_create",
+                "query": None,
+                "messages": messages,
+                "results": {"created": False, "reason": "Data agent already exists."}
+            }
         messages.append(f"An error occurred while creating data agent '{data_agent_id}': {e}")
         return {
             "status": "failed",
@@ -264,8 +273,10 @@ def conversational_analytics_data_agent_create(data_agent_id: str, system_instru
             "results": None
         }
 
+conversational_analytics_data_agent_create = rest_api_helper.sync_tool(conversational_analytics_data_agent_create_async)
+
 
-def conversational_analytics_data_agent_delete(data_agent_id: str) -> dict:
+async def conversational_analytics_data_agent_delete_async(data_agent_id: str) -> dict:
     """
     Permanently deletes a specified Conversational Analytics Data Agent.
 
@@ -291,7 +302,8 @@ def conversational_analytics_data_agent_delete(data_agent_id: str) -> dict:
 
     try:
         # A successful DELETE often returns an empty JSON object.
-        json_result = rest_api_helper.rest_api_helper(url, "DELETE", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "DELETE", None)
+        conversational_analytics_registry.data_agent_registry.remove(data_agent_id)
         messages.append(f"Successfully deleted data agent '{data_agent_id}'.")
         return {
             "status": "success",
@@ -308,4 +320,6 @@ def conversational_analytics_data_agent_delete(data_agent_id: str) -> dict:
             "query": None,
             "messages": messages,
             "results": None
-        }
\ No newline at end of file
+        }
+
+conversational_analytics_data_agent_delete = rest_api_helper.sync_tool(conversational_analytics_data_agent_delete_async)
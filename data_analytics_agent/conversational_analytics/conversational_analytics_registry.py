@@ -0,0 +1,168 @@
+import os
+import time
+import asyncio
+import threading
+import urllib.parse
+import data_analytics_agent.rest_api_helper as rest_api_helper
+
+
+class ResourceRegistry:
+    """
+    In-process index of the data agents (or conversations) of the configured project and region, keyed
+    by their short id, so an existence check is a dict lookup instead of a list call.
+
+    The index is filled by a paginated list and re-listed once it is older than ttl_seconds (or the
+    project/region changed).  Creates and deletes made by this process update it right away (write-through);
+    resources created or deleted elsewhere show up after the next refresh.  Concurrent refreshes on the same
+    event loop share one list.
+    """
+
+    def __init__(self, collection: str, ttl_seconds: float = None, page_size: int = None):
+        self.collection = collection # "dataAgents" or "conversations", also the key of the list response
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else \
+            float(os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGISTRY_TTL_SECONDS", "300"))
+        self.page_size = page_size if page_size is not None else \
+            int(os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGISTRY_PAGE_SIZE", "100"))
+        self._lock = threading.Lock()
+        self._resources = {} # short id -> resource
+        self._parent = None  # "projects/{project}/locations/{region}" the index was loaded for
+        self._loaded_at = None
+        # Write-through changes: (parent, short id) -> (monotonic time, resource or None if deleted).  A list
+        # started before a change may not include it, so the change is applied again when that list is stored.
+        self._changes = {}
+        self._load_starts = [] # Start times of the lists in flight
+        self._loading = {}     # parent -> asyncio.Task of the list in flight
+        self.loads = 0
+        self.pages = 0
+        self.coalesced = 0
+
+    def get_parent(self) -> str:
+        project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+        global_location = os.getenv("AGENT_ENV_CONVERSATIONAL_ANALYTICS_REGION")
+        return f"projects/{project_id}/locations/{global_location}"
+
+    def _is_fresh(self, parent: str) -> bool:
+        return self._parent == parent and self._loaded_at is not None and \
+            (time.monotonic() - self._loaded_at) < self.ttl_seconds
+
+    async def _list_all_async(self, parent: str) -> list:
+        """Lists every resource of the collection, following nextPageToken."""
+        collection_url = f"https://geminidataanalytics.googleapis.com/v1alpha/{parent}/{self.collection}"
+        resources = []
+        page_token = None
+        while True:
+            query = {"pageSize": self.page_size}
+            if page_token:
+                query["pageToken"] = page_token
+            json_result = await rest_api_helper.rest_api_helper_async(f"{collection_url}?{urllib.parse.urlencode(query)}", "GET", None)
+            self.pages += 1
+            resources.extend(json_result.get(self.collection, []))
+            page_token = json_result.get("nextPageToken")
+            if not page_token:
+                return resources
+
+    async def _load_async(self, parent: str) -> list:
+        started_at = time.monotonic()
+        with self._lock:
+            self._load_starts.append(started_at)
+        try:
+            resources = await self._list_all_async(parent)
+            with self._lock:
+                listed = {resource["name"].rsplit("/", 1)[-1]: resource for resource in resources if resource.get("name")}
+                # Creates and deletes that happened while the list was running win over what it saw
+                for (change_parent, resource_id), (changed_at, resource) in self._changes.items():
+                    if change_parent != parent or changed_at < started_at:
+                        continue
+                    if resource is None:
+                        listed.pop(resource_id, None)
+                    else:
+                        listed[resource_id] = resource
+                self._resources = listed
+                self._parent = parent
+                self._loaded_at = started_at
+                self.loads += 1
+        finally:
+            with self._lock:
+                self._load_starts.remove(started_at)
+                # A change older than every list in flight is in all of them (or in the stored index)
+                oldest_start = min(self._load_starts, default=time.monotonic())
+                self._changes = {key: change for key, change in self._changes.items() if change[0] >= oldest_start}
+        print(f"conversational_analytics_registry -> loaded {len(resources)} {self.collection} of {parent}.")
+        return list(listed.values())
+
+    async def load_async(self, force: bool = False) -> list:
+        """
+        Returns every resource of the collection, re-listing them when the index is stale or force is True.
+
+        Raises:
+            rest_api_helper.RestApiError: The list call failed.
+        """
+        parent = self.get_parent()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not force and self._is_fresh(parent):
+                return list(self._resources.values())
+            # The sync tools run on the background loop and the ADK runner on its own, a task is only shared on its loop
+            task = self._loading.get(parent)
+            if task is not None and task.get_loop() is loop:
+                self.coalesced += 1
+            else:
+                task = loop.create_task(self._load_async(parent))
+                self._loading[parent] = task
+                task.add_done_callback(lambda done_task: self._loading.pop(parent, None) if self._loading.get(parent) is done_task else None)
+        return await asyncio.shield(task)
+
+    async def get_async(self, resource_id: str) -> dict:
+        """Returns the resource with this short id or None if it does not exist (refreshing a stale index first)."""
+        await self.load_async()
+        with self._lock:
+            return self._resources.get(resource_id)
+
+    async def exists_async(self, resource_id: str) -> bool:
+        return await self.get_async(resource_id) is not None
+
+    def put(self, resource_id: str, resource: dict = None) -> None:
+        """Records a resource this process created (or read)."""
+        parent = self.get_parent()
+        resource = resource or {"name": f"{parent}/{self.collection}/{resource_id}"}
+        with self._lock:
+            self._changes[(parent, resource_id)] = (time.monotonic(), resource)
+            if self._parent == parent:
+                self._resources[resource_id] = resource
+
+    def remove(self, resource_id: str) -> None:
+        """Forgets a resource this process deleted."""
+        parent = self.get_parent()
+        with self._lock:
+            self._changes[(parent, resource_id)] = (time.monotonic(), None)
+            if self._parent == parent:
+                self._resources.pop(resource_id, None)
+
+    def invalidate(self) -> None:
+        """Forces a re-list on the next lookup."""
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "collection": self.collection,
+                "parent": self._parent,
+                "resources": len(self._resources),
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None,
+                "loads": self.loads,
+                "pages": self.pages,
+                "coalesced": self.coalesced
+            }
+
+
+data_agent_registry = ResourceRegistry("dataAgents")
+conversation_registry = ResourceRegistry("conversations")
+
+
+def get_registry_stats() -> dict:
+    """Returns the size, age and list call counters of the data agent and conversation registries."""
+    return {
+        "data_agents": data_agent_registry.stats(),
+        "conversations": conversation_registry.stats()
+    }
@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import base64
 import re
 from requests.exceptions import HTTPError 
@@ -7,7 +8,7 @@ import data_analytics_agent.rest_api_helper as rest_api_helper
 import data_analytics_agent.gemini.gemini_helper as gemini_helper
 
 
-def exists_bigquery_pipeline(name: str) -> dict:
+async def exists_bigquery_pipeline_async(name: str) -> dict:
     """
     Checks if a Dataplex repository with a specific ID already exists.
 
@@ -39,7 +40,7 @@ def exists_bigquery_pipeline(name: str) -> dict:
     try:
         messages.append(f"Checking for existence of BigQuery Pipeline (Dataform Repository) with ID: '{name}'.")
         # Call the REST API to get the list of all existing repositories. [1]
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
         messages.append("Successfully retrieved list of all repositories from the API.")
 
         repo_exists = False
@@ -77,8 +78,10 @@ def exists_bigquery_pipeline(name: str) -> dict:
             "results": None
         }
 
+exists_bigquery_pipeline = rest_api_helper.sync_tool(exists_bigquery_pipeline_async)
 
-def create_bigquery_pipeline(name: str) -> dict:
+
+async def create_bigquery_pipeline_async(name: str) -> dict:
     """
     Creates a new Dataform repository, referred to as a BigQuery Pipeline, if it does not already exist.
 
@@ -105,7 +108,7 @@ def create_bigquery_pipeline(name: str) -> dict:
     service_account = os.getenv("AGENT_ENV_DATAFORM_SERVICE_ACCOUNT")
 
     # Check if the repository already exists before attempting to create it.
-    existence_check = exists_bigquery_pipeline(name)
+    existence_check = await exists_bigquery_pipeline_async(name)
     messages = existence_check.get("messages", [])
 
     if existence_check["status"] == "failed":
@@ -139,7 +142,7 @@ def create_bigquery_pipeline(name: str) -> dict:
 
     try:
         # Call the REST API helper to execute the POST request. [2]
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
 
         messages.append(f"Successfully initiated the creation of repository '{name}'.")
         print(f"create_bigquery_pipeline json_result: {json_result}")
@@ -165,8 +168,10 @@ def create_bigquery_pipeline(name: str) -> dict:
             "results": None
         }
 
+create_bigquery_pipeline = rest_api_helper.sync_tool(create_bigquery_pipeline_async)
+
 
-def create_dataform_pipeline(name: str) -> dict:
+async def create_dataform_pipeline_async(name: str) -> dict:
     """
     Creates a new, standard Dataform repository if it does not already exist.
 
@@ -190,7 +195,7 @@ def create_dataform_pipeline(name: str) -> dict:
     service_account = os.getenv("AGENT_ENV_DATAFORM_SERVICE_ACCOUNT")
 
     # Check if the repository already exists before attempting to create it.
-    existence_check = exists_bigquery_pipeline(name)
+    existence_check = await exists_bigquery_pipeline_async(name)
     messages = existence_check.get("messages", [])
 
     if existence_check["status"] == "failed":
@@ -220,7 +225,7 @@ def create_dataform_pipeline(name: str) -> dict:
 
     try:
         # Call the REST API helper to execute the POST request. [2]
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
 
         messages.append(f"Successfully initiated the creation of repository '{name}'.")
         print(f"create_dataform_pipeline json_result: {json_result}")
@@ -246,8 +251,10 @@ def create_dataform_pipeline(name: str) -> dict:
             "results": None
         }
 
+create_dataform_pipeline = rest_api_helper.sync_tool(create_dataform_pipeline_async)
+
 
-def exists_workspace(repository_name: str, workspace_name: str) -> dict:
+async def exists_workspace_async(repository_name: str, workspace_name: str) -> dict:
     """
     Checks if a Dataform workspace with a specific name exists within a repository.
 
@@ -279,7 +286,7 @@ def exists_workspace(repository_name: str, workspace_name: str) -> dict:
     try:
         messages.append(f"Checking for existence of workspace '{workspace_name}' in repository '{repository_name}'.")
         # Call the REST API to get the list of all existing workspaces. [1]
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
         messages.append("Successfully retrieved list of workspaces from the API.")
 
         workspace_exists = False
@@ -317,8 +324,10 @@ def exists_workspace(repository_name: str, workspace_name: str) -> dict:
             "results": None
         }
 
+exists_workspace = rest_api_helper.sync_tool(exists_workspace_async)
 
-def create_workspace(repository_name: str, workspace_name: str) -> dict:
+
+async def create_workspace_async(repository_name: str, workspace_name: str) -> dict:
     """
     Creates a new Dataform workspace in a repository if it does not already exist.
 
@@ -341,7 +350,7 @@ def create_workspace(repository_name: str, workspace_name: str) -> dict:
     dataform_region = os.getenv("AGENT_ENV_DATAFORM_REGION", "us-central1")
 
     # Check if the workspace already exists before attempting to create it.
-    existence_check = exists_workspace(repository_name, workspace_name)
+    existence_check = await exists_workspace_async(repository_name, workspace_name)
     messages = existence_check.get("messages", [])
 
     if existence_check["status"] == "failed":
@@ -369,7 +378,7 @@ def create_workspace(repository_name: str, workspace_name: str) -> dict:
 
     try:
         # Call the REST API helper to execute the POST request. [2]
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
 
         messages.append(f"Successfully initiated the creation of workspace '{workspace_name}'.")
         #print(f"create_workspace json_result: {json_result}")
@@ -395,8 +404,10 @@ def create_workspace(repository_name: str, workspace_name: str) -> dict:
             "results": None
         }    
 
+create_workspace = rest_api_helper.sync_tool(create_workspace_async)
+
 
-def does_workspace_file_exist(repository_name: str, workspace_name: str, file_path: str) -> dict:
+async def does_workspace_file_exist_async(repository_name: str, workspace_name: str, file_path: str) -> dict:
     """
     Checks if a Dataplex file already exists
 
@@ -416,7 +427,7 @@ def does_workspace_file_exist(repository_name: str, workspace_name: str, file_pa
 
     try:
         messages.append(f"Checking for existence of file '{file_path}' in workspace '{workspace_name}'.")
-        rest_api_helper.rest_api_helper(url, "GET", None)
+        await rest_api_helper.rest_api_helper_async(url, "GET", None)
         messages.append("Successfully called the check for existence of file.")
 
         return {
@@ -450,8 +461,10 @@ def does_workspace_file_exist(repository_name: str, workspace_name: str, file_pa
                 "results": None
             }
 
+does_workspace_file_exist = rest_api_helper.sync_tool(does_workspace_file_exist_async)
+
 
-def write_workflow_settings_file(repository_name: str, workspace_name: str) -> dict:
+async def write_workflow_settings_file_async(repository_name: str, workspace_name: str) -> dict:
     """
     Writes the 'workflow_settings.yaml' file to a Dataform workspace.
 
@@ -507,7 +520,7 @@ dataformCoreVersion: 3.0.16"""
         }
 
         # Execute the writeFile request
-        write_result = rest_api_helper.rest_api_helper(write_url, "POST", write_request_body)
+        write_result = await rest_api_helper.rest_api_helper_async(write_url, "POST", write_request_body)
         messages.append(f"Successfully wrote file '{file_path}'.")
         #print(f"write_workflow_settings_file result: {write_result}")
 
@@ -530,9 +543,11 @@ dataformCoreVersion: 3.0.16"""
             "messages": messages,
             "results": None
         }
-       
 
-def write_actions_yaml_file(repository_name: str, workspace_name: str) -> dict:
+write_workflow_settings_file = rest_api_helper.sync_tool(write_workflow_settings_file_async)
+
+
+async def write_actions_yaml_file_async(repository_name: str, workspace_name: str) -> dict:
     """
     Writes a placeholder 'actions.yaml' file to a Dataform workspace.
 
@@ -576,7 +591,7 @@ def write_actions_yaml_file(repository_name: str, workspace_name: str) -> dict:
         }
 
         # Execute the writeFile request
-        write_result = rest_api_helper.rest_api_helper(write_url, "POST", write_request_body)
+        write_result = await rest_api_helper.rest_api_helper_async(write_url, "POST", write_request_body)
         messages.append(f"Successfully wrote file '{file_path}'.")
         #print(f"write_actions_yaml_file result: {write_result}")
 
@@ -600,8 +615,10 @@ def write_actions_yaml_file(repository_name: str, workspace_name: str) -> dict:
             "results": None
         }   
 
+write_actions_yaml_file = rest_api_helper.sync_tool(write_actions_yaml_file_async)
+
 
-def commit_to_workspace(repository_name: str, workspace_name: str, author_name: str, author_email: str, commit_message: str) -> dict:
+async def commit_to_workspace_async(repository_name: str, workspace_name: str, author_name: str, author_email: str, commit_message: str) -> dict:
     """
     Commits pending changes in a Dataform workspace.
 
@@ -642,7 +659,7 @@ def commit_to_workspace(repository_name: str, workspace_name: str, author_name:
         messages.append(f"Attempting to commit changes to workspace '{workspace_name}' in repository '{repository_name}'.")
 
         # Call the REST API helper to execute the POST request.
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         
         messages.append(f"Successfully committed changes with message: '{commit_message}'.")
         #print(f"commit_to_workspace json_result: {json_result}")
@@ -665,9 +682,11 @@ def commit_to_workspace(repository_name: str, workspace_name: str, author_name:
             "messages": messages,
             "results": None
         }
-    
 
-def rollback_workspace(repository_name: str, workspace_name: str) -> dict:
+commit_to_workspace = rest_api_helper.sync_tool(commit_to_workspace_async)
+
+
+async def rollback_workspace_async(repository_name: str, workspace_name: str) -> dict:
     """
     Rollsback pending changes in a Dataform workspace.
 
@@ -702,7 +721,7 @@ def rollback_workspace(repository_name: str, workspace_name: str) -> dict:
         messages.append(f"Attempting to rollback changes to workspace '{workspace_name}' in repository '{repository_name}'.")
 
         # Call the REST API helper to execute the POST request.
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         
         messages.append(f"Successfully rolled back changes'.")
         #(f"commit_to_workspace json_result: {json_result}")
@@ -725,9 +744,11 @@ def rollback_workspace(repository_name: str, workspace_name: str) -> dict:
             "messages": messages,
             "results": None
         }
-    
 
-def perform_data_engineering_task(repository_name: str, workspace_name: str, prompt: str) -> dict:
+rollback_workspace = rest_api_helper.sync_tool(rollback_workspace_async)
+
+
+async def perform_data_engineering_task_async(repository_name: str, workspace_name: str, prompt: str) -> dict:
     """
     Sends a natural language prompt to the Gemini Data Analytics service to generate and execute a data pipeline.
 
@@ -773,7 +794,7 @@ def perform_data_engineering_task(repository_name: str, workspace_name: str, pro
         messages.append(f"Attempting to perform data engineering task in workspace '{workspace_name}' with prompt: '{prompt}'.")
 
         # Call the REST API helper to execute the POST request.
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         
         messages.append("Successfully submitted the data engineering task to the Gemini Data Analytics service.")
         #print(f"perform_data_engineering_task json_result: {json_result}")
@@ -796,9 +817,11 @@ def perform_data_engineering_task(repository_name: str, workspace_name: str, pro
             "messages": messages,
             "results": None
         }    
-    
 
-def compile_and_run_dataform_workflow(repository_name: str, workspace_name: str) -> dict:
+perform_data_engineering_task = rest_api_helper.sync_tool(perform_data_engineering_task_async)
+
+
+async def compile_and_run_dataform_workflow_async(repository_name: str, workspace_name: str) -> dict:
     """
     Compiles a Dataform repository from a workspace and then runs the resulting workflow.
 
@@ -836,7 +859,7 @@ def compile_and_run_dataform_workflow(repository_name: str, workspace_name: str)
             "workspace": workspace_full_path
         }
 
-        compile_result = rest_api_helper.rest_api_helper(compile_url, "POST", compile_request_body)
+        compile_result = await rest_api_helper.rest_api_helper_async(compile_url, "POST", compile_request_body)
         compilation_result_name = compile_result.get("name")
 
         # You might want to check the status of the compilation and only start it if it is "success"!
@@ -855,7 +878,7 @@ def compile_and_run_dataform_workflow(repository_name: str, workspace_name: str)
             "compilationResult": compilation_result_name
         }
         
-        invoke_result = rest_api_helper.rest_api_helper(invoke_url, "POST", invoke_request_body)
+        invoke_result = await rest_api_helper.rest_api_helper_async(invoke_url, "POST", invoke_request_body)
         
         messages.append("Successfully initiated workflow invocation.")
         #(f"compile_and_run_dataform_workflow invoke_result: {invoke_result}")
@@ -880,9 +903,11 @@ def compile_and_run_dataform_workflow(repository_name: str, workspace_name: str)
             "messages": messages,
             "results": None
         }    
-    
- 
-def execute_data_engineering_task(workflow_name: str, workflow_type: str, prompt: str) -> dict:
+
+compile_and_run_dataform_workflow = rest_api_helper.sync_tool(compile_and_run_dataform_workflow_async)
+
+
+async def execute_data_engineering_task_async(workflow_name: str, workflow_type: str, prompt: str) -> dict:
     """
     Orchestrates a complete data engineering workflow from a natural language prompt.
 
@@ -965,38 +990,38 @@ def execute_data_engineering_task(workflow_name: str, workflow_type: str, prompt
         # --- 2. Create Repository ---
         repo_result = None
         if workflow_type == "PIPELINE":
-            create_bigquery_pipeline_result = create_bigquery_pipeline(repository_name)
+            create_bigquery_pipeline_result = await create_bigquery_pipeline_async(repository_name)
             print()
             print()
             print(f"create_bigquery_pipeline_result: {create_bigquery_pipeline_result}")
             process_step("Create BigQuery Pipeline", create_bigquery_pipeline_result)
         else:
-            create_dataform_pipeline_result = create_dataform_pipeline(repository_name)
+            create_dataform_pipeline_result = await create_dataform_pipeline_async(repository_name)
             print()
             print()
             print(f"create_dataform_pipeline_result: {create_dataform_pipeline_result}")
             process_step("Create Dataform Pipeline", create_dataform_pipeline_result)
 
         # --- 3. Create Workspace and Initialize if New ---      
-        create_workspace_result = create_workspace(repository_name, workspace_name)
+        create_workspace_result = await create_workspace_async(repository_name, workspace_name)
         print()
         print()
         print(f"create_workspace_result: {create_workspace_result}")
         process_step("Create Workspace", create_workspace_result)
 
-        does_workspace_file_exist_result = does_workspace_file_exist(repository_name, workspace_name, "workflow_settings.yaml")
+        does_workspace_file_exist_result = await does_workspace_file_exist_async(repository_name, workspace_name, "workflow_settings.yaml")
         print()
         print()
         print(f"does_workspace_file_exist_result: {does_workspace_file_exist_result}")
 
         if does_workspace_file_exist_result["results"]["exists"] == False:
-            write_workflow_settings_file_result = write_workflow_settings_file(repository_name, workspace_name)
+            write_workflow_settings_file_result = await write_workflow_settings_file_async(repository_name, workspace_name)
             print()
             print()
             print(f"write_workflow_settings_file_result: {write_workflow_settings_file_result}")   
             process_step("Write Workflow Settings", write_workflow_settings_file_result)           
 
-            commit_to_workspace_result = commit_to_workspace(repository_name, workspace_name, author_name, author_email, "Commit of workflow_settings.yaml")
+            commit_to_workspace_result = await commit_to_workspace_async(repository_name, workspace_name, author_name, author_email, "Commit of workflow_settings.yaml")
             print()
             print()
             print(f"commit_to_workspace_result: {commit_to_workspace_result}")  
@@ -1011,14 +1036,14 @@ def execute_data_engineering_task(workflow_name: str, workflow_type: str, prompt
         print()
         print()
         print("Running agent.... please wait....")
-        perform_data_engineering_task_result = perform_data_engineering_task(repository_name, workspace_name, prompt)
+        perform_data_engineering_task_result = await perform_data_engineering_task_async(repository_name, workspace_name, prompt)
         print()
         print()
         print(f"perform_data_engineering_task_result: {perform_data_engineering_task_result}")
         process_step("Running BigQuery Data Engineering Agent", perform_data_engineering_task_result)
         
 
-        llm_as_a_judge_result = gemini_helper.llm_as_a_judge(prompt, perform_data_engineering_task_result["results"])
+        llm_as_a_judge_result = await asyncio.to_thread(gemini_helper.llm_as_a_judge, prompt, perform_data_engineering_task_result["results"])
         print()
         print()
         print(f"llm_as_a_judge_result: {llm_as_a_judge_result}")
@@ -1026,32 +1051,32 @@ def execute_data_engineering_task(workflow_name: str, workflow_type: str, prompt
 
 
         if llm_as_a_judge_result == True:
-            commit_to_workspace_after_agent_response = commit_to_workspace(repository_name, workspace_name, author_name, author_email, "Commit data engineering agent code")
+            commit_to_workspace_after_agent_response = await commit_to_workspace_async(repository_name, workspace_name, author_name, author_email, "Commit data engineering agent code")
             print()
             print()
             print(f"commit_to_workspace_after_agent_response: c {commit_to_workspace_after_agent_response}")
             process_step("Commit data engineering agent code", commit_to_workspace_after_agent_response)
 
-            does_actions_file_exist_result = does_workspace_file_exist(repository_name, workspace_name, "definitions/actions.yaml")
+            does_actions_file_exist_result = await does_workspace_file_exist_async(repository_name, workspace_name, "definitions/actions.yaml")
             print()
             print()
             print(f"does_actions_file_exist_result: {does_actions_file_exist_result}")
             process_step("Checking for definitions/actions.yaml", does_actions_file_exist_result)
 
             if does_actions_file_exist_result["results"]["exists"] == False:
-                write_actions_yaml_file_result = write_actions_yaml_file(repository_name, workspace_name)
+                write_actions_yaml_file_result = await write_actions_yaml_file_async(repository_name, workspace_name)
                 print()
                 print()
                 print(f"write_actions_yaml_file_result: {write_actions_yaml_file_result}")
                 process_step("Adding file definitions/actions.yaml", write_actions_yaml_file_result)
 
-                commit_to_workspace_actions_result = commit_to_workspace(repository_name, workspace_name, author_name, author_email, "Commit of actions.yaml")
+                commit_to_workspace_actions_result = await commit_to_workspace_async(repository_name, workspace_name, author_name, author_email, "Commit of actions.yaml")
                 print()
                 print()
                 print(f"commit_to_workspace_actions_result: {commit_to_workspace_actions_result}")
                 process_step("Committing file definitions/actions.yaml", write_actions_yaml_file_result)
 
-            compile_and_run_dataform_workflow_result = compile_and_run_dataform_workflow(repository_name, workspace_name)
+            compile_and_run_dataform_workflow_result = await compile_and_run_dataform_workflow_async(repository_name, workspace_name)
             print()
             print()
             print(f"compile_and_run_dataform_workflow_result: {compile_and_run_dataform_workflow_result}")
@@ -1068,7 +1093,7 @@ def execute_data_engineering_task(workflow_name: str, workflow_type: str, prompt
             response["results"] = compile_and_run_dataform_workflow_result["results"]        
 
         else:
-            rollback_workspace_result = rollback_workspace(repository_name, workspace_name)
+            rollback_workspace_result = await rollback_workspace_async(repository_name, workspace_name)
             print(f"rollback_workspace_result: {rollback_workspace_result}")
             response["status"] = "failed"
             response["results"] = perform_data_engineering_task_result["results"]  
@@ -1084,8 +1109,10 @@ def execute_data_engineering_task(workflow_name: str, workflow_type: str, prompt
 
     return response
 
+execute_data_engineering_task = rest_api_helper.sync_tool(execute_data_engineering_task_async)
+
 
-def get_worflow_invocation_status(repository_name: str, workflow_invocation_id: str) -> dict:
+async def get_worflow_invocation_status_async(repository_name: str, workflow_invocation_id: str) -> dict:
     """
     Checks on the execution status of a workflow.
 
@@ -1125,7 +1152,7 @@ def get_worflow_invocation_status(repository_name: str, workflow_invocation_id:
     try:
         messages.append(f"Checkin on workflow invoation status with workflow_invocation_id: '{workflow_invocation_id}'.")
         # Call the REST API to get the list of all existing repositories. [1]
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
         print(json_result)
 
         return {
@@ -1160,3 +1187,4 @@ def get_worflow_invocation_status(repository_name: str, workflow_invocation_id:
                 "results": None
             }
 
+get_worflow_invocation_status = rest_api_helper.sync_tool(get_worflow_invocation_status_async)
@@ -0,0 +1,398 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import datetime
+import threading
+import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.dataplex.search_data_catalog as search_data_catalog
+
+# An optional local copy of the catalog entries of the project that answers the common
+# search_data_catalog queries (name, display name, description, project, FQN, type, system and
+# location predicates) without calling searchEntries.  Everything else (OR, NOT, grouping, quoted
+# values, column/label/aspect/time predicates) is left to the API.
+#
+# The entries are kept in SQLite with an FTS5 trigram index, which gives the substring matching
+# the API uses for name:, displayname: etc.  The index is filled by crawling searchEntries with an
+# updatetime predicate: a full crawl on first use and then only the entries changed since the
+# newest updateTime seen.  A periodic full crawl drops the entries that were deleted.
+
+# The crawl downloads a bit more of each entry than a normal search does
+_CRAWL_FIELDS = ("nextPageToken,results(linkedResource,dataplexEntry(name,entryType,updateTime,fullyQualifiedName,"
+                 "entrySource(resource,system,location,displayName,description,ancestors,updateTime)))")
+
+# searchEntries time predicates are GMT with second precision
+_UPDATE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_EPOCH = "1970-01-01T00:00:00"
+
+# Predicates answered locally: "key:" is a substring match on a text column, "key=" an exact match
+_SUBSTRING_KEYS = {
+    "name": "resource_id",
+    "displayname": "display_name",
+    "description": "description",
+    "fully_qualified_name": "fully_qualified_name",
+    "projectid": "project_id"
+}
+_EXACT_KEYS = {"type": "entry_type", "system": "system", "location": "location"}
+_TEXT_COLUMNS = ["resource_id", "display_name", "description", "fully_qualified_name"]
+
+_PREDICATE = re.compile(r"^([A-Za-z_]+)([:=])(.+)$")
+
+# Crawled results are written to the index this many at a time (one transaction each)
+_UPSERT_BATCH_SIZE = 500
+
+# The trigram tokenizer cannot match values shorter than a trigram, those are matched with instr()
+_TRIGRAM_LENGTH = 3
+
+# bm25 weights of the FTS columns (resource_id, display_name, description, fully_qualified_name, project_id):
+# a term in the table name counts most, like the relevance ranking of searchEntries
+_BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 1.0)
+
+# Bumped when the tables change, an index file of another version is dropped and crawled again
+_SCHEMA_VERSION = 2
+
+
+def is_enabled() -> bool:
+    return os.getenv("AGENT_ENV_DATA_CATALOG_INDEX_ENABLED", "false").lower() == "true"
+
+
+def get_refresh_settings() -> tuple:
+    """Returns (incremental_refresh_seconds, full_refresh_seconds)."""
+    incremental_refresh_seconds = float(os.getenv("AGENT_ENV_DATA_CATALOG_INDEX_REFRESH_SECONDS", "300"))
+    full_refresh_seconds = float(os.getenv("AGENT_ENV_DATA_CATALOG_INDEX_FULL_REFRESH_SECONDS", "86400"))
+    return incremental_refresh_seconds, full_refresh_seconds
+
+
+def _entry_type(entry_type_name: str) -> str:
+    """projects/dataplex-types/locations/global/entryTypes/bigquery-table -> TABLE (the type= value of the search syntax)."""
+    type_id = (entry_type_name or "").rsplit("/", 1)[-1]
+    if "-" in type_id:
+        type_id = type_id.split("-", 1)[1]
+    return type_id.replace("-", "_").upper()
+
+
+def parse_query(query: str):
+    """
+    Splits a search query into [(column, operator, value)] when it only uses predicates the index can
+    answer, joined by the implicit (or an explicit) AND.  column is None for a bare term.
+
+    Returns None when any part of the query needs the API.
+    """
+    predicates = []
+    for token in (query or "").split():
+        if token.upper() == "AND":
+            continue
+        if token.upper() in ("OR", "NOT") or token.startswith("-") or any(character in token for character in '()"\''):
+            return None
+
+        match = _PREDICATE.match(token)
+        if match is None:
+            if ":" in token or "=" in token or "<" in token or ">" in token:
+                return None
+            predicates.append((None, ":", token))
+            continue
+
+        key, operator, value = match.group(1).lower(), match.group(2), match.group(3)
+        if operator == ":" and key in _SUBSTRING_KEYS:
+            predicates.append((_SUBSTRING_KEYS[key], ":", value))
+        elif operator == "=" and key in _EXACT_KEYS:
+            predicates.append((_EXACT_KEYS[key], "=", value))
+        else:
+            return None
+
+    return predicates or None
+
+
+class CatalogIndex:
+    """
+    The catalog entries in SQLite: an "entries" table with the exact-match columns and the projected
+    search result, and an FTS5 trigram table (same rowid) with the text columns.
+
+    Safe to use from several threads, the connection is only used under a lock.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            if self._connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                self._connection.executescript("""
+                    DROP TABLE IF EXISTS entries;
+                    DROP TABLE IF EXISTS entries_fts;
+                    DROP TABLE IF EXISTS index_state;
+                """)
+                self._connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    rowid INTEGER PRIMARY KEY,
+                    name TEXT UNIQUE NOT NULL,
+                    resource_id TEXT,
+                    display_name TEXT,
+                    entry_type TEXT,
+                    system TEXT,
+                    location TEXT,
+                    update_time TEXT,
+                    crawl_id INTEGER,
+                    result TEXT
+                );
+                CREATE INDEX IF NOT EXISTS entries_crawl_id ON entries (crawl_id);
+                CREATE INDEX IF NOT EXISTS entries_resource_id ON entries (resource_id);
+                CREATE INDEX IF NOT EXISTS entries_display_name ON entries (display_name);
+                CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (
+                    resource_id, display_name, description, fully_qualified_name, project_id, tokenize = 'trigram'
+                );
+                CREATE TABLE IF NOT EXISTS index_state (key TEXT PRIMARY KEY, value TEXT);
+            """)
+            # ORDER BY rank then ranks with the column weights
+            self._connection.execute("INSERT INTO entries_fts (entries_fts, rank) VALUES ('rank', ?)",
+                                     (f"bm25({', '.join(str(weight) for weight in _BM25_WEIGHTS)})",))
+
+    def get_state(self, key: str, default=None):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM index_state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, key: str, value) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO index_state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            page_count = self._connection.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._connection.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def upsert(self, results: list, crawl_id: int = 0) -> str:
+        """
+        Adds or replaces searchEntries results (crawled with _CRAWL_FIELDS) in one transaction.
+
+        Returns:
+            str: The newest updateTime of the results (None if there were none).
+        """
+        newest_update_time = None
+        with self._lock, self._connection:
+            cursor = self._connection.cursor()
+            for result in results:
+                entry = result.get("dataplexEntry", {})
+                entry_source = entry.get("entrySource", {})
+                projected = search_data_catalog.project_search_result(result)
+                resource = projected["resource"] or ""
+                project_match = re.search(r"projects/([^/]+)", resource)
+                update_time = entry.get("updateTime") or entry_source.get("updateTime")
+                if update_time and (newest_update_time is None or update_time > newest_update_time):
+                    newest_update_time = update_time
+
+                resource_id = resource.rsplit("/", 1)[-1]
+                # Lower cased copies of the names for the exact name lookup of search
+                row = (resource_id.lower(), (projected["displayName"] or "").lower(),
+                       _entry_type(entry.get("entryType")), (entry_source.get("system") or "").upper(),
+                       (entry_source.get("location") or "").lower(), update_time, crawl_id, json.dumps(projected))
+                existing = cursor.execute("SELECT rowid FROM entries WHERE name = ?", (projected["name"],)).fetchone()
+                if existing:
+                    rowid = existing[0]
+                    cursor.execute("DELETE FROM entries_fts WHERE rowid = ?", (rowid,))
+                    cursor.execute("UPDATE entries SET resource_id = ?, display_name = ?, entry_type = ?, system = ?, location = ?, "
+                                   "update_time = ?, crawl_id = ?, result = ? WHERE rowid = ?", row + (rowid,))
+                else:
+                    cursor.execute("INSERT INTO entries (name, resource_id, display_name, entry_type, system, location, update_time, crawl_id, result) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (projected["name"],) + row)
+                    rowid = cursor.lastrowid
+
+                cursor.execute("INSERT INTO entries_fts (rowid, resource_id, display_name, description, fully_qualified_name, project_id) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (rowid, resource_id, projected["displayName"] or "", entry_source.get("description") or "",
+                                projected["fullyQualifiedName"] or "", project_match.group(1) if project_match else ""))
+        return newest_update_time
+
+    def remove_older_crawls(self, crawl_id: int) -> int:
+        """Drops the entries a full crawl did not see again (they were deleted).  Returns how many were dropped."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries_fts WHERE rowid IN (SELECT rowid FROM entries WHERE crawl_id < ?)", (crawl_id,))
+            return self._connection.execute("DELETE FROM entries WHERE crawl_id < ?", (crawl_id,)).rowcount
+
+    def search(self, query: str, max_results: int):
+        """
+        Answers a search query locally.
+
+        Returns:
+            list: The projected search results (best match first), or None if the query needs the API.
+        """
+        predicates = parse_query(query)
+        if predicates is None:
+            return None
+
+        match_terms = []
+        conditions = []
+        parameters = []
+        # Names the query spells out in full (a bare term or name:/displayname:), an entry named exactly
+        # that leads the results
+        exact_names = [value.lower() for column, operator, value in predicates if column in (None, "resource_id", "display_name")]
+        for column, operator, value in predicates:
+            if operator == "=":
+                conditions.append(f"e.{column} = ? COLLATE NOCASE")
+                parameters.append(value)
+            elif len(value) >= _TRIGRAM_LENGTH:
+                phrase = '"' + value.replace('"', '""') + '"'
+                match_terms.append(f"{column} : {phrase}" if column else "{" + " ".join(_TEXT_COLUMNS) + "} : " + phrase)
+            else:
+                columns = [column] if column else _TEXT_COLUMNS
+                conditions.append("(" + " OR ".join(f"instr(lower(f.{name}), ?) > 0" for name in columns) + ")")
+                parameters.extend(value.lower() for _ in columns)
+
+        if match_terms:
+            conditions.insert(0, "entries_fts MATCH ?")
+            parameters.insert(0, " AND ".join(match_terms))
+
+        where = " AND ".join(conditions)
+        with self._lock:
+            # Entries named exactly like a term lead the results.  They are looked up through the name
+            # indexes (CROSS JOIN keeps that join order), so a broad term is not scanned for them.
+            exact_rows = []
+            if exact_names:
+                placeholders = ", ".join("?" for _ in exact_names)
+                exact_rows = self._connection.execute(
+                    f"SELECT e.rowid, e.result FROM (SELECT rowid FROM entries WHERE resource_id IN ({placeholders}) "
+                    f"UNION SELECT rowid FROM entries WHERE display_name IN ({placeholders})) AS x "
+                    f"CROSS JOIN entries e ON e.rowid = x.rowid CROSS JOIN entries_fts f ON f.rowid = e.rowid "
+                    f"WHERE {where} ORDER BY length(e.name) LIMIT ?",
+                    exact_names + exact_names + parameters + [max_results]).fetchall()
+
+            # Then every match is ranked before the LIMIT: by bm25 (the relevance order of searchEntries)
+            # or, when only instr() predicates were used, shortest name first
+            order_by = "f.rank" if match_terms else "length(e.name)"
+            ranked_rows = self._connection.execute(
+                f"SELECT e.rowid, e.result FROM entries_fts f JOIN entries e ON e.rowid = f.rowid WHERE {where} ORDER BY {order_by} LIMIT ?",
+                parameters + [max_results + len(exact_rows)]).fetchall()
+
+        exact_rowids = {rowid for rowid, _ in exact_rows}
+        rows = exact_rows + [row for row in ranked_rows if row[0] not in exact_rowids]
+        return [json.loads(result) for _, result in rows[:max_results]]
+
+
+_index = None
+_index_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+
+def get_index() -> CatalogIndex:
+    """Returns the process wide index, opening it on first use (AGENT_ENV_DATA_CATALOG_INDEX_PATH, in memory by default)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CatalogIndex(os.getenv("AGENT_ENV_DATA_CATALOG_INDEX_PATH", ":memory:"))
+        return _index
+
+
+def _to_search_time(update_time: str) -> str:
+    """2024-05-01T10:11:12.345678Z -> 2024-05-01T10:11:12 (the precision of the updatetime predicate)."""
+    return datetime.datetime.fromisoformat(update_time.replace("Z", "+00:00")).astimezone(datetime.timezone.utc).strftime(_UPDATE_TIME_FORMAT)
+
+
+async def refresh_async(full: bool = False) -> dict:
+    """
+    Crawls the catalog entries of the project into the index.
+
+    An incremental refresh only fetches the entries updated since the newest updateTime already
+    indexed (updatetime>= so entries updated within the same second are not missed, re-reading them
+    is harmless).  A full refresh re-reads every entry and then drops the ones it did not see.
+
+    Returns:
+        dict: {"full": bool, "entries_crawled": int, "entries_removed": int, "elapsed_ms": float}
+    """
+    index = get_index()
+    start = time.perf_counter()
+    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+    watermark = index.get_state("watermark")
+    full = full or watermark is None
+    crawl_id = index.get_state("crawl_id", 0) + (1 if full else 0)
+    query = f"updatetime>={_EPOCH if full else _to_search_time(watermark)}"
+
+    entries_crawled = 0
+    page = []
+    async for result in search_data_catalog.iterate_search_results_async(query, f"projects/{project_id}", float("inf"), _CRAWL_FIELDS, lambda result: result):
+        page.append(result)
+        if len(page) == _UPSERT_BATCH_SIZE:
+            newest = index.upsert(page, crawl_id)
+            watermark = max(filter(None, [watermark, newest]), default=None)
+            entries_crawled += len(page)
+            page = []
+    if page:
+        newest = index.upsert(page, crawl_id)
+        watermark = max(filter(None, [watermark, newest]), default=None)
+        entries_crawled += len(page)
+
+    entries_removed = 0
+    now = time.time()
+    if full:
+        entries_removed = index.remove_older_crawls(crawl_id)
+        index.set_state("crawl_id", crawl_id)
+        index.set_state("last_full_refresh", now)
+    index.set_state("watermark", watermark or datetime.datetime.now(datetime.timezone.utc).strftime(_UPDATE_TIME_FORMAT))
+    index.set_state("last_refresh", now)
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    print(f"data_catalog_index -> {'full' if full else 'incremental'} refresh: {entries_crawled} entries crawled, {entries_removed} removed in {elapsed_ms} ms.")
+    return {"full": full, "entries_crawled": entries_crawled, "entries_removed": entries_removed, "elapsed_ms": elapsed_ms}
+
+
+def _refresh_in_background(full: bool) -> None:
+    try:
+        rest_api_helper.run_sync(refresh_async(full))
+    except Exception as e:
+        print(f"data_catalog_index -> refresh failed: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def schedule_refresh() -> None:
+    """Starts a refresh on a background thread if one is due and none is running.  Queries keep using the current index meanwhile."""
+    index = get_index()
+    incremental_refresh_seconds, full_refresh_seconds = get_refresh_settings()
+    now = time.time()
+    full = now - index.get_state("last_full_refresh", 0) >= full_refresh_seconds
+    if not full and now - index.get_state("last_refresh", 0) < incremental_refresh_seconds:
+        return
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_refresh_in_background, args=(full,), name="data-catalog-index-refresh", daemon=True).start()
+
+
+def is_ready() -> bool:
+    """True once a full crawl has completed."""
+    return get_index().get_state("last_full_refresh") is not None
+
+
+def search(query: str, max_results: int):
+    """
+    Answers a search_data_catalog query from the index.
+
+    Returns None (so the caller uses the API) when the index is disabled, has not finished its first
+    crawl or the query uses syntax it cannot answer.  Also schedules a refresh when one is due.
+    """
+    if not is_enabled():
+        return None
+    try:
+        schedule_refresh()
+        if not is_ready():
+            return None
+        return get_index().search(query, max_results)
+    except sqlite3.Error as e: # e.g. an SQLite build without FTS5 or the trigram tokenizer
+        print(f"data_catalog_index -> not using the index: {e}")
+        return None
+
+
+def get_index_stats() -> dict:
+    """Returns the size and refresh times of the index."""
+    index = get_index()
+    return {
+        "entries": index.count(),
+        "bytes": index.size_bytes(),
+        "watermark": index.get_state("watermark"),
+        "last_refresh": index.get_state("last_refresh"),
+        "last_full_refresh": index.get_state("last_full_refresh")
+    }
@@ -1,31 +1,25 @@
 import os
 import json
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.dataplex.data_scan_helper as data_scan_helper
 
-def get_data_discovery_scans() -> dict:
+async def get_data_discovery_scans_async() -> dict:
     """
     Lists all Dataplex data discovery scans in the configured region.
 
     This function specifically filters the results to include only scans of
     type 'DATA_DISCOVERY'.
+    All pages are followed and the type filter is applied by the API.
 
     Returns:
         dict: A dictionary containing the status and the list of data discovery scans.
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
-    url = f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{dataplex_region}/dataScans"
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
-        messages.append("Successfully retrieved list of all data scans from the API.")
-
-        all_scans = json_result.get("dataScans", [])
-        discovery_scans_only = [
-            scan for scan in all_scans if scan.get("type") == "DATA_DISCOVERY"
-        ]
-        messages.append(f"Filtered results. Found {len(discovery_scans_only)} data discovery scans.")
+        # Follows every page, the type filter is applied server-side
+        discovery_scans_only = await data_scan_helper.list_data_scans_async("DATA_DISCOVERY")
+        messages.append(f"Successfully retrieved {len(discovery_scans_only)} data discovery scans from the API.")
 
         filtered_results = {"dataScans": discovery_scans_only}
 
@@ -46,8 +40,10 @@ def get_data_discovery_scans() -> dict:
             "results": None
         }
 
+get_data_discovery_scans = rest_api_helper.sync_tool(get_data_discovery_scans_async)
+
 
-def exists_data_discovery_scan(data_discovery_scan_name: str) -> dict:
+async def exists_data_discovery_scan_async(data_discovery_scan_name: str) -> dict:
     """
     Checks if a Dataplex data discovery scan already exists.
 
@@ -57,26 +53,15 @@ def exists_data_discovery_scan(data_discovery_scan_name: str) -> dict:
     Returns:
         dict: A dictionary containing the status and a boolean result.
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
-
-    list_result = get_data_discovery_scans()
-    messages = list_result.get("messages", [])
-
-    if list_result["status"] == "failed":
-        return list_result
+    messages = []
 
     try:
-        scan_exists = False
-        full_scan_name_to_find = f"projects/{project_id}/locations/{dataplex_region}/dataScans/{data_discovery_scan_name}"
-
-        for item in list_result.get("results", {}).get("dataScans", []):
-            if item.get("name") == full_scan_name_to_find:
-                scan_exists = True
-                messages.append(f"Found matching data discovery scan: '{data_discovery_scan_name}'.")
-                break
-        
-        if not scan_exists:
+        # A single GET on the scan, a 404 means it does not exist
+        scan_exists = await data_scan_helper.data_scan_exists_async(data_discovery_scan_name, "DATA_DISCOVERY")
+
+        if scan_exists:
+            messages.append(f"Found matching data discovery scan: '{data_discovery_scan_name}'.")
+        else:
             messages.append(f"Data discovery scan '{data_discovery_scan_name}' does not exist.")
 
         return {
@@ -87,7 +72,7 @@ def exists_data_discovery_scan(data_discovery_scan_name: str) -> dict:
             "results": {"exists": scan_exists}
         }
     except Exception as e:
-        messages.append(f"An unexpected error occurred while processing scan list: {e}")
+        messages.append(f"An error occurred while checking for data discovery scan existence: {e}")
         return {
             "status": "failed",
             "tool_name": "exists_data_discovery_scan",
@@ -96,8 +81,10 @@ def exists_data_discovery_scan(data_discovery_scan_name: str) -> dict:
             "results": None
         }
 
+exists_data_discovery_scan = rest_api_helper.sync_tool(exists_data_discovery_scan_async)
+
 
-def create_data_discovery_scan(data_discovery_scan_name: str, display_name: str, gcs_bucket_name: str, biglake_connection_name: str) -> dict:
+async def create_data_discovery_scan_async(data_discovery_scan_name: str, display_name: str, gcs_bucket_name: str, biglake_connection_name: str) -> dict:
     """
     Creates a new Dataplex data discovery scan for a GCS bucket to create BigLake tables.
 
@@ -114,7 +101,7 @@ def create_data_discovery_scan(data_discovery_scan_name: str, display_name: str,
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     
-    existence_check = exists_data_discovery_scan(data_discovery_scan_name)
+    existence_check = await exists_data_discovery_scan_async(data_discovery_scan_name)
     messages = existence_check.get("messages", [])
     
     if existence_check["status"] == "failed":
@@ -150,7 +137,7 @@ def create_data_discovery_scan(data_discovery_scan_name: str, display_name: str,
     }
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         messages.append(f"Successfully initiated Data Discovery Scan creation for '{data_discovery_scan_name}'.")
         return {
             "status": "success",
@@ -169,8 +156,10 @@ def create_data_discovery_scan(data_discovery_scan_name: str, display_name: str,
             "results": None
         }
 
+create_data_discovery_scan = rest_api_helper.sync_tool(create_data_discovery_scan_async)
 
-def start_data_discovery_scan(data_discovery_scan_name: str) -> dict:
+
+async def start_data_discovery_scan_async(data_discovery_scan_name: str) -> dict:
     """
     Triggers a run of an existing Dataplex data discovery scan.
 
@@ -187,7 +176,7 @@ def start_data_discovery_scan(data_discovery_scan_name: str) -> dict:
     
     try:
         messages.append(f"Attempting to run Data Discovery Scan '{data_discovery_scan_name}'.")
-        json_result = rest_api_helper.rest_api_helper(url, "POST", {})
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", {})
         job_info = json_result.get("job", {})
         messages.append(f"Successfully started job: {job_info.get('name')} - State: {job_info.get('state')}")
         return {
@@ -207,8 +196,10 @@ def start_data_discovery_scan(data_discovery_scan_name: str) -> dict:
             "results": None
         }
 
+start_data_discovery_scan = rest_api_helper.sync_tool(start_data_discovery_scan_async)
+
 
-def get_data_discovery_scan_state(data_discovery_scan_job_name: str) -> dict:
+async def get_data_discovery_scan_state_async(data_discovery_scan_job_name: str) -> dict:
     """
     Gets the current state of a running data discovery scan job.
 
@@ -220,7 +211,7 @@ def get_data_discovery_scan_state(data_discovery_scan_job_name: str) -> dict:
     url = f"https://dataplex.googleapis.com/v1/{data_discovery_scan_job_name}"
     
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
         state = json_result.get("state", "UNKNOWN")
         messages.append(f"Job '{data_discovery_scan_job_name}' is in state: {state}")
         
@@ -239,4 +230,6 @@ def get_data_discovery_scan_state(data_discovery_scan_job_name: str) -> dict:
             "query": None,
             "messages": messages,
             "results": None
-        }
\ No newline at end of file
+        }
+
+get_data_discovery_scan_state = rest_api_helper.sync_tool(get_data_discovery_scan_state_async)
@@ -1,14 +1,98 @@
+import os
 import json
+import asyncio
+import urllib.parse
+from typing import Optional
+import data_analytics_agent.cache_helper as cache_helper
 import data_analytics_agent.rest_api_helper as rest_api_helper
 import data_analytics_agent.bigquery.run_bigquery_sql as bq_sql 
 
-def get_data_governance_for_table(dataset_id: str, table_name: str) -> dict:
+
+# Dataplex entries keyed by (entry name, requested aspect types) -> {"entry": {...}, "update_time": str}.
+# A fresh entry is reused without a call.  An expired one is revalidated by reading only its updateTime
+# and is reused if the entry has not been updated since, so only changed entries are downloaded again.
+_entry_cache = cache_helper.TTLCache(
+    max_entries=int(os.getenv("AGENT_ENV_DATAPLEX_ENTRY_CACHE_MAX_ENTRIES", "2048")),
+    max_bytes=int(os.getenv("AGENT_ENV_DATAPLEX_ENTRY_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("AGENT_ENV_DATAPLEX_ENTRY_CACHE_TTL_SECONDS", "300"))
+)
+
+
+def get_max_concurrency() -> int:
+    """The number of entries read at once by get_data_governance_for_tables."""
+    return int(os.getenv("AGENT_ENV_DATAPLEX_GOVERNANCE_MAX_CONCURRENCY", "8"))
+
+
+def get_entry_cache_stats() -> dict:
+    """Returns the hit/miss/eviction counters of the entry cache."""
+    return _entry_cache.stats()
+
+
+def _table_entry_url(project_id: str, dataset_id: str, table_name: str) -> str:
+    """The @bigquery entry of a BigQuery table (the entry group Dataplex creates for BigQuery resources)."""
+    bigquery_region = os.getenv("AGENT_ENV_BIGQUERY_REGION")
+    return (f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{bigquery_region}/entryGroups/@bigquery/entries/"
+            f"bigquery.googleapis.com/projects/{project_id}/datasets/{dataset_id}/tables/{table_name}")
+
+
+def _aspect_type_name(aspect_type: str) -> str:
+    """
+    The resource name of an aspect type.  Accepts the full name, the key used in an entry's "aspects"
+    ("601982832853.global.data-governance-aspect-type") or just the id, which is looked up in the global
+    location of the current project.
+    """
+    if aspect_type.startswith("projects/"):
+        return aspect_type
+    parts = aspect_type.split(".")
+    if len(parts) == 3:
+        return f"projects/{parts[0]}/locations/{parts[1]}/aspectTypes/{parts[2]}"
+    return f"projects/{os.getenv('AGENT_ENV_PROJECT_ID')}/locations/global/aspectTypes/{aspect_type}"
+
+
+def _entry_query_string(aspect_types: list) -> str:
+    """view=ALL returns every aspect, view=CUSTOM with aspectTypes only the requested ones (a much smaller response)."""
+    if not aspect_types:
+        return "view=ALL"
+    return urllib.parse.urlencode([("view", "CUSTOM")] + [("aspectTypes", _aspect_type_name(aspect_type)) for aspect_type in aspect_types])
+
+
+async def get_entry_async(project_id: str, dataset_id: str, table_name: str, aspect_types: Optional[list] = None) -> dict:
+    """
+    Returns the Dataplex entry of a table with its aspects (only aspect_types when given), using the entry cache.
+
+    Raises:
+        rest_api_helper.RestApiError: e.g. status_code 404 if the table has no entry.
+    """
+    url = _table_entry_url(project_id, dataset_id, table_name)
+    cache_key = (url, tuple(sorted(aspect_types or [])))
+
+    cached = _entry_cache.get(cache_key)
+    if cached is not None:
+        return cached["entry"]
+
+    stale_entry = _entry_cache.get_stale(cache_key)
+    if stale_entry is not None:
+        # The system "fields" parameter trims the response to the one field compared
+        current = await rest_api_helper.rest_api_helper_async(f"{url}?fields=updateTime", "GET", None)
+        if current.get("updateTime") == stale_entry["update_time"]:
+            print(f"get_data_governance_for_table -> {dataset_id}.{table_name} is unchanged since {stale_entry['update_time']}.")
+            _entry_cache.set(cache_key, stale_entry, size_bytes=len(json.dumps(stale_entry["entry"])))
+            return stale_entry["entry"]
+
+    entry = await rest_api_helper.rest_api_helper_async(f"{url}?{_entry_query_string(aspect_types)}", "GET", None)
+    _entry_cache.set(cache_key, {"entry": entry, "update_time": entry.get("updateTime")}, size_bytes=len(json.dumps(entry)))
+    return entry
+
+
+async def get_data_governance_for_table_async(dataset_id: str, table_name: str, aspect_types: Optional[list[str]] = None) -> dict:
     """
     Gets all the data governance tags on a table (aspect types).
 
     Args:
         dataset_id (str): The dataset in which the table resides.  
         table_name (str): The name of the table.
+        aspect_types (list[str], optional): Only return these aspect types, e.g. ["data-governance-aspect-type"].
+                                            Defaults to all of them.
 
     Returns:
         dict: 
@@ -36,16 +120,11 @@ def get_data_governance_for_table(dataset_id: str, table_name: str) -> dict:
                 }
         }     
     """
-    import os
-
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    bigquery_region = os.getenv("AGENT_ENV_BIGQUERY_REGION")
     messages = []
 
-    url = f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{bigquery_region}/entryGroups/@bigquery/entries/bigquery.googleapis.com/projects/{project_id}/datasets/{dataset_id}/tables/{table_name}?view=ALL"
-
     try:
-        response = rest_api_helper.rest_api_helper(url, "GET", None)
+        response = await get_entry_async(project_id, dataset_id, table_name, aspect_types)
         print(f"get_data_governance_for_table -> response: {json.dumps(response, indent=2)}")
 
         return_value = { "status": "success", "tool_name": "get_data_governance_for_table", "query": None, "messages": messages, "results": response }
@@ -57,3 +136,74 @@ def get_data_governance_for_table(dataset_id: str, table_name: str) -> dict:
         messages.append(f"Error when calling rest api: {e}")
         return_value = { "status": "failed", "tool_name": "get_data_governance_for_table", "query": None, "messages": messages, "results": None }   
         return return_value
+
+get_data_governance_for_table = rest_api_helper.sync_tool(get_data_governance_for_table_async)
+
+
+async def _get_table_governance_async(semaphore: asyncio.Semaphore, table_name: str, aspect_types: list) -> dict:
+    """Reads one table's entry (at most get_max_concurrency at once).  A failure is returned, not raised."""
+    parts = table_name.split(".")
+    if len(parts) == 2:
+        parts = [os.getenv("AGENT_ENV_PROJECT_ID")] + parts
+    if len(parts) != 3:
+        return {"table_name": table_name, "status": "failed", "message": "Expected dataset.table or project.dataset.table.", "entry": None}
+
+    async with semaphore:
+        try:
+            entry = await get_entry_async(parts[0], parts[1], parts[2], aspect_types)
+            return {"table_name": table_name, "status": "success", "message": None, "entry": entry}
+        except Exception as e:
+            return {"table_name": table_name, "status": "failed", "message": f"Error when calling rest api: {e}", "entry": None}
+
+
+async def get_data_governance_for_tables_async(table_names: list[str], aspect_types: Optional[list[str]] = None) -> dict:
+    """
+    Gets the data governance tags (aspect types) on several tables at once.
+
+    Use this instead of calling get_data_governance_for_table for each table, e.g. when auditing the
+    governance of a whole dataset.  The tables are read concurrently and unchanged tables come from a cache.
+
+    Args:
+        table_names (list[str]): The tables as "dataset.table" (current project) or "project.dataset.table".
+        aspect_types (list[str], optional): Only return these aspect types, e.g. ["data-governance-aspect-type"].
+                                            Defaults to all of them.
+
+    Returns:
+        dict: The results are in the same order as table_names.
+        {
+            "status": "success",
+            "tool_name": "get_data_governance_for_tables",
+            "query": None,
+            "messages": ["List of messages during processing"]
+            "results": [
+                {
+                    "table_name": "governed_data_curated.customer",
+                    "status": "success",
+                    "message": None,
+                    "entry": {
+                        "name": "projects/governed-data-1pqzajgatl/locations/us/entryGroups/@bigquery/entries/bigquery.googleapis.com/projects/governed-data-1pqzajgatl/datasets/governed_data_curated/tables/customer",
+                        "entryType": "projects/655216118709/locations/global/entryTypes/bigquery-table",
+                        "updateTime": "2025-06-23T15:51:16.656516Z",
+                        "aspects": { ... as for get_data_governance_for_table ... }
+                    }
+                }
+            ]
+        }
+    """
+    messages = []
+    if not table_names:
+        messages.append("No tables were passed.")
+        return { "status": "failed", "tool_name": "get_data_governance_for_tables", "query": None, "messages": messages, "results": None }
+
+    semaphore = asyncio.Semaphore(max(1, get_max_concurrency()))
+    results = await asyncio.gather(*(_get_table_governance_async(semaphore, table_name, aspect_types) for table_name in table_names))
+
+    failed = [result["table_name"] for result in results if result["status"] == "failed"]
+    messages.append(f"Read the governance of {len(table_names) - len(failed)} of {len(table_names)} tables.")
+    if failed:
+        messages.append(f"Failed: {', '.join(failed)}")
+
+    status = "failed" if failed else "success"
+    return { "status": status, "tool_name": "get_data_governance_for_tables", "query": None, "messages": messages, "results": results }
+
+get_data_governance_for_tables = rest_api_helper.sync_tool(get_data_governance_for_tables_async)
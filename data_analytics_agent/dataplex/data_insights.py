@@ -1,13 +1,16 @@
 import os
 import json
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.table_metadata_cache as table_metadata_cache
+import data_analytics_agent.dataplex.data_scan_helper as data_scan_helper
 
-def get_data_insight_scans() -> dict:
+async def get_data_insight_scans_async() -> dict:
     """
     Lists all Dataplex data insight scans in the configured region.
 
     This function specifically filters the results to include only scans of
     type 'DATA_DOCUMENTATION', which corresponds to Data Insights.
+    All pages are followed and the type filter is applied by the API.
 
     Returns:
         dict: A dictionary containing the status and the list of data insight scans.
@@ -21,28 +24,12 @@ def get_data_insight_scans() -> dict:
             }
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
 
-    # The URL to list all data scans in the specified project and region.
-    url = f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{dataplex_region}/dataScans"
-
     try:
-        # Call the REST API to get the list of all existing data scans
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
-        messages.append("Successfully retrieved list of all data scans from the API.")
-
-        print(f"get_data_insight_scans json_result: {json_result}")
-
-        all_scans = json_result.get("dataScans", [])
-        
-        # Filter for Data Insights scans, which have the type 'DATA_DOCUMENTATION'
-        insight_scans_only = [
-            scan for scan in all_scans if scan.get("type") == "DATA_DOCUMENTATION"
-        ]
-
-        messages.append(f"Filtered results. Found {len(insight_scans_only)} data insight scans.")
+        # Follows every page, the type filter is applied server-side
+        insight_scans_only = await data_scan_helper.list_data_scans_async("DATA_DOCUMENTATION")
+        messages.append(f"Successfully retrieved {len(insight_scans_only)} data insight scans from the API.")
 
         filtered_results = {"dataScans": insight_scans_only}
 
@@ -63,8 +50,10 @@ def get_data_insight_scans() -> dict:
             "results": None
         }
 
+get_data_insight_scans = rest_api_helper.sync_tool(get_data_insight_scans_async)
+
 
-def exists_data_insight_scan(data_insight_scan_name: str) -> dict:
+async def exists_data_insight_scan_async(data_insight_scan_name: str) -> dict:
     """
     Checks if a Dataplex data insight scan already exists.
 
@@ -74,26 +63,15 @@ def exists_data_insight_scan(data_insight_scan_name: str) -> dict:
     Returns:
         dict: A dictionary containing the status and a boolean result.
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
-
-    list_result = get_data_insight_scans()
-    messages = list_result.get("messages", [])
-
-    if list_result["status"] == "failed":
-        return list_result
+    messages = []
 
     try:
-        scan_exists = False
-        full_scan_name_to_find = f"projects/{project_id}/locations/{dataplex_region}/dataScans/{data_insight_scan_name}"
-
-        for item in list_result.get("results", {}).get("dataScans", []):
-            if item.get("name") == full_scan_name_to_find:
-                scan_exists = True
-                messages.append(f"Found matching data insight scan: '{data_insight_scan_name}'.")
-                break
-        
-        if not scan_exists:
+        # A single GET on the scan, a 404 means it does not exist
+        scan_exists = await data_scan_helper.data_scan_exists_async(data_insight_scan_name, "DATA_DOCUMENTATION")
+
+        if scan_exists:
+            messages.append(f"Found matching data insight scan: '{data_insight_scan_name}'.")
+        else:
             messages.append(f"Data insight scan '{data_insight_scan_name}' does not exist.")
 
         return {
@@ -104,7 +82,7 @@ def exists_data_insight_scan(data_insight_scan_name: str) -> dict:
             "results": {"exists": scan_exists}
         }
     except Exception as e:
-        messages.append(f"An unexpected error occurred while processing scan list: {e}")
+        messages.append(f"An error occurred while checking for data insight scan existence: {e}")
         return {
             "status": "failed",
             "tool_name": "exists_data_insight_scan",
@@ -113,8 +91,10 @@ def exists_data_insight_scan(data_insight_scan_name: str) -> dict:
             "results": None
         }
 
+exists_data_insight_scan = rest_api_helper.sync_tool(exists_data_insight_scan_async)
+
 
-def create_data_insight_scan(data_insight_scan_name: str, data_insight_display_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
+async def create_data_insight_scan_async(data_insight_scan_name: str, data_insight_display_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
     """
     Creates a new Dataplex data insight scan if it does not already exist.
 
@@ -130,7 +110,7 @@ def create_data_insight_scan(data_insight_scan_name: str, data_insight_display_n
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     
-    existence_check = exists_data_insight_scan(data_insight_scan_name)
+    existence_check = await exists_data_insight_scan_async(data_insight_scan_name)
     messages = existence_check.get("messages", [])
     
     if existence_check["status"] == "failed":
@@ -158,7 +138,7 @@ def create_data_insight_scan(data_insight_scan_name: str, data_insight_display_n
     }
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         operation_name = json_result.get("name", "Unknown Operation")
         messages.append(f"Successfully initiated Data Insight Scan creation. Operation: {operation_name}")
         return {
@@ -178,8 +158,10 @@ def create_data_insight_scan(data_insight_scan_name: str, data_insight_display_n
             "results": None
         }
 
+create_data_insight_scan = rest_api_helper.sync_tool(create_data_insight_scan_async)
 
-def start_data_insight_scan(data_insight_scan_name: str) -> dict:
+
+async def start_data_insight_scan_async(data_insight_scan_name: str) -> dict:
     """
     Triggers a run of an existing Dataplex data insight scan.
 
@@ -197,7 +179,7 @@ def start_data_insight_scan(data_insight_scan_name: str) -> dict:
 
     try:
         messages.append(f"Attempting to run Data Insight Scan '{data_insight_scan_name}'.")
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         
         job_info = json_result.get("job", {})
         job_name = job_info.get("name", "Unknown Job")
@@ -222,8 +204,10 @@ def start_data_insight_scan(data_insight_scan_name: str) -> dict:
             "results": None
         }
 
+start_data_insight_scan = rest_api_helper.sync_tool(start_data_insight_scan_async)
+
 
-def get_data_insight_scan_state(data_insight_scan_job_name: str) -> dict:
+async def get_data_insight_scan_state_async(data_insight_scan_job_name: str) -> dict:
     """
     Gets the current state of a running data insight scan job.
 
@@ -239,7 +223,7 @@ def get_data_insight_scan_state(data_insight_scan_job_name: str) -> dict:
     url = f"https://dataplex.googleapis.com/v1/{data_insight_scan_job_name}"
     
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
         state = json_result.get("state", "UNKNOWN")
         messages.append(f"Job '{data_insight_scan_job_name}' is in state: {state}")
         return {
@@ -259,8 +243,10 @@ def get_data_insight_scan_state(data_insight_scan_job_name: str) -> dict:
             "results": None
         }
 
+get_data_insight_scan_state = rest_api_helper.sync_tool(get_data_insight_scan_state_async)
+
 
-def update_bigquery_table_dataplex_labels_for_insights(dataplex_scan_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
+async def update_bigquery_table_dataplex_labels_for_insights_async(dataplex_scan_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
     """
     Updates a BigQuery table's labels to link it to a Dataplex data insight scan.
 
@@ -275,7 +261,6 @@ def update_bigquery_table_dataplex_labels_for_insights(dataplex_scan_name: str,
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
-    url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/datasets/{bigquery_dataset_name}/tables/{bigquery_table_name}"
 
     request_body = {
         "labels": {
@@ -287,8 +272,9 @@ def update_bigquery_table_dataplex_labels_for_insights(dataplex_scan_name: str,
 
     try:
         messages.append(f"Patching BigQuery table '{bigquery_dataset_name}.{bigquery_table_name}' with Data Insight labels.")
-        json_result = rest_api_helper.rest_api_helper(url, "PATCH", request_body)
-        messages.append("Successfully updated BigQuery table labels for data insights.")
+        # Revalidates the cached table (304 when unchanged) and only PATCHes with If-Match when a label differs
+        json_result, patched = await table_metadata_cache.update_table_labels_async(project_id, bigquery_dataset_name, bigquery_table_name, request_body["labels"])
+        messages.append("Successfully updated BigQuery table labels for data insights." if patched else "The BigQuery table already has these labels.")
 
         return {
             "status": "success",
@@ -305,4 +291,6 @@ def update_bigquery_table_dataplex_labels_for_insights(dataplex_scan_name: str,
             "query": None,
             "messages": messages,
             "results": None
-        }
\ No newline at end of file
+        }
+
+update_bigquery_table_dataplex_labels_for_insights = rest_api_helper.sync_tool(update_bigquery_table_dataplex_labels_for_insights_async)
@@ -1,13 +1,16 @@
 import os
 import json
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.table_metadata_cache as table_metadata_cache
+import data_analytics_agent.dataplex.data_scan_helper as data_scan_helper
 
-def get_data_profile_scans() -> dict:
+async def get_data_profile_scans_async() -> dict:
     """
     Lists all Dataplex data profile scans in the configured region.
 
     This function specifically filters the results to include only scans of
     type 'DATA_PROFILE'.
+    All pages are followed and the type filter is applied by the API.
 
     Returns:
         dict: A dictionary containing the status and the list of data profile scans.
@@ -21,29 +24,13 @@ def get_data_profile_scans() -> dict:
             }
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
 
-    # The URL to list all data scans in the specified project and region.
-    url = f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{dataplex_region}/dataScans"
-
     try:
-        # Call the REST API to get the list of all existing data scans
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
-        messages.append("Successfully retrieved list of all data scans from the API.")
-
-        # Filter the returned scans to only include those of type 'DATA_PROFILE'
-        all_scans = json_result.get("dataScans", [])
-        
-        # Using a list comprehension for a concise filter
-        profile_scans_only = [
-            scan for scan in all_scans if scan.get("type") == "DATA_PROFILE"
-        ]
+        # Follows every page, the type filter is applied server-side
+        profile_scans_only = await data_scan_helper.list_data_scans_async("DATA_PROFILE")
+        messages.append(f"Successfully retrieved {len(profile_scans_only)} data profile scans from the API.")
 
-        messages.append(f"Filtered results. Found {len(profile_scans_only)} data profile scans.")
-
-        # Create the final results payload with the filtered list
         filtered_results = {"dataScans": profile_scans_only}
 
         return {
@@ -63,10 +50,12 @@ def get_data_profile_scans() -> dict:
             "results": None
         }
 
+get_data_profile_scans = rest_api_helper.sync_tool(get_data_profile_scans_async)
+
 
-def exists_data_profile_scan(data_profile_scan_name: str) -> dict:
+async def exists_data_profile_scan_async(data_profile_scan_name: str) -> dict:
     """
-    Checks if a Dataplex data profile scan already exists by checking the full list.
+    Checks if a Dataplex data profile scan already exists.
 
     Args:
         data_profile_scan_name (str): The short name/ID of the data profile scan.
@@ -83,36 +72,15 @@ def exists_data_profile_scan(data_profile_scan_name: str) -> dict:
             }
         }
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
-
-    # Call the dedicated function to list all scans
-    list_result = get_data_profile_scans()
-    messages = list_result.get("messages", [])
-
-    # If listing scans failed, propagate the failure
-    if list_result["status"] == "failed":
-        return {
-            "status": "failed",
-            "tool_name": "exists_data_profile_scan",
-            "query": None,
-            "messages": messages,
-            "results": None
-        }
+    messages = []
 
     try:
-        scan_exists = False
-        json_payload = list_result.get("results", {})
-        full_scan_name_to_find = f"projects/{project_id}/locations/{dataplex_region}/dataScans/{data_profile_scan_name}"
-
-        # Loop through the list of scans from the results
-        for item in json_payload.get("dataScans", []):
-            if item.get("name") == full_scan_name_to_find:
-                scan_exists = True
-                messages.append(f"Found matching scan: '{data_profile_scan_name}'.")
-                break
-        
-        if not scan_exists:
+        # A single GET on the scan, a 404 means it does not exist
+        scan_exists = await data_scan_helper.data_scan_exists_async(data_profile_scan_name, "DATA_PROFILE")
+
+        if scan_exists:
+            messages.append(f"Found matching scan: '{data_profile_scan_name}'.")
+        else:
             messages.append(f"Scan '{data_profile_scan_name}' does not exist.")
 
         return {
@@ -122,8 +90,8 @@ def exists_data_profile_scan(data_profile_scan_name: str) -> dict:
             "messages": messages,
             "results": {"exists": scan_exists}
         }
-    except Exception as e: # Catch potential errors while processing the list
-        messages.append(f"An unexpected error occurred while processing scan list: {e}")
+    except Exception as e:
+        messages.append(f"An error occurred while checking for data profile scan existence: {e}")
         return {
             "status": "failed",
             "tool_name": "exists_data_profile_scan",
@@ -132,8 +100,10 @@ def exists_data_profile_scan(data_profile_scan_name: str) -> dict:
             "results": None
         }
 
+exists_data_profile_scan = rest_api_helper.sync_tool(exists_data_profile_scan_async)
+
 
-def create_data_profile_scan(data_profile_scan_name: str, data_profile_display_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
+async def create_data_profile_scan_async(data_profile_scan_name: str, data_profile_display_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
     """
     Creates a new Dataplex data profile scan if it does not already exist.
 
@@ -157,7 +127,7 @@ def create_data_profile_scan(data_profile_scan_name: str, data_profile_display_n
     dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     
     # First, check if the data profile scan already exists.
-    existence_check = exists_data_profile_scan(data_profile_scan_name)
+    existence_check = await exists_data_profile_scan_async(data_profile_scan_name)
     messages = existence_check.get("messages", [])
     
     # If the check failed, propagate the failure.
@@ -200,7 +170,7 @@ def create_data_profile_scan(data_profile_scan_name: str, data_profile_display_n
 
     try:
         # The create API returns a long-running operation object.
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         
         operation_name = json_result.get("name", "Unknown Operation")
         messages.append(f"Successfully initiated Data Profile Scan creation. Operation: {operation_name}")
@@ -223,8 +193,10 @@ def create_data_profile_scan(data_profile_scan_name: str, data_profile_display_n
             "results": None
         }    
 
+create_data_profile_scan = rest_api_helper.sync_tool(create_data_profile_scan_async)
 
-def start_data_profile_scan(data_profile_scan_name: str) -> dict:
+
+async def start_data_profile_scan_async(data_profile_scan_name: str) -> dict:
     """
     Triggers a run of an existing Dataplex data profile scan.
 
@@ -268,7 +240,7 @@ def start_data_profile_scan(data_profile_scan_name: str) -> dict:
         messages.append(f"Attempting to run Data Profile Scan '{data_profile_scan_name}'.")
         
         # Call the REST API to trigger the scan run.
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         
         # Extract job details for a more informative message.
         # Use .get() for safe access in case the response structure is unexpected.
@@ -295,9 +267,11 @@ def start_data_profile_scan(data_profile_scan_name: str) -> dict:
             "messages": messages,
             "results": None
         }    
-    
 
-def get_data_profile_scan_state(data_profile_scan_job_name: str) -> dict:
+start_data_profile_scan = rest_api_helper.sync_tool(start_data_profile_scan_async)
+
+
+async def get_data_profile_scan_state_async(data_profile_scan_job_name: str) -> dict:
     """
     Gets the current state of a running data profile scan job.
 
@@ -327,7 +301,7 @@ def get_data_profile_scan_state(data_profile_scan_job_name: str) -> dict:
     
     try:
         # Make a GET request to the specific job URL.
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
         
         # Safely extract the state from the response.
         state = json_result.get("state", "UNKNOWN")
@@ -349,9 +323,11 @@ def get_data_profile_scan_state(data_profile_scan_job_name: str) -> dict:
             "messages": messages,
             "results": None
         }
-    
 
-def update_bigquery_table_dataplex_labels(dataplex_scan_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
+get_data_profile_scan_state = rest_api_helper.sync_tool(get_data_profile_scan_state_async)
+
+
+async def update_bigquery_table_dataplex_labels_async(dataplex_scan_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
     """
     Updates a BigQuery table's labels to link it to a Dataplex data profile scan.
 
@@ -377,10 +353,6 @@ def update_bigquery_table_dataplex_labels(dataplex_scan_name: str, bigquery_data
     dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
 
-    # API endpoint for patching a BigQuery table's metadata.
-    # https://cloud.google.com/bigquery/docs/reference/rest/v2/tables/patch
-    url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/datasets/{bigquery_dataset_name}/tables/{bigquery_table_name}"
-
     # The request body contains the specific labels that link the table to the scan.
     request_body = {
         "labels": {
@@ -392,11 +364,10 @@ def update_bigquery_table_dataplex_labels(dataplex_scan_name: str, bigquery_data
 
     try:
         messages.append(f"Patching BigQuery table '{bigquery_dataset_name}.{bigquery_table_name}' with Dataplex labels.")
-        
-        # Call the REST API using PATCH to update the table's labels.
-        json_result = rest_api_helper.rest_api_helper(url, "PATCH", request_body)
-        
-        messages.append("Successfully updated BigQuery table labels.")
+
+        # Revalidates the cached table (304 when unchanged) and only PATCHes with If-Match when a label differs
+        json_result, patched = await table_metadata_cache.update_table_labels_async(project_id, bigquery_dataset_name, bigquery_table_name, request_body["labels"])
+        messages.append("Successfully updated BigQuery table labels." if patched else "The BigQuery table already has these labels.")
 
         return {
             "status": "success",
@@ -414,4 +385,6 @@ def update_bigquery_table_dataplex_labels(dataplex_scan_name: str, bigquery_data
             "query": None,
             "messages": messages,
             "results": None
-        }
\ No newline at end of file
+        }
+
+update_bigquery_table_dataplex_labels = rest_api_helper.sync_tool(update_bigquery_table_dataplex_labels_async)
@@ -1,33 +1,29 @@
 import os
 import json
+import asyncio
 import data_analytics_agent.rest_api_helper as rest_api_helper
+import data_analytics_agent.bigquery.table_metadata_cache as table_metadata_cache
+import data_analytics_agent.dataplex.data_scan_helper as data_scan_helper
 import data_analytics_agent.dataplex.data_profile as data_profile
 
 
-def get_data_quality_scans() -> dict:
+async def get_data_quality_scans_async() -> dict:
     """
     Lists all Dataplex data quality scans in the configured region.
 
     This function specifically filters the results to include only scans of
     type 'DATA_QUALITY'.
+    All pages are followed and the type filter is applied by the API.
 
     Returns:
         dict: A dictionary containing the status and the list of data quality scans.
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
-    url = f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{dataplex_region}/dataScans"
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
-        messages.append("Successfully retrieved list of all data scans from the API.")
-
-        all_scans = json_result.get("dataScans", [])
-        quality_scans_only = [
-            scan for scan in all_scans if scan.get("type") == "DATA_QUALITY"
-        ]
-        messages.append(f"Filtered results. Found {len(quality_scans_only)} data quality scans.")
+        # Follows every page, the type filter is applied server-side
+        quality_scans_only = await data_scan_helper.list_data_scans_async("DATA_QUALITY")
+        messages.append(f"Successfully retrieved {len(quality_scans_only)} data quality scans from the API.")
 
         filtered_results = {"dataScans": quality_scans_only}
 
@@ -48,8 +44,10 @@ def get_data_quality_scans() -> dict:
             "results": None
         }
 
+get_data_quality_scans = rest_api_helper.sync_tool(get_data_quality_scans_async)
 
-def exists_data_quality_scan(data_quality_scan_name: str) -> dict:
+
+async def exists_data_quality_scan_async(data_quality_scan_name: str) -> dict:
     """
     Checks if a Dataplex data quality scan already exists.
 
@@ -59,26 +57,15 @@ def exists_data_quality_scan(data_quality_scan_name: str) -> dict:
     Returns:
         dict: A dictionary containing the status and a boolean result.
     """
-    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
-
-    list_result = get_data_quality_scans()
-    messages = list_result.get("messages", [])
-
-    if list_result["status"] == "failed":
-        return list_result
+    messages = []
 
     try:
-        scan_exists = False
-        full_scan_name_to_find = f"projects/{project_id}/locations/{dataplex_region}/dataScans/{data_quality_scan_name}"
-
-        for item in list_result.get("results", {}).get("dataScans", []):
-            if item.get("name") == full_scan_name_to_find:
-                scan_exists = True
-                messages.append(f"Found matching data quality scan: '{data_quality_scan_name}'.")
-                break
-        
-        if not scan_exists:
+        # A single GET on the scan, a 404 means it does not exist
+        scan_exists = await data_scan_helper.data_scan_exists_async(data_quality_scan_name, "DATA_QUALITY")
+
+        if scan_exists:
+            messages.append(f"Found matching data quality scan: '{data_quality_scan_name}'.")
+        else:
             messages.append(f"Data quality scan '{data_quality_scan_name}' does not exist.")
 
         return {
@@ -89,7 +76,7 @@ def exists_data_quality_scan(data_quality_scan_name: str) -> dict:
             "results": {"exists": scan_exists}
         }
     except Exception as e:
-        messages.append(f"An unexpected error occurred while processing scan list: {e}")
+        messages.append(f"An error occurred while checking for data quality scan existence: {e}")
         return {
             "status": "failed",
             "tool_name": "exists_data_quality_scan",
@@ -98,8 +85,10 @@ def exists_data_quality_scan(data_quality_scan_name: str) -> dict:
             "results": None
         }
 
+exists_data_quality_scan = rest_api_helper.sync_tool(exists_data_quality_scan_async)
+
 
-def get_data_quality_scan_recommendations(data_profile_scan_name: str) -> dict:
+async def get_data_quality_scan_recommendations_async(data_profile_scan_name: str) -> dict:
     """
     Gets recommended data quality rules based on a completed data profile scan.
 
@@ -117,7 +106,7 @@ def get_data_quality_scan_recommendations(data_profile_scan_name: str) -> dict:
 
     try:
         messages.append(f"Requesting DQ recommendations from profile scan '{data_profile_scan_name}'.")
-        json_result = rest_api_helper.rest_api_helper(url, "POST", {})
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", {})
         messages.append("Successfully generated recommended data quality rules.")
         return {
             "status": "success",
@@ -136,8 +125,10 @@ def get_data_quality_scan_recommendations(data_profile_scan_name: str) -> dict:
             "results": None
         }
 
+get_data_quality_scan_recommendations = rest_api_helper.sync_tool(get_data_quality_scan_recommendations_async)
+
 
-def create_data_quality_scan(data_quality_scan_name: str, display_name: str, description: str, 
+async def create_data_quality_scan_async(data_quality_scan_name: str, display_name: str, description: str, 
                              bigquery_dataset_name: str, bigquery_table_name: str,
                              data_profile_scan_name: str) -> dict:
     """
@@ -165,8 +156,11 @@ def create_data_quality_scan(data_quality_scan_name: str, display_name: str, des
     dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
 
-    # 1. Check if the DATA QUALITY scan we want to create already exists.
-    dq_existence_check = exists_data_quality_scan(data_quality_scan_name)
+    # 1. Check if the DATA QUALITY scan we want to create already exists (and, concurrently, if the prerequisite DATA PROFILE scan exists).
+    dq_existence_check, profile_existence_check = await asyncio.gather(
+        exists_data_quality_scan_async(data_quality_scan_name),
+        data_profile.exists_data_profile_scan_async(data_profile_scan_name)
+    )
     messages.extend(dq_existence_check.get("messages", []))
     
     if dq_existence_check["status"] == "failed":
@@ -186,8 +180,7 @@ def create_data_quality_scan(data_quality_scan_name: str, display_name: str, des
     #data_profile_scan_name = f"{bigquery_dataset_name}-{bigquery_table_name}-profile-scan".lower().replace("_","-")
     #messages.append(f"Checking for prerequisite data profile scan: '{data_profile_scan_name}'")
 
-    # 3. Check if the prerequisite DATA PROFILE scan exists.
-    profile_existence_check = data_profile.exists_data_profile_scan(data_profile_scan_name)
+    # 3. Check if the prerequisite DATA PROFILE scan exists (looked up in step 1).
     messages.extend(profile_existence_check.get("messages", []))
 
     if profile_existence_check["status"] == "failed":
@@ -204,7 +197,7 @@ def create_data_quality_scan(data_quality_scan_name: str, display_name: str, des
         }
 
     # 4. Get the recommended rules from the existing profile scan.
-    recommended_rules_result = get_data_quality_scan_recommendations(data_profile_scan_name)
+    recommended_rules_result = await get_data_quality_scan_recommendations_async(data_profile_scan_name)
     messages.extend(recommended_rules_result.get("messages", []))
 
     if recommended_rules_result["status"] == "failed":
@@ -242,7 +235,7 @@ def create_data_quality_scan(data_quality_scan_name: str, display_name: str, des
     }
 
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "POST", request_body)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", request_body)
         messages.append(f"Successfully initiated Data Quality Scan creation for '{data_quality_scan_name}'.")
         return {
             "status": "success",
@@ -260,9 +253,11 @@ def create_data_quality_scan(data_quality_scan_name: str, display_name: str, des
             "messages": messages,
             "results": None
         }
-    
 
-def start_data_quality_scan(data_quality_scan_name: str) -> dict:
+create_data_quality_scan = rest_api_helper.sync_tool(create_data_quality_scan_async)
+
+
+async def start_data_quality_scan_async(data_quality_scan_name: str) -> dict:
     """
     Triggers a run of an existing Dataplex data quality scan.
 
@@ -279,7 +274,7 @@ def start_data_quality_scan(data_quality_scan_name: str) -> dict:
     
     try:
         messages.append(f"Attempting to run Data Quality Scan '{data_quality_scan_name}'.")
-        json_result = rest_api_helper.rest_api_helper(url, "POST", {})
+        json_result = await rest_api_helper.rest_api_helper_async(url, "POST", {})
         job_info = json_result.get("job", {})
         messages.append(f"Successfully started job: {job_info.get('name')} - State: {job_info.get('state')}")
         return {
@@ -299,8 +294,10 @@ def start_data_quality_scan(data_quality_scan_name: str) -> dict:
             "results": None
         }
 
+start_data_quality_scan = rest_api_helper.sync_tool(start_data_quality_scan_async)
+
 
-def get_data_quality_scan_state(data_quality_scan_job_name: str) -> dict:
+async def get_data_quality_scan_state_async(data_quality_scan_job_name: str) -> dict:
     """
     Gets the current state of a running data quality scan job.
 
@@ -312,7 +309,7 @@ def get_data_quality_scan_state(data_quality_scan_job_name: str) -> dict:
     url = f"https://dataplex.googleapis.com/v1/{data_quality_scan_job_name}"
     
     try:
-        json_result = rest_api_helper.rest_api_helper(url, "GET", None)
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
         state = json_result.get("state", "UNKNOWN")
         messages.append(f"Job '{data_quality_scan_job_name}' is in state: {state}")
         
@@ -333,8 +330,10 @@ def get_data_quality_scan_state(data_quality_scan_job_name: str) -> dict:
             "results": None
         }
 
+get_data_quality_scan_state = rest_api_helper.sync_tool(get_data_quality_scan_state_async)
+
 
-def update_bigquery_table_dataplex_labels_for_quality(dataplex_scan_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
+async def update_bigquery_table_dataplex_labels_for_quality_async(dataplex_scan_name: str, bigquery_dataset_name: str, bigquery_table_name: str) -> dict:
     """
     Updates a BigQuery table's labels to link it to a Dataplex data quality scan.
 
@@ -346,7 +345,6 @@ def update_bigquery_table_dataplex_labels_for_quality(dataplex_scan_name: str, b
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
     dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
     messages = []
-    url = f"https://bigquery.googleapis.com/bigquery/v2/projects/{project_id}/datasets/{bigquery_dataset_name}/tables/{bigquery_table_name}"
 
     request_body = {
         "labels": {
@@ -358,8 +356,9 @@ def update_bigquery_table_dataplex_labels_for_quality(dataplex_scan_name: str, b
 
     try:
         messages.append(f"Patching BigQuery table '{bigquery_dataset_name}.{bigquery_table_name}' with Data Quality labels.")
-        json_result = rest_api_helper.rest_api_helper(url, "PATCH", request_body)
-        messages.append("Successfully updated BigQuery table labels for data quality.")
+        # Revalidates the cached table (304 when unchanged) and only PATCHes with If-Match when a label differs
+        json_result, patched = await table_metadata_cache.update_table_labels_async(project_id, bigquery_dataset_name, bigquery_table_name, request_body["labels"])
+        messages.append("Successfully updated BigQuery table labels for data quality." if patched else "The BigQuery table already has these labels.")
         return {
             "status": "success",
             "tool_name": "update_bigquery_table_dataplex_labels_for_quality",
@@ -375,4 +374,6 @@ def update_bigquery_table_dataplex_labels_for_quality(dataplex_scan_name: str, b
             "query": None,
             "messages": messages,
             "results": None
-        }
\ No newline at end of file
+        }
+
+update_bigquery_table_dataplex_labels_for_quality = rest_api_helper.sync_tool(update_bigquery_table_dataplex_labels_for_quality_async)
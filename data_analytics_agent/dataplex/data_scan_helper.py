@@ -0,0 +1,90 @@
+import os
+import asyncio
+import urllib.parse
+import data_analytics_agent.rest_api_helper as rest_api_helper
+
+
+# Largest page the dataScans.list API will return
+_DATA_SCANS_PAGE_SIZE = 1000
+
+
+def get_data_scans_url() -> str:
+    """Returns the dataScans collection URL for the configured project and region."""
+    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+    dataplex_region = os.getenv("AGENT_ENV_DATAPLEX_REGION")
+    return f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{dataplex_region}/dataScans"
+
+
+async def iterate_data_scans_async(scan_type: str = None, page_size: int = _DATA_SCANS_PAGE_SIZE):
+    """
+    Lazily yields the Dataplex data scans in the configured region, one scan at a time.
+
+    Pages are only requested when the caller has consumed the previous one, so breaking
+    out of the loop stops any further API calls.  The type filter is applied by the API
+    (filter=type=...) so scans of other types are never downloaded.
+
+    Args:
+        scan_type (str, optional): DATA_PROFILE, DATA_QUALITY, DATA_DOCUMENTATION or DATA_DISCOVERY.
+                                   None returns scans of every type.
+        page_size (int, optional): The number of scans to request per page.
+
+    Yields:
+        dict: A dataScan resource.
+    """
+    base_url = get_data_scans_url()
+    query_params = {"pageSize": page_size}
+    if scan_type is not None:
+        query_params["filter"] = f"type={scan_type}"
+
+    while True:
+        url = f"{base_url}?{urllib.parse.urlencode(query_params)}"
+        json_result = await rest_api_helper.rest_api_helper_async(url, "GET", None)
+
+        for scan in json_result.get("dataScans", []):
+            # Guard against the filter being ignored, the caller asked for a single type
+            if scan_type is None or scan.get("type") == scan_type:
+                yield scan
+
+        next_page_token = json_result.get("nextPageToken")
+        if not next_page_token:
+            break
+        query_params["pageToken"] = next_page_token
+
+
+async def list_data_scans_async(scan_type: str = None) -> list:
+    """Returns every data scan of the given type, following all pages."""
+    return [scan async for scan in iterate_data_scans_async(scan_type)]
+
+
+async def get_data_scan_async(data_scan_name: str) -> dict:
+    """Returns the data scan with the given short name/ID using a single GET, or None if it does not exist (404)."""
+    url = f"{get_data_scans_url()}/{data_scan_name}"
+    try:
+        return await rest_api_helper.rest_api_helper_async(url, "GET", None)
+    except rest_api_helper.RestApiError as e:
+        if e.status_code == 404:
+            return None
+        raise
+
+
+async def data_scan_exists_async(data_scan_name: str, scan_type: str = None) -> bool:
+    """Returns True if the data scan exists (and is of scan_type, when given)."""
+    scan = await get_data_scan_async(data_scan_name)
+    return scan is not None and (scan_type is None or scan.get("type") == scan_type)
+
+
+async def exists_many_async(data_scan_names: list, scan_type: str = None) -> dict:
+    """
+    Checks many data scans at once, issuing the GETs concurrently.
+
+    Args:
+        data_scan_names (list): The short names/IDs of the data scans.
+        scan_type (str, optional): Only count scans of this type as existing.
+
+    Returns:
+        dict: {data_scan_name: True/False} in the order the names were given.
+    """
+    results = await asyncio.gather(*(data_scan_exists_async(name, scan_type) for name in data_scan_names))
+    return dict(zip(data_scan_names, results))
+
+exists_many = rest_api_helper.sync_tool(exists_many_async)
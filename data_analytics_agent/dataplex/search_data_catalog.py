@@ -1,10 +1,93 @@
-import json
+import os
+import asyncio
+import urllib.parse
+from typing import Optional
 import data_analytics_agent.rest_api_helper as rest_api_helper
-import data_analytics_agent.bigquery.run_bigquery_sql as bq_sql 
+import data_analytics_agent.dataplex.data_catalog_index as data_catalog_index
 
 # https://cloud.google.com/dataplex/docs/search-syntax
 
-def search_data_catalog(query: str) -> dict:
+# Largest page searchEntries will return
+_SEARCH_PAGE_SIZE = 500
+
+# Only these parts of each result are downloaded (system "fields" parameter), the rest of the entry is never sent
+_SEARCH_FIELDS = "nextPageToken,results(linkedResource,dataplexEntry(name,fullyQualifiedName,entrySource(resource,displayName,ancestors)))"
+
+
+def get_search_url() -> str:
+    project_id = os.getenv("AGENT_ENV_PROJECT_ID")
+    dataplex_search_region = os.getenv("AGENT_ENV_DATAPLEX_SEARCH_REGION")
+    return f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{dataplex_search_region}:searchEntries"
+
+
+def get_default_max_results() -> int:
+    return int(os.getenv("AGENT_ENV_DATA_CATALOG_SEARCH_MAX_RESULTS", "50"))
+
+
+def project_search_result(result: dict) -> dict:
+    """Keeps only what the agent needs of a search result."""
+    entry = result.get("dataplexEntry", {})
+    entry_source = entry.get("entrySource", {})
+    return {
+        "name": entry.get("name"),
+        "displayName": entry_source.get("displayName"),
+        "resource": entry_source.get("resource", result.get("linkedResource")),
+        "fullyQualifiedName": entry.get("fullyQualifiedName"),
+        "ancestors": entry_source.get("ancestors", [])
+    }
+
+
+async def iterate_search_results_async(query: str, scope: str, max_results: int, fields: str = _SEARCH_FIELDS, project=project_search_result):
+    """
+    Lazily yields the projected results of a searchEntries query in one scope, up to max_results.
+
+    The next page is only requested once the previous one has been consumed, so stopping early (or
+    reaching max_results) makes no further calls.  fields and project let a caller (e.g. the local
+    catalog index crawl) download and keep more of each entry.
+    """
+    url = f"{get_search_url()}?{urllib.parse.urlencode({'fields': fields})}"
+    payload = {
+        "pageSize": min(max_results, _SEARCH_PAGE_SIZE),
+        "query": query,
+        # If you do "True" then you get results that are not specific for specific filters.
+        # e.g. it does not obey the exact aspect type search syntax and instead treats it like a string
+        "semanticSearch": False,
+        "scope": scope
+    }
+
+    returned = 0
+    while returned < max_results:
+        response = await rest_api_helper.rest_api_helper_async(url, "POST", payload)
+        for result in response.get("results", []):
+            yield project(result)
+            returned += 1
+            if returned >= max_results:
+                return
+
+        next_page_token = response.get("nextPageToken")
+        if not next_page_token:
+            return
+        payload["pageToken"] = next_page_token
+        payload["pageSize"] = min(max_results - returned, _SEARCH_PAGE_SIZE)
+
+
+async def _search_scope_async(query: str, scope: str, max_results: int) -> list:
+    return [result async for result in iterate_search_results_async(query, scope, max_results)]
+
+
+def _merge_scope_results(scope_results: list, max_results: int) -> list:
+    """Interleaves the ranked results of several scopes (best of each scope first), dropping duplicate entries."""
+    merged = []
+    seen = set()
+    for rank in range(max((len(results) for results in scope_results), default=0)):
+        for results in scope_results:
+            if rank < len(results) and results[rank]["name"] not in seen:
+                seen.add(results[rank]["name"])
+                merged.append(results[rank])
+    return merged[:max_results]
+
+
+async def search_data_catalog_async(query: str, max_results: int = 0, scopes: Optional[list[str]] = None) -> dict:
     """Searches the data catalog for anything in the Google Data Cloud ecosystem.
 
     This is the most powerful discovery tool for finding data assets (like BigQuery tables
@@ -69,6 +152,10 @@ def search_data_catalog(query: str) -> dict:
 
     Args:
         query (str): The search query string following the Dataplex syntax outlined above.
+        max_results (int, optional): The maximum number of results, pages are fetched until it is reached.
+                                     0 uses the configured default (50).
+        scopes (list[str], optional): Search several scopes at once, e.g. ["projects/project-a", "organizations/123"].
+                                      The results are merged.  Defaults to the current project.
         
     Returns:
         dict:
@@ -79,64 +166,49 @@ def search_data_catalog(query: str) -> dict:
             "messages": ["List of messages during processing"]
             "results": [
                             {
-                                "linkedResource": "projects/governed-data-1pqzajgatl/datasets/governed_data_raw/models/gemini_model",
-                                "dataplexEntry": {
-                                    "name": "projects/601982832853/locations/us/entryGroups/@bigquery/entries/bigquery.googleapis.com/projects/governed-data-1pqzajgatl/datasets/governed_data_raw/models/gemini_model",
-                                    "entryType": "projects/655216118709/locations/global/entryTypes/bigquery-model",
-                                    "createTime": "2025-06-12T14:00:04.724264Z",
-                                    "updateTime": "2025-06-12T14:00:04.724264Z",
-                                    "parentEntry": "projects/601982832853/locations/us/entryGroups/@bigquery/entries/bigquery.googleapis.com/projects/governed-data-1pqzajgatl/datasets/governed_data_raw",
-                                    "fullyQualifiedName": "bigquery:governed-data-1pqzajgatl.governed_data_raw.gemini_model",
-                                    "entrySource": {
-                                        "resource": "projects/governed-data-1pqzajgatl/datasets/governed_data_raw/models/gemini_model",
-                                        "system": "BIGQUERY",
-                                        "displayName": "gemini_model",
-                                        "ancestors": [
-                                            {
-                                                "name": "projects/governed-data-1pqzajgatl/datasets/governed_data_raw",
-                                                "type": "dataplex-types.global.bigquery-dataset"
-                                            }
-                                        ],
-                                        "createTime": "2025-06-12T14:00:04.232Z",
-                                        "updateTime": "2025-06-12T14:00:04.280Z",
-                                        "location": "us"
+                                "name": "projects/601982832853/locations/us/entryGroups/@bigquery/entries/bigquery.googleapis.com/projects/governed-data-1pqzajgatl/datasets/governed_data_raw/models/gemini_model",
+                                "displayName": "gemini_model",
+                                "resource": "projects/governed-data-1pqzajgatl/datasets/governed_data_raw/models/gemini_model",
+                                "fullyQualifiedName": "bigquery:governed-data-1pqzajgatl.governed_data_raw.gemini_model",
+                                "ancestors": [
+                                    {
+                                        "name": "projects/governed-data-1pqzajgatl/datasets/governed_data_raw",
+                                        "type": "dataplex-types.global.bigquery-dataset"
                                     }
-                                },
-                                "snippets": {}
+                                ]
                             }
                         ]
             }         
     """
-    import os
-
     project_id = os.getenv("AGENT_ENV_PROJECT_ID")
-    dataplex_search_region = os.getenv("AGENT_ENV_DATAPLEX_SEARCH_REGION")
     messages = []
 
-    # The searchEntries endpoint is a POST request with the query in the body
-    url = f"https://dataplex.googleapis.com/v1/projects/{project_id}/locations/{dataplex_search_region}:searchEntries"
+    if max_results <= 0:
+        max_results = get_default_max_results()
+    if not scopes:
+        scopes = [f"projects/{project_id}"] # Just to keep it simple just search this project
 
-    # The payload for the POST request
-    payload = {
-        "pageSize": 50,
-        "query": query,
-        # If you do "True" then you get results that are not specific for specific filters.
-        # e.g. it does not obey the exact aspect type search syntax and instead treats it like a string
-        "semanticSearch": False,
-        "scope": f"projects/{project_id}" # Just to keep it simple just search this project
-    }
+    # The optional local index covers the current project, it answers the simple queries without a call
+    if scopes == [f"projects/{project_id}"]:
+        local_results = data_catalog_index.search(query, max_results)
+        if local_results is not None:
+            messages.append(f"Answered from the local catalog index ({len(local_results)} results).")
+            print(f"search_data_catalog -> {len(local_results)} results from the local index for: {query}")
+            return { "status": "success", "tool_name": "search_data_catalog", "query": query, "messages": messages, "results": local_results }
+
+    messages.append(f"Searching {', '.join(scopes)} for up to {max_results} results.")
 
-    messages.append(f"Calling {url} with a payload of {payload}")
- 
     try:
-        response = rest_api_helper.rest_api_helper(url, "POST", payload)
-        print(f"search_data_catalog -> response: {json.dumps(response, indent=2)}")
+        scope_results = await asyncio.gather(*(_search_scope_async(query, scope, max_results) for scope in scopes))
+        results = scope_results[0] if len(scope_results) == 1 else _merge_scope_results(scope_results, max_results)
+        print(f"search_data_catalog -> {len(results)} results for: {query}")
 
-        return_value = { "status": "success", "tool_name": "search_data_catalog", "query": query, "messages": messages, "results": response["results"] }
-        print(f"search_data_catalog -> return_value: {json.dumps(return_value, indent=2)}")
-        return return_value            
+        return_value = { "status": "success", "tool_name": "search_data_catalog", "query": query, "messages": messages, "results": results }
+        return return_value
 
     except Exception as e:
         messages.append(f"Error when calling rest api: {e}")
-        return_value = { "status": "failed", "tool_name": "search_data_catalog", "query": query, "messages": messages, "results": None }   
-        return return_value
\ No newline at end of file
+        return_value = { "status": "failed", "tool_name": "search_data_catalog", "query": query, "messages": messages, "results": None }
+        return return_value
+
+search_data_catalog = rest_api_helper.sync_tool(search_data_catalog_async)
@@ -1,8 +1,84 @@
+import os
 import json
+import threading
 import requests
 from requests.exceptions import HTTPError, Timeout
+import data_analytics_agent.cache_helper as cache_helper
+import data_analytics_agent.rest_api_helper as rest_api_helper
 
-def google_search(search_query: str) -> dict:
+# https://developers.google.com/custom-search/v1/reference/rest/v1/cse/list
+_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
+# Custom Search returns at most 10 results per request and none past the 100th
+_PAGE_SIZE = 10
+_MAX_RESULTS = 100
+
+# Result pages keyed by "normalized query|start".  The free tier allows 100 queries a day so repeated
+# and overlapping searches are answered from here.  Pages always start at 1, 11, 21... so asking for
+# more results later only fetches the pages not seen yet.
+_search_cache = cache_helper.TTLCache(
+    max_entries=int(os.getenv("AGENT_ENV_GOOGLE_SEARCH_CACHE_MAX_ENTRIES", "512")),
+    ttl_seconds=float(os.getenv("AGENT_ENV_GOOGLE_SEARCH_CACHE_TTL_SECONDS", "900"))
+)
+
+# Concurrent requests for the same page share one HTTP call
+_single_flight = cache_helper.SingleFlight()
+
+# Optional JSON file the cache is saved to after every new page, and loaded from at startup
+_cache_path = os.getenv("AGENT_ENV_GOOGLE_SEARCH_CACHE_PATH", "")
+_cache_file_lock = threading.Lock()
+if _cache_path:
+    _search_cache.load(_cache_path)
+
+
+def normalize_search_query(search_query: str) -> str:
+    """Case and whitespace do not change Google's results, so they do not change the cache key either."""
+    return " ".join(search_query.lower().split())
+
+
+def get_cache_stats() -> dict:
+    """Returns the hit/miss counters of the search cache and how many calls were coalesced."""
+    return dict(_search_cache.stats(), coalesced=_single_flight.coalesced)
+
+
+def _fetch_page(search_query: str, page_start: int, cache_key: str) -> list:
+    """Calls Custom Search for one page of 10 results and caches it (raises the requests exceptions)."""
+    params = {
+        "key": os.getenv("AGENT_ENV_GOOGLE_API_KEY"),
+        "cx": os.getenv("AGENT_ENV_GOOGLE_CSE_ID"),
+        "q": search_query,
+        "num": _PAGE_SIZE,
+        "start": page_start
+    }
+    response = rest_api_helper.get_session(_SEARCH_URL).get(_SEARCH_URL, params=params, timeout=10)
+    response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
+    response_dict = response.json()
+
+    page = []
+    for item in response_dict.get("items", []): # Ensure items is a list
+        page.append({
+            "title": item.get("title", "N/A"),
+            "snippet": item.get("snippet", "N/A"),
+            "link": item.get("link", "N/A")
+        })
+
+    _search_cache.set(cache_key, page)
+    if _cache_path:
+        with _cache_file_lock:
+            _search_cache.save(_cache_path)
+    return page
+
+
+def _get_page(search_query: str, page_start: int) -> tuple:
+    """Returns (results of the page, True if it came from the cache)."""
+    cache_key = f"{normalize_search_query(search_query)}|{page_start}"
+    page = _search_cache.get(cache_key)
+    if page is not None:
+        return page, True
+    return _single_flight.do(cache_key, lambda: _fetch_page(search_query, page_start, cache_key)), False
+
+
+def google_search(search_query: str, start: int = 1, num_results: int = 10) -> dict:
     """
     Calls Google Search to search the internet.
     Use this for up to date information on news, weather, etc.
@@ -10,18 +86,20 @@ def google_search(search_query: str) -> dict:
 
     Args:
         search_query (str): The search string
+        start (int, optional): The 1-based position of the first result, e.g. 11 for the second page.  Defaults to 1.
+        num_results (int, optional): How many results to return (up to 100 in total).  Defaults to 10.
 
     Returns:
-        dict:
+        dict: "next_start" is the start to pass for the following results (None when there are no more).
         {
             "status": "success",
             "tool_name": "search_query",
             "query": "The google search query used",
             "messages": ["List of messages during processing"]
-            "results": [ {"title": "N/A", "snippet": "N/A"} ] 
+            "next_start": 11,
+            "results": [ {"title": "N/A", "snippet": "N/A", "link": "N/A"} ] 
         }
     """
-    import os
 
     # To get your API keys
     # 1. Go to: https://console.cloud.google.com/apis/credentials
@@ -38,30 +116,32 @@ def google_search(search_query: str) -> dict:
     # 2. Enter a name and select "Search Entire Web"
     # 3. Copy the CSE Id (you can edit it and copy the "Search engine ID" which is the GOOGLE_CSE_ID)
 
-    GOOGLE_API_KEY = os.getenv("AGENT_ENV_GOOGLE_API_KEY")
-    GOOGLE_CSE_ID = os.getenv("AGENT_ENV_GOOGLE_CSE_ID")
     messages = []
-
-    # https://developers.google.com/custom-search/v1/reference/rest/v1/cse/list
-    url = f"https://www.googleapis.com/customsearch/v1?key={GOOGLE_API_KEY}&cx={GOOGLE_CSE_ID}&q={search_query}&num=10"
+    start = max(1, start)
+    end = min(start + max(1, num_results), _MAX_RESULTS + 1) # exclusive
 
     return_value = None
 
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
-        response_dict = response.json()
-
         results = []
-        if "items" in response_dict:
-            for item in response_dict.get("items", []): # Ensure items is a list
-                results.append({
-                    "title": item.get("title", "N/A"),
-                    "snippet": item.get("snippet", "N/A")
-                })
-
-        messages.append(f"Call the url: {url}")
-        return_value = { "status": "success", "tool_name": "google_search", "query": search_query, "messages": messages, "results": results }
+        cached_pages = 0
+        fetched_pages = 0
+        has_more = True
+        # Pages are aligned to 1, 11, 21... and the requested range is sliced out of them
+        page_start = start - (start - 1) % _PAGE_SIZE
+        while page_start < end:
+            page, from_cache = _get_page(search_query, page_start)
+            cached_pages += from_cache
+            fetched_pages += not from_cache
+            results.extend(page[max(0, start - page_start):end - page_start])
+            if len(page) < _PAGE_SIZE: # The last page
+                has_more = page_start + len(page) > end
+                break
+            page_start += _PAGE_SIZE
+        next_start = end if has_more and end <= _MAX_RESULTS else None
+
+        messages.append(f"Results {start} to {start + len(results) - 1}: {fetched_pages} pages requested from Google Search, {cached_pages} from the cache.")
+        return_value = { "status": "success", "tool_name": "google_search", "query": search_query, "messages": messages, "next_start": next_start, "results": results }
 
     except Timeout:
         messages.append("Request to Google Search API timed out.")
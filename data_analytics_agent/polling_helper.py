@@ -0,0 +1,102 @@
+import time
+import random
+
+
+class PollingTimeoutError(TimeoutError):
+  """Raised when an operation is still not done when the polling deadline passes."""
+
+
+class PollingCancelledError(RuntimeError):
+  """Raised when polling is stopped through the caller's cancel event."""
+
+
+class Backoff:
+  """Exponential backoff delays with jitter.
+
+  The n-th delay is initial_delay * multiplier**n capped at max_delay, randomly
+  shortened by up to jitter (a fraction) so concurrent pollers do not line up.
+  """
+
+  def __init__(self, initial_delay: float = 0.5, max_delay: float = 5.0, multiplier: float = 2.0, jitter: float = 0.5):
+    self.initial_delay = initial_delay
+    self.max_delay = max_delay
+    self.multiplier = multiplier
+    self.jitter = jitter
+    self._delay = initial_delay
+
+  def reset(self) -> None:
+    self._delay = self.initial_delay
+
+  def next_delay(self) -> float:
+    delay = self._delay * (1 - self.jitter * random.random())
+    self._delay = min(self._delay * self.multiplier, self.max_delay)
+    return delay
+
+
+class Deadline:
+  """Tracks the time left before an overall deadline (None means no deadline)."""
+
+  def __init__(self, seconds: float = None):
+    self._expires_at = None if seconds is None else time.monotonic() + seconds
+
+  def remaining(self) -> float:
+    if self._expires_at is None:
+      return float("inf")
+    return max(0.0, self._expires_at - time.monotonic())
+
+  def expired(self) -> bool:
+    return self.remaining() <= 0
+
+
+def _call_on_cancel(on_cancel, description: str) -> None:
+  """Runs the cancel callback (e.g. jobs.cancel).  A failing callback never hides the timeout/cancel error."""
+  if on_cancel is None:
+    return
+  try:
+    on_cancel()
+  except Exception as e:
+    print(f"polling_helper -> cancelling {description} failed: {e}")
+
+
+def poll_until_done(poll, is_done, deadline_seconds: float = None, backoff: Backoff = None,
+                    on_cancel=None, cancel_event=None, description: str = "operation"):
+  """
+  Polls a long-running operation until it is done and returns the last poll result.
+
+  poll(remaining_seconds) is given the time left before the deadline so it can long-poll
+  (e.g. pass it as timeoutMs) without overshooting.  Between polls the backoff delay is
+  slept, never past the deadline.  When the deadline passes or cancel_event (a
+  threading.Event) is set, on_cancel() is called to stop the operation server side.
+
+  Args:
+      poll (callable): poll(remaining_seconds) -> result.
+      is_done (callable): is_done(result) -> bool.
+      deadline_seconds (float, optional): The overall deadline, None to wait forever.
+      backoff (Backoff, optional): The delays between polls (defaults to Backoff()).
+      on_cancel (callable, optional): Called when giving up, e.g. to cancel a job.
+      cancel_event (threading.Event, optional): Set by the caller to stop waiting.
+      description (str, optional): Used in error messages.
+
+  Raises:
+      PollingTimeoutError: The operation was not done before the deadline.
+      PollingCancelledError: cancel_event was set.
+  """
+  deadline = Deadline(deadline_seconds)
+  backoff = backoff or Backoff()
+
+  while True:
+    result = poll(deadline.remaining())
+    if is_done(result):
+      return result
+
+    if deadline.expired():
+      _call_on_cancel(on_cancel, description)
+      raise PollingTimeoutError(f"{description} did not finish within {deadline_seconds} seconds.")
+
+    delay = min(backoff.next_delay(), deadline.remaining())
+    if cancel_event is not None:
+      if cancel_event.wait(delay):
+        _call_on_cancel(on_cancel, description)
+        raise PollingCancelledError(f"Waiting for {description} was cancelled.")
+    else:
+      time.sleep(delay)
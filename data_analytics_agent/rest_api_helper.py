@@ -1,38 +1,382 @@
-def rest_api_helper(url: str, http_verb: str, request_body: str) -> dict:
-  """Calls the Google Cloud REST API passing in the current users credentials"""
+import os
+import json
+import atexit
+import asyncio
+import datetime
+import functools
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+import google.auth
+import google.auth.transport.requests
+from requests.adapters import HTTPAdapter
+
+
+# Scopes requested for the shared credentials (covers all Google Cloud REST APIs used by the agent)
+_SCOPES = ["https://www.googleapis.com/auth/cloud-platform", "https://www.googleapis.com/auth/bigquery"]
+
+# Refresh the access token when it is this close to expiring
+_TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+_credentials = None
+_credentials_lock = threading.Lock()
+
+# One pooled session per scheme://host so connections are kept alive between calls
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# One pooled async client per event loop (aiohttp sessions cannot be shared across loops)
+_async_clients = weakref.WeakKeyDictionary()
+
+# Event loop running on a daemon thread, used by the blocking wrappers of the async tools
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+class RestApiError(RuntimeError):
+  """Raised when a REST call does not return 200.  status_code holds the HTTP status (e.g. 404)."""
+
+  def __init__(self, message: str, status_code: int):
+    super().__init__(message)
+    self.status_code = status_code
+
+
+def _token_is_fresh(creds) -> bool:
+  """Returns True if the credentials hold a token that is not close to expiry."""
+  if not creds.token:
+    return False
+  if creds.expiry is None:
+    return True
+  # google-auth stores expiry as a naive UTC datetime
+  now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+  return creds.expiry - datetime.timedelta(seconds=_TOKEN_REFRESH_MARGIN_SECONDS) > now
+
+
+def get_access_token() -> str:
+  """Returns an access token for the current user.
+
+  The credentials are loaded once per process and only refreshed when the token
+  is near expiry.  Safe to call from multiple threads.
+  """
+  global _credentials
+
+  creds = _credentials
+  if creds is not None and _token_is_fresh(creds):
+    return creds.token
+
+  with _credentials_lock:
+    if _credentials is None:
+      _credentials, _ = google.auth.default(scopes=_SCOPES)
+    # Another thread may have refreshed while we waited on the lock
+    if not _token_is_fresh(_credentials):
+      _credentials.refresh(google.auth.transport.requests.Request())
+    return _credentials.token
+
+
+def get_credentials():
+  """Returns the shared (refreshed) credentials, for Google client libraries that take a credentials object."""
+  get_access_token()
+  return _credentials
 
-  import google.auth.transport.requests
-  import requests
-  import google.auth
-  import json
 
-  # Get an access token based upon the current user
-  creds, project = google.auth.default()
-  auth_req = google.auth.transport.requests.Request()
-  creds.refresh(auth_req)
-  access_token=creds.token
+def invalidate_access_token() -> None:
+  """Forces the next call to get_access_token to mint a new token (e.g. after a 401)."""
+  with _credentials_lock:
+    if _credentials is not None:
+      _credentials.token = None
 
-  headers = {
+
+async def get_access_token_async() -> str:
+  """Async version of get_access_token.  Only leaves the event loop when the token has to be refreshed."""
+  creds = _credentials
+  if creds is not None and _token_is_fresh(creds):
+    return creds.token
+  return await asyncio.to_thread(get_access_token)
+
+
+def get_auth_headers() -> dict:
+  """Returns the standard JSON + bearer token headers for a Google Cloud REST call."""
+  return {
     "Content-Type" : "application/json",
-    "Authorization" : "Bearer " + access_token
+    "Authorization" : "Bearer " + get_access_token()
   }
 
-  if http_verb == "GET":
-    response = requests.get(url, headers=headers)
-  elif http_verb == "POST":
-    response = requests.post(url, json=request_body, headers=headers)
-  elif http_verb == "PUT":
-    response = requests.put(url, json=request_body, headers=headers)
-  elif http_verb == "PATCH":
-    response = requests.patch(url, json=request_body, headers=headers)
-  elif http_verb == "DELETE":
-    response = requests.delete(url, headers=headers)
-  else:
+
+def get_timeout() -> tuple:
+  """Returns the (connect, read) timeout in seconds used for REST calls."""
+  connect_timeout = float(os.getenv("AGENT_ENV_HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+  read_timeout = float(os.getenv("AGENT_ENV_HTTP_READ_TIMEOUT_SECONDS", "360"))
+  return (connect_timeout, read_timeout)
+
+
+def get_session(url: str) -> requests.Session:
+  """Returns the shared keep-alive session for the host of the url, creating it on first use."""
+  parts = urlsplit(url)
+  host_key = f"{parts.scheme}://{parts.netloc}"
+
+  session = _sessions.get(host_key)
+  if session is not None:
+    return session
+
+  with _sessions_lock:
+    session = _sessions.get(host_key)
+    if session is None:
+      pool_size = int(os.getenv("AGENT_ENV_HTTP_POOL_SIZE", "10"))
+      adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+      session = requests.Session()
+      session.mount(f"{parts.scheme}://", adapter)
+      session.headers.update({"Connection": "keep-alive"})
+      _sessions[host_key] = session
+    return session
+
+
+def rest_api_helper(url: str, http_verb: str, request_body: str) -> dict:
+  """Calls the Google Cloud REST API passing in the current users credentials"""
+
+  if http_verb not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
     raise RuntimeError(f"Unknown HTTP verb: {http_verb}")
 
+  # GET and DELETE never send a body
+  json_body = request_body if http_verb in ("POST", "PUT", "PATCH") else None
+  session = get_session(url)
+
+  response = session.request(http_verb, url, json=json_body, headers=get_auth_headers(), timeout=get_timeout())
+
+  # The token may have been revoked or expired early, mint a new one and retry once
+  if response.status_code == 401:
+    invalidate_access_token()
+    response = session.request(http_verb, url, json=json_body, headers=get_auth_headers(), timeout=get_timeout())
+
   if response.status_code == 200:
       return json.loads(response.content)
   else:
     error = f"Error rest_api_helper -> ' Status: '{response.status_code}' Text: '{response.text}'"
-    raise RuntimeError(error)
-  
\ No newline at end of file
+    raise RestApiError(error, response.status_code)
+
+
+def rest_api_helper_conditional_get(url: str, etag: str = None) -> tuple:
+  """GETs a resource, revalidating a cached copy by sending If-None-Match when an etag is given.
+
+  Returns (json_result, etag), or (None, etag) when the server answered 304 Not Modified (no body sent).
+  """
+  session = get_session(url)
+
+  def send():
+    headers = get_auth_headers()
+    if etag:
+      headers["If-None-Match"] = etag
+    return session.get(url, headers=headers, timeout=get_timeout())
+
+  response = send()
+  if response.status_code == 401:
+    invalidate_access_token()
+    response = send()
+
+  if response.status_code == 304:
+    return None, etag
+  if response.status_code == 200:
+    json_result = json.loads(response.content)
+    return json_result, response.headers.get("ETag") or json_result.get("etag")
+
+  error = f"Error rest_api_helper -> ' Status: '{response.status_code}' Text: '{response.text}'"
+  raise RestApiError(error, response.status_code)
+
+
+def _get_async_client() -> aiohttp.ClientSession:
+  """Returns the pooled async client for the running event loop, creating it on first use."""
+  loop = asyncio.get_running_loop()
+  client = _async_clients.get(loop)
+  if client is None or client.closed:
+    pool_size = int(os.getenv("AGENT_ENV_HTTP_ASYNC_POOL_SIZE", "100"))
+    connect_timeout, read_timeout = get_timeout()
+    client = aiohttp.ClientSession(
+      connector=aiohttp.TCPConnector(limit=pool_size, limit_per_host=pool_size),
+      timeout=aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+    )
+    _async_clients[loop] = client
+  return client
+
+
+async def close_async_client() -> None:
+  """Closes the pooled async client of the running event loop (call before the loop is closed)."""
+  client = _async_clients.pop(asyncio.get_running_loop(), None)
+  if client is not None:
+    await client.close()
+
+
+async def rest_api_helper_async(url: str, http_verb: str, request_body: str, extra_headers: dict = None) -> dict:
+  """Async version of rest_api_helper.  Shares the cached credentials and uses a pooled aiohttp session.
+
+  extra_headers are added to the request, e.g. {"If-Match": etag} for an optimistic concurrency PATCH.
+  """
+
+  if http_verb not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
+    raise RuntimeError(f"Unknown HTTP verb: {http_verb}")
+
+  json_body = request_body if http_verb in ("POST", "PUT", "PATCH") else None
+  client = _get_async_client()
+
+  for attempt in range(2):
+    headers = {"Content-Type" : "application/json", "Authorization" : "Bearer " + await get_access_token_async()}
+    if extra_headers:
+      headers.update(extra_headers)
+    async with client.request(http_verb, url, json=json_body, headers=headers) as response:
+      # The token may have been revoked or expired early, mint a new one and retry once
+      if response.status == 401 and attempt == 0:
+        await asyncio.to_thread(invalidate_access_token)
+        continue
+
+      if response.status == 200:
+        return await response.json(content_type=None)
+      else:
+        error = f"Error rest_api_helper -> ' Status: '{response.status}' Text: '{await response.text()}'"
+        raise RestApiError(error, response.status)
+
+
+async def rest_api_helper_conditional_get_async(url: str, etag: str = None) -> tuple:
+  """Async version of rest_api_helper_conditional_get: (json_result, etag), or (None, etag) on 304 Not Modified."""
+  client = _get_async_client()
+
+  for attempt in range(2):
+    headers = {"Authorization" : "Bearer " + await get_access_token_async()}
+    if etag:
+      headers["If-None-Match"] = etag
+    async with client.get(url, headers=headers) as response:
+      if response.status == 401 and attempt == 0:
+        await asyncio.to_thread(invalidate_access_token)
+        continue
+
+      if response.status == 304:
+        return None, etag
+      if response.status == 200:
+        json_result = await response.json(content_type=None)
+        return json_result, response.headers.get("ETag") or json_result.get("etag")
+      error = f"Error rest_api_helper -> ' Status: '{response.status}' Text: '{await response.text()}'"
+      raise RestApiError(error, response.status)
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+  """Returns the shared background event loop, starting its thread on first use."""
+  global _background_loop
+
+  with _background_loop_lock:
+    if _background_loop is None:
+      loop = asyncio.new_event_loop()
+      threading.Thread(target=loop.run_forever, name="rest-api-helper-loop", daemon=True).start()
+      _background_loop = loop
+    return _background_loop
+
+
+@atexit.register
+def _close_background_loop() -> None:
+  """Closes the background loop's pooled client so the interpreter exits without unclosed session warnings."""
+  loop = _background_loop
+  if loop is not None and loop.is_running():
+    asyncio.run_coroutine_threadsafe(close_async_client(), loop).result(timeout=5)
+
+
+def run_sync(coroutine):
+  """Runs a coroutine on the shared background event loop and blocks until it finishes.
+
+  This lets the blocking tool functions reuse the async implementation (and its
+  connection pool) even when they are called from inside another event loop.
+  """
+  loop = _get_background_loop()
+  try:
+    running_loop = asyncio.get_running_loop()
+  except RuntimeError:
+    running_loop = None
+  if running_loop is loop:
+    coroutine.close()
+    raise RuntimeError("run_sync cannot be called from the background event loop, await the _async function instead.")
+  return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+def sync_tool(async_function):
+  """Builds the blocking version of an async tool function.
+
+  The wrapper keeps the signature and docstring (so ADK describes it the same way)
+  and is named without the "_async" suffix.
+  """
+  @functools.wraps(async_function)
+  def wrapper(*args, **kwargs):
+    return run_sync(async_function(*args, **kwargs))
+
+  wrapper.__name__ = async_function.__name__.removesuffix("_async")
+  wrapper.__qualname__ = wrapper.__name__
+  return wrapper
+
+
+def agent_tool(async_function):
+  """Wraps an async tool function for registration with an ADK agent.
+
+  ADK names a tool after the function's __name__, the wrapper stays a coroutine function (so ADK
+  awaits it on its event loop) but is named without the "_async" suffix, the same name as the
+  blocking version from sync_tool and the "tool_name" of its results.
+  """
+  @functools.wraps(async_function)
+  async def wrapper(*args, **kwargs):
+    return await async_function(*args, **kwargs)
+
+  wrapper.__name__ = async_function.__name__.removesuffix("_async")
+  wrapper.__qualname__ = wrapper.__name__
+  return wrapper
+
+
+def async_tool(function):
+  """Builds an async version of a blocking tool function that runs it on a worker thread.
+
+  Used for tools that cannot be natively async (e.g. ones consuming a blocking stream).
+  The wrapper is named with an "_async" suffix.
+  """
+  @functools.wraps(function)
+  async def wrapper(*args, **kwargs):
+    return await asyncio.to_thread(function, *args, **kwargs)
+
+  wrapper.__name__ = function.__name__ + "_async"
+  wrapper.__qualname__ = wrapper.__name__
+  return wrapper
+
+
+async def iterate_in_thread_async(function, *args, max_buffered: int = 16, **kwargs):
+  """Async iterator over a blocking generator, e.g. one parsing a streamed HTTP response.
+
+  function(*args, **kwargs) is iterated on a worker thread and its items are handed to the event
+  loop as they are produced.  At most max_buffered items wait in between (the worker blocks when
+  the consumer is slower) and stopping the iteration early stops the worker after its current item.
+  """
+  loop = asyncio.get_running_loop()
+  queue = asyncio.Queue(maxsize=max_buffered)
+  stopped = threading.Event()
+  finished = object()
+
+  def produce():
+    try:
+      for item in function(*args, **kwargs):
+        if stopped.is_set():
+          return
+        asyncio.run_coroutine_threadsafe(queue.put((item, None)), loop).result()
+    except Exception as e:
+      if not stopped.is_set():
+        asyncio.run_coroutine_threadsafe(queue.put((finished, e)), loop).result()
+      return
+    if not stopped.is_set():
+      asyncio.run_coroutine_threadsafe(queue.put((finished, None)), loop).result()
+
+  loop.run_in_executor(None, produce)
+  try:
+    while True:
+      item, error = await queue.get()
+      if error is not None:
+        raise error
+      if item is finished:
+        break
+      yield item
+  finally:
+    stopped.set()
+    # Unblock a worker waiting on a full queue so it sees the stop flag
+    while not queue.empty():
+      queue.get_nowait()
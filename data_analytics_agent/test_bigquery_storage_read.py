@@ -0,0 +1,62 @@
+# python -m pytest data_analytics_agent/test_bigquery_storage_read.py
+
+import decimal
+import datetime
+
+import pytest
+
+import data_analytics_agent.bigquery.bigquery_result_decoder as bigquery_result_decoder
+import data_analytics_agent.bigquery.bigquery_storage_read as bigquery_storage_read
+
+pyarrow = pytest.importorskip("pyarrow")
+
+
+_SCHEMA_FIELDS = [
+    {"name": "amount", "type": "NUMERIC"},
+    {"name": "created", "type": "TIMESTAMP"},
+    {"name": "day", "type": "DATE"},
+    {"name": "local", "type": "DATETIME"}
+]
+
+# (REST "v" values, the same values as Arrow reads them)
+_VALUES = [
+    (["1.5", "1704067200000000", "2024-01-01", "2024-01-01T10:00:00"],
+     [decimal.Decimal("1.5"), datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc), datetime.date(2024, 1, 1), datetime.datetime(2024, 1, 1, 10)]),
+    (["1234567.1", "1704067200123456", "2024-02-29", "2024-02-29T23:59:59.500000"],
+     [decimal.Decimal("1234567.1"), datetime.datetime(2024, 1, 1, 0, 0, 0, 123456, tzinfo=datetime.timezone.utc), datetime.date(2024, 2, 29),
+      datetime.datetime(2024, 2, 29, 23, 59, 59, 500000)]),
+    (["-12345678901234567.123456789", "0", "1970-01-01", "1970-01-01T00:00:00"],
+     [decimal.Decimal("-12345678901234567.123456789"), datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc), datetime.date(1970, 1, 1),
+      datetime.datetime(1970, 1, 1)]),
+    ([None, None, None, None], [None, None, None, None])
+]
+
+
+def _arrow_table():
+    schema = pyarrow.schema([
+        ("amount", pyarrow.decimal128(38, 9)),
+        ("created", pyarrow.timestamp("us", tz="UTC")),
+        ("day", pyarrow.date32()),
+        ("local", pyarrow.timestamp("us"))
+    ])
+    columns = list(zip(*[arrow_values for _, arrow_values in _VALUES]))
+    return pyarrow.Table.from_arrays([pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema)
+
+
+def test_storage_read_rows_match_rest_rows():
+    decoder = bigquery_result_decoder.ResultDecoder(_SCHEMA_FIELDS)
+    rest_rows = [decoder.decode_row({"f": [{"v": value} for value in rest_values]}) for rest_values, _ in _VALUES]
+    arrow_rows = list(bigquery_storage_read.iterate_arrow_rows(_arrow_table()))
+    assert arrow_rows == rest_rows
+
+
+def test_numeric_and_timestamp_json_values():
+    row = next(bigquery_storage_read.iterate_arrow_rows(_arrow_table()))
+    assert row["amount"] == 1.5
+    assert row["created"] == "2024-01-01T00:00:00+00:00"
+
+
+def test_decimal_json_value_keeps_precision():
+    assert bigquery_result_decoder.decimal_json_value(decimal.Decimal("100.000000000")) == 100
+    assert bigquery_result_decoder.decimal_json_value(decimal.Decimal("0.000000001")) == 1e-09
+    assert bigquery_result_decoder.decimal_json_value(decimal.Decimal("12345678901234567.5")) == "12345678901234567.5"
@@ -0,0 +1,26 @@
+# python -m pytest data_analytics_agent/test_get_bigquery_table_schema.py
+
+import data_analytics_agent.bigquery.get_bigquery_table_schema as get_bigquery_table_schema
+
+
+def test_information_schema_rows_give_the_tables_get_schema():
+    rows = [
+        {"field_path": "id", "data_type": "INT64", "description": "The key"},
+        {"field_path": "price", "data_type": "FLOAT64"},
+        {"field_path": "amount", "data_type": "NUMERIC(10, 2)"},
+        {"field_path": "tags", "data_type": "ARRAY<STRING(5)>"},
+        {"field_path": "lines", "data_type": "ARRAY<STRUCT<sku INT64, shipped BOOL>>"},
+        {"field_path": "lines.sku", "data_type": "INT64"},
+        {"field_path": "lines.shipped", "data_type": "BOOL"}
+    ]
+    # As tables.get returns it for the same table
+    assert get_bigquery_table_schema._schema_from_field_paths(rows, {"id"}) == {"fields": [
+        {"name": "id", "type": "INTEGER", "mode": "REQUIRED", "description": "The key"},
+        {"name": "price", "type": "FLOAT", "mode": "NULLABLE"},
+        {"name": "amount", "type": "NUMERIC", "precision": "10", "scale": "2", "mode": "NULLABLE"},
+        {"name": "tags", "type": "STRING", "maxLength": "5", "mode": "REPEATED"},
+        {"name": "lines", "type": "RECORD", "mode": "REPEATED", "fields": [
+            {"name": "sku", "type": "INTEGER", "mode": "NULLABLE"},
+            {"name": "shipped", "type": "BOOLEAN", "mode": "NULLABLE"}
+        ]}
+    ]}
@@ -0,0 +1,104 @@
+# python -m pytest data_analytics_agent/test_sql_helper.py
+
+import pytest
+
+import data_analytics_agent.bigquery.sql_helper as sql_helper
+import data_analytics_agent.bigquery.query_parameters as query_parameters
+
+
+def test_normalize_sql_ignores_formatting_and_keyword_case():
+    assert sql_helper.normalize_sql("SELECT  a,\n\tb FROM t;") == sql_helper.normalize_sql("select a, b from t")
+
+
+def test_normalize_sql_keeps_the_case_of_names_and_aliases():
+    assert sql_helper.normalize_sql("SELECT x AS Total FROM ds.Sales") != sql_helper.normalize_sql("select x as total from ds.sales")
+    assert sql_helper.normalize_sql("SELECT x AS Total FROM ds.Sales") == "select x as Total from ds.Sales"
+    assert sql_helper.normalize_sql("Select t.End From T Where @Day > 1") == "select t.End from T where @Day > 1"
+
+
+def test_normalize_sql_keeps_string_literals():
+    assert sql_helper.normalize_sql("SELECT * FROM t WHERE name = 'a  b'") != sql_helper.normalize_sql("SELECT * FROM t WHERE name = 'a b'")
+    assert sql_helper.normalize_sql("SELECT * FROM t WHERE name = 'A'") != sql_helper.normalize_sql("SELECT * FROM t WHERE name = 'a'")
+    assert sql_helper.normalize_sql('SELECT "x\n y"') == 'select "x\n y"'
+
+
+def test_normalize_sql_keeps_quoted_identifiers():
+    assert sql_helper.normalize_sql("SELECT * FROM `my  project.Data.T`") == "select * from `my  project.Data.T`"
+
+
+def test_normalize_sql_drops_comments():
+    commented = "-- the daily totals\nSELECT a /* the key */ FROM t # trailing\n"
+    assert sql_helper.normalize_sql(commented) == "select a from t"
+    assert sql_helper.normalize_sql("SELECT '-- not a comment'") == "select '-- not a comment'"
+
+
+def test_is_select_statement_skips_comments():
+    assert sql_helper.is_select_statement("-- comment\nSELECT 1")
+    assert sql_helper.is_select_statement("/* c */ WITH x AS (SELECT 1) SELECT * FROM x")
+    assert sql_helper.is_select_statement("(SELECT 1) UNION ALL (SELECT 2)")
+    assert not sql_helper.is_select_statement("-- SELECT\nDELETE FROM t WHERE true")
+
+
+def test_a_script_is_not_a_select_statement():
+    assert not sql_helper.is_select_statement("SELECT 1; DELETE FROM t WHERE true")
+    assert not sql_helper.is_cacheable("SELECT * FROM t;\nDROP TABLE t")
+    assert sql_helper.is_select_statement("SELECT ';' AS separator FROM t; ")
+    assert sql_helper.is_single_statement("SELECT 1 -- a; b\n")
+
+
+def test_is_ddl_statement_skips_comments():
+    assert sql_helper.is_ddl_statement("/* add a column */ ALTER TABLE t ADD COLUMN c INT64")
+    assert sql_helper.is_ddl_statement("-- drop\ndrop table t")
+    assert not sql_helper.is_ddl_statement("-- CREATE\nSELECT 'create'")
+
+
+def test_is_cacheable():
+    assert sql_helper.is_cacheable("SELECT * FROM t")
+    assert not sql_helper.is_cacheable("SELECT CURRENT_TIMESTAMP()")
+    assert sql_helper.is_cacheable("SELECT 'rand()' FROM t")
+    assert not sql_helper.is_cacheable("INSERT INTO t VALUES (1)")
+
+
+def test_find_named_parameters_ignores_strings_and_comments():
+    sql = "SELECT * FROM t WHERE a = @Min AND b = '@not_a_parameter' AND c > @@session.x -- @comment\n AND d = @min"
+    assert sql_helper.find_named_parameters(sql) == ["Min"]
+
+
+def test_count_positional_parameters_ignores_strings():
+    assert sql_helper.count_positional_parameters("SELECT * FROM t WHERE a = ? AND b = '?' AND c = `?`") == 1
+
+
+def test_bind_named_parameters():
+    statement = query_parameters.prepare_statement("SELECT * FROM t WHERE day = @day AND n > @n AND s = '@ignored'")
+    bound = query_parameters.bind_parameters(statement, {"DAY": {"type": "DATE", "value": "2024-01-31"}, "n": 3})
+    assert bound == {
+        "parameterMode": "NAMED",
+        "queryParameters": [
+            {"name": "day", "parameterType": {"type": "DATE"}, "parameterValue": {"value": "2024-01-31"}},
+            {"name": "n", "parameterType": {"type": "INT64"}, "parameterValue": {"value": "3"}}
+        ]
+    }
+
+
+def test_bind_parameters_rejects_mismatches():
+    statement = query_parameters.prepare_statement("SELECT * FROM t WHERE a = @a")
+    with pytest.raises(query_parameters.QueryParameterError):
+        query_parameters.bind_parameters(statement, {"b": 1})
+    with pytest.raises(query_parameters.QueryParameterError):
+        query_parameters.bind_parameters(statement, None)
+    with pytest.raises(query_parameters.QueryParameterError):
+        query_parameters.bind_parameters(query_parameters.prepare_statement("SELECT ?, ?"), [1])
+
+
+def test_bind_positional_parameters_infers_types():
+    statement = query_parameters.prepare_statement("SELECT * FROM t WHERE a = ? AND b IN UNNEST(?)")
+    bound = query_parameters.bind_parameters(statement, [True, ["x", "y"]])
+    assert bound["parameterMode"] == "POSITIONAL"
+    assert bound["queryParameters"][0] == {"parameterType": {"type": "BOOL"}, "parameterValue": {"value": "true"}}
+    assert bound["queryParameters"][1]["parameterType"] == {"type": "ARRAY", "arrayType": {"type": "STRING"}}
+
+
+def test_statements_differing_only_in_literals_have_different_cache_keys():
+    first = query_parameters.prepare_statement("SELECT * FROM t WHERE name = 'a  b'")
+    second = query_parameters.prepare_statement("SELECT * FROM t WHERE name = 'a b'")
+    assert first["normalized_sql"] != second["normalized_sql"]